@@ -0,0 +1,180 @@
+import collections
+import json
+import mmap
+import os
+import re
+import threading
+
+from SMHviz_layout.cache import lru_get, lru_store
+from SMHviz_layout.instrument import record_cache
+
+_MAPPED = collections.OrderedDict()
+_SETTINGS = {"max_mapped": 256}
+_LOCK = threading.Lock()
+
+
+def set_artifact_cache_size(max_mapped):
+    """Set the maximum number of memory-mapped artifacts
+
+    At most `max_mapped` artifact files (256 by default) are kept memory-mapped by
+    `load_artifact()`, the least recently used ones are removed first. A removed mapping is not
+    closed: it is released with the last memoryview returned by `load_artifact()`.
+
+    :parameter max_mapped: Maximum number of memory-mapped artifacts
+    :type max_mapped: int
+    :return: None
+    """
+    with _LOCK:
+        _SETTINGS["max_mapped"] = max_mapped
+        while len(_MAPPED) > max_mapped:
+            _MAPPED.popitem(last=False)
+
+
+def _check_name(parameter, value, pattern=r"[A-Za-z0-9_-]+"):
+    # the round number, tab and version can come from a request: only simple names are accepted
+    # in the artifact paths
+    value = str(value)
+    if re.fullmatch(pattern, value) is None or value in [".", ".."]:
+        raise ValueError("Invalid '" + parameter + "' for an artifact: " + repr(value))
+    return value
+
+
+def check_version(version):
+    """Check the name of an artifact version
+
+    :parameter version: Name of the version (letters, digits, ".", "_" and "-" only)
+    :type version: str
+    :return: the name of the version, a ValueError is raised if the name is invalid
+    """
+    return _check_name("version", version, pattern=r"[A-Za-z0-9_.-]+")
+
+
+def artifact_path(kind, round_number=None, tab=None):
+    """Relative path of a layout artifact
+
+    Return the relative path (in a versioned artifact directory) of a layout artifact:
+
+    - `"round_tab"`, `"notes_definition"`, `"dt_metadata"`: `<kind>.json`
+    - `"tab_plots"`, `"abstract_tab"`: `round<round_number>/<kind>.json`
+    - `"sidebar"`, `"plot_bar"`: `round<round_number>/<kind>/<tab>.json`
+
+    :parameter kind: Type of the artifact, one of "round_tab", "notes_definition", "dt_metadata",
+        "tab_plots", "abstract_tab", "sidebar" or "plot_bar"
+    :type kind: str
+    :parameter round_number: Numeric identifier of a specific round (for example "13"), required for
+        round specific artifacts
+    :type round_number: str | int | None
+    :parameter tab: Internal id of the plot tab, required for "sidebar" and "plot_bar"
+    :type tab: str | None
+    :return: the relative path of the artifact, a ValueError is raised if the round number or the
+        tab is not a simple name (letters, digits, "_" and "-" only)
+    """
+    if kind in ["round_tab", "notes_definition", "dt_metadata"]:
+        return kind + ".json"
+    if round_number is None:
+        raise ValueError("'round_number' is required for the artifact: " + kind)
+    round_number = _check_name("round_number", round_number)
+    if kind in ["tab_plots", "abstract_tab"]:
+        return os.path.join("round" + round_number, kind + ".json")
+    if kind in ["sidebar", "plot_bar"]:
+        if tab is None:
+            raise ValueError("'tab' is required for the artifact: " + kind)
+        return os.path.join("round" + round_number, kind, _check_name("tab", tab) + ".json")
+    raise ValueError("Unknown artifact type: " + str(kind))
+
+
+def current_version(artifact_dir):
+    """Current version of an artifact directory
+
+    :parameter artifact_dir: Path to the artifact directory (containing one folder per version and
+        a `CURRENT` file)
+    :type artifact_dir: str
+    :return: the name of the current version
+    """
+    with open(os.path.join(artifact_dir, "CURRENT"), "r") as f:
+        return f.read().strip()
+
+
+def load_artifact(artifact_dir, kind, round_number=None, tab=None, version=None):
+    """Load a serialized layout artifact
+
+    Return the serialized JSON of a layout artifact written by `SMHviz_layout.build`, without
+    running any layout function. The file is memory-mapped once per process and the same mapping
+    is returned for all following calls.
+
+    :parameter artifact_dir: Path to the artifact directory
+    :type artifact_dir: str
+    :parameter kind: Type of the artifact, see `artifact_path()`
+    :type kind: str
+    :parameter round_number: Numeric identifier of a specific round (for example "13")
+    :type round_number: str | int | None
+    :parameter tab: Internal id of the plot tab (for "sidebar" and "plot_bar" only)
+    :type tab: str | None
+    :parameter version: Version of the artifacts to load, if `None` (default), the current version
+    :type version: str | None
+    :return: a read-only memoryview on the UTF-8 encoded JSON of the artifact
+    """
+    if version is None:
+        version = current_version(artifact_dir)
+    filename = os.path.join(artifact_dir, check_version(version),
+                            artifact_path(kind, round_number, tab))
+    with _LOCK:
+        mapped = lru_get(_MAPPED, filename)
+    record_cache("artifact", mapped is not None)
+    if mapped is None:
+        with _LOCK:
+            mapped = lru_get(_MAPPED, filename)
+            if mapped is None:
+                with open(filename, "rb") as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        # an empty file cannot be memory-mapped
+                        mapped = (None, memoryview(b""))
+                    else:
+                        content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                        mapped = (content, memoryview(content))
+                lru_store(_MAPPED, filename, mapped, _SETTINGS["max_mapped"])
+    return mapped[1]
+
+
+def load_layout(artifact_dir, kind, round_number=None, tab=None, version=None):
+    """Load a layout artifact as a component dictionary
+
+    Return the layout artifact as a dictionary (`props`, `type`, `namespace`) that can be
+    directly used in a Dash layout or returned by a Dash callback.
+
+    :parameter artifact_dir: Path to the artifact directory
+    :type artifact_dir: str
+    :parameter kind: Type of the artifact, see `artifact_path()`
+    :type kind: str
+    :parameter round_number: Numeric identifier of a specific round (for example "13")
+    :type round_number: str | int | None
+    :parameter tab: Internal id of the plot tab (for "sidebar" and "plot_bar" only)
+    :type tab: str | None
+    :parameter version: Version of the artifacts to load, if `None` (default), the current version
+    :type version: str | None
+    :return: the deserialized layout artifact
+    """
+    return json.loads(bytes(load_artifact(artifact_dir, kind, round_number=round_number, tab=tab,
+                                          version=version)))
+
+
+def clear_artifacts():
+    """Release all the memory-mapped artifacts
+
+    The memory mappings are closed: the memoryviews previously returned by `load_artifact()`
+    cannot be used anymore. The following calls map the files again, for example to read the new
+    content of a version written again with `SMHviz_layout.build.write_artifacts()`.
+
+    :return: None
+    """
+    with _LOCK:
+        mapped = list(_MAPPED.values())
+        _MAPPED.clear()
+    for content, view in mapped:
+        view.release()
+        if content is not None:
+            try:
+                content.close()
+            except BufferError:
+                # still exported (for example a slice of the memoryview): closed when released
+                pass
@@ -0,0 +1,244 @@
+"""Benchmark of the layout functions
+
+Time all the public layout functions on synthetic hubs of increasing scale and write the
+results (time and serialized payload size of each output) in a JSON file, usage:
+
+    python -m SMHviz_layout.benchmark results.json [--scales small medium] [--repeat 5]
+        [--compare previous_results.json] [--memory]
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from dash import dcc
+
+from SMHviz_layout.build import load_config
+from SMHviz_layout.metadata_content import make_abstract_tab, make_dt_metadata, render_abstract
+from SMHviz_layout.notes_definition import make_notes_definition
+from SMHviz_layout.options import compact_options_enabled, set_compact_options
+from SMHviz_layout.plottab_bar import make_plot_bar
+from SMHviz_layout.serialize import to_json_bytes
+from SMHviz_layout.sidebar import make_sidebar
+from SMHviz_layout.synthetic import make_hub
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+SCALES = {
+    "small": {"n_rounds": 2, "n_locations": 10, "n_targets": 4, "n_scenarios": 4,
+              "n_pathogens": 2, "n_abstracts": 10},
+    "medium": {"n_rounds": 15, "n_locations": 60, "n_targets": 20, "n_scenarios": 6,
+               "n_pathogens": 3, "n_abstracts": 100},
+    "large": {"n_rounds": 30, "n_locations": 500, "n_targets": 100, "n_scenarios": 12,
+              "n_pathogens": 5, "n_abstracts": 250},
+    "full": {"n_rounds": 60, "n_locations": 3500, "n_targets": 300, "n_scenarios": 20,
+             "n_pathogens": 10, "n_abstracts": 500}
+}
+
+
+def benchmark_jobs(config):
+    """List of layout function calls to benchmark on a hub
+
+    The round specific layout functions are called on the last round of the hub, the
+    `make_sidebar()` and `make_plot_bar()` are called for each plot tab of the round.
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :return: list of tuples (name, layout function, positional arguments, keyword arguments)
+    """
+    round_config = config["rounds"][-1]
+    round_number = round_config["round_number"]
+    bar_param = dict(config["plot_bar"], **round_config.get("plot_bar", dict()))
+    abstract_list = make_abstract_tab(round_number,
+                                      path=config["abstract_path"]).children[0].options
+    jobs = [
+        ("make_round_tab", make_round_tab, ([i.get("round_name") for i in config["rounds"]],),
+         {}),
+        ("make_tab_plots", make_tab_plots, (round_config["tabs"], config["tab_name_dict"]), {}),
+        ("make_notes_definition", make_notes_definition,
+         (dcc.Markdown(config["notes"]["definitions"]),
+          dcc.Markdown(config["notes"]["notes_left"]),
+          dcc.Markdown(config["notes"]["notes_right"])), {}),
+        ("make_dt_metadata", make_dt_metadata, (config["metadata_file"],), {}),
+        ("make_abstract_tab", make_abstract_tab, (round_number,),
+         {"path": config["abstract_path"]}),
+        ("render_abstract", render_abstract,
+         (round_number, round_config["round_date"], abstract_list[0]),
+         {"path": config["abstract_path"]})
+    ]
+    for tab in round_config["tabs"]:
+        jobs.append(("make_sidebar/" + tab, make_sidebar,
+                     (round_number, tab, config["scenario_file"], config["location_info"],
+                      config["scenario_dict"], config["target_dict"], config["def_target"]), {}))
+        jobs.append(("make_plot_bar/" + tab, make_plot_bar, (), dict(bar_param, plot_tab=tab)))
+    return jobs
+
+
+def time_job(builder, args, kwargs, repeat=5):
+    """Time a layout function call
+
+    :parameter builder: Layout function
+    :type builder: function
+    :parameter args: Positional arguments of the layout function
+    :type args: tuple
+    :parameter kwargs: Keyword arguments of the layout function
+    :type kwargs: dict
+    :parameter repeat: Number of calls
+    :type repeat: int
+    :return: a dictionary with the minimum (`min`), median (`median`) and mean (`mean`) time in
+        seconds and the serialized output size in bytes (`size`)
+    """
+    timing = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = builder(*args, **kwargs)
+        timing.append(time.perf_counter() - start)
+    return {"min": min(timing), "median": statistics.median(timing),
+            "mean": statistics.mean(timing), "size": len(to_json_bytes(output))}
+
+
+def measure_memory(config, copies=10):
+    """Memory retained by the sidebars of a round
+
+    Measure with `tracemalloc` the memory retained by `copies` sidebars of each plot tab of the
+    last round of the hub (for example, layouts kept in the caches of the workers), with the
+    compact option storage (see `SMHviz_layout.options`) disabled and enabled.
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :parameter copies: Number of sidebars built and kept for each plot tab
+    :type copies: int
+    :return: a dictionary with the retained memory in bytes with the plain (`plain`) and compact
+        (`compact`) option storage
+    """
+    jobs = [i for i in benchmark_jobs(config) if i[0].startswith("make_sidebar/")]
+    previous = compact_options_enabled()
+    output = dict()
+    try:
+        for compact in [False, True]:
+            set_compact_options(compact)
+            gc.collect()
+            tracemalloc.start()
+            kept = None
+            try:
+                start = tracemalloc.get_traced_memory()[0]
+                kept = [builder(*args, **kwargs) for _ in range(copies)
+                        for name, builder, args, kwargs in jobs]
+                output["compact" if compact else "plain"] = (tracemalloc.get_traced_memory()[0] -
+                                                             start)
+            finally:
+                tracemalloc.stop()
+                # release the sidebars before the next measure, also if a build failed
+                kept = None
+    finally:
+        set_compact_options(previous)
+    return output
+
+
+def run_benchmark(scales=None, repeat=5, seed=0, memory=False):
+    """Benchmark the layout functions on synthetic hubs
+
+    :parameter scales: List of scale names (keys of `SCALES`), if `None` (default) all the scales
+    :type scales: list | None
+    :parameter repeat: Number of calls of each layout function
+    :type repeat: int
+    :parameter seed: Seed of the synthetic hubs random generator
+    :type seed: int
+    :parameter memory: Boolean, to also measure the memory retained by the sidebars, see
+        `measure_memory()`
+    :type memory: bool
+    :return: a dictionary with the environment information (`environment`) and the results by
+        scale (`scales`): scale parameters (`parameters`), the output of `time_job()` for each
+        layout function call (`results`) and, if `memory` is `True`, the output of
+        `measure_memory()` (`memory`)
+    """
+    if scales is None:
+        scales = list(SCALES)
+    output = {"environment": environment_info(), "repeat": repeat, "scales": dict()}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as hub_dir:
+            config = load_config(make_hub(hub_dir, seed=seed, **SCALES[scale]))
+            results = dict()
+            for name, builder, args, kwargs in benchmark_jobs(config):
+                results[name] = time_job(builder, args, kwargs, repeat=repeat)
+            output["scales"][scale] = {"parameters": SCALES[scale], "results": results}
+            if memory:
+                output["scales"][scale]["memory"] = measure_memory(config)
+    return output
+
+
+def environment_info():
+    """Information on the benchmark environment
+
+    :return: a dictionary with the Python, SMHviz_layout, dash and pandas versions and the platform
+    """
+    from importlib import metadata
+
+    info = {"python": platform.python_version(), "platform": platform.platform()}
+    for package in ["SMHviz_layout", "dash", "pandas"]:
+        try:
+            info[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            info[package] = None
+    return info
+
+
+def compare_results(previous, current, threshold=0.1):
+    """Compare two benchmark results
+
+    :parameter previous: Reference benchmark results, output of `run_benchmark()`
+    :type previous: dict
+    :parameter current: New benchmark results, output of `run_benchmark()`
+    :type current: dict
+    :parameter threshold: Relative increase of the median time or of the payload size above which
+        a layout function call is reported, by default 0.1 (10%)
+    :type threshold: float
+    :return: list of dictionaries, one per regression, with the keys: `scale`, `name`, `metric`
+        ("median" or "size"), `previous`, `current` and `change` (relative change)
+    """
+    regressions = list()
+    for scale, scale_results in current["scales"].items():
+        previous_results = previous["scales"].get(scale, dict()).get("results", dict())
+        for name, result in scale_results["results"].items():
+            if name not in previous_results:
+                continue
+            for metric in ["median", "size"]:
+                reference = previous_results[name][metric]
+                if reference > 0 and (result[metric] - reference) / reference > threshold:
+                    regressions.append({"scale": scale, "name": name, "metric": metric,
+                                        "previous": reference, "current": result[metric],
+                                        "change": (result[metric] - reference) / reference})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m SMHviz_layout.benchmark",
+                                     description="Benchmark of the layout functions")
+    parser.add_argument("output", help="path to the JSON output file")
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=None,
+                        help="scales to benchmark (by default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of calls per function")
+    parser.add_argument("--compare", default=None,
+                        help="path to a previous JSON output file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative change reported as regression (by default: 0.1)")
+    parser.add_argument("--memory", action="store_true",
+                        help="measure the memory retained by the sidebars")
+    args = parser.parse_args(argv)
+    results = run_benchmark(scales=args.scales, repeat=args.repeat, memory=args.memory)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            previous = json.load(f)
+        for i in compare_results(previous, results, threshold=args.threshold):
+            print(i["scale"] + " - " + i["name"] + " - " + i["metric"] + ": " +
+                  str(i["previous"]) + " -> " + str(i["current"]) +
+                  " (+" + str(round(100 * i["change"], 1)) + "%)")
+
+
+if __name__ == "__main__":
+    main()
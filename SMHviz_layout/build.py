@@ -0,0 +1,284 @@
+"""Offline layout compiler
+
+Compile all the layouts of a hub into a versioned artifact directory, usage:
+
+    python -m SMHviz_layout.build path/to/hub_config.json path/to/artifacts [--version VERSION]
+
+The artifacts can be served with `SMHviz_layout.artifacts.load_artifact()` or
+`SMHviz_layout.artifacts.load_layout()` without running any layout function.
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+from dash import dcc
+
+from SMHviz_layout.artifacts import artifact_path, check_version
+from SMHviz_layout.metadata_content import make_abstract_tab, make_dt_metadata
+from SMHviz_layout.notes_definition import make_notes_definition
+from SMHviz_layout.plottab_bar import make_plot_bar
+from SMHviz_layout.search import build_index, write_index
+from SMHviz_layout.serialize import to_json_bytes
+from SMHviz_layout.sidebar import make_sidebar, make_sidebars
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+
+def load_config(config_file):
+    """Read a hub configuration file
+
+    Read a JSON hub configuration file, the relative paths in the file are resolved from the
+    configuration file folder. The configuration file should contain the keys:
+
+    - `scenario_file`: path to the CSV file containing scenario information per round
+    - `location_file`: path to the CSV file containing location information in the SMH standard
+    - `scenario_dict`, `target_dict`, `def_target`: as in `make_sidebar()`
+    - `tab_name_dict`: as in `make_tab_plots()`
+    - `rounds`: list of dictionaries, one per round, with the keys `round_number`, `tabs` (list of
+      plot tabs internal id) and optionally: `round_name`, `sidebar` and `plot_bar` (round
+      specific parameters of `make_sidebar()` and `make_plot_bar()`)
+
+    and optionally the keys: `version`, `sidebar` and `plot_bar` (hub parameters of
+    `make_sidebar()` and `make_plot_bar()`), `notes` (dictionary with the `definitions`,
+    `notes_left` and `notes_right` Markdown text), `abstract_path` (path to the folder containing
+    the abstracts information for all round), `metadata_file` (path to the metadata CSV file)
+    and `round_window` (number of most recent rounds with a round tab, see `make_round_tab()`)
+
+    :parameter config_file: Path to the JSON hub configuration file
+    :type config_file: str
+    :return: the hub configuration dictionary, with the location information as a DataFrame in
+        the key `location_info`
+    """
+    with open(config_file, "r") as f:
+        config = json.load(f)
+    root = os.path.dirname(os.path.abspath(config_file))
+    for i in ["scenario_file", "location_file", "abstract_path", "metadata_file"]:
+        if config.get(i) is not None:
+            config[i] = os.path.join(root, config[i])
+    if config.get("abstract_path") is not None:
+        config["abstract_path"] = os.path.join(config["abstract_path"], "")
+    config["location_info"] = pd.read_csv(config["location_file"])
+    return config
+
+
+def round_tab_names(config):
+    """Round tab names of a hub configuration
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :return: list of round names ("Round <Number>" if no `round_name` in the round configuration)
+    """
+    list_round = list()
+    for round_config in config["rounds"]:
+        round_name = round_config.get("round_name")
+        if round_name is None:
+            round_name = "Round " + str(round_config["round_number"])
+        list_round.append(round_name)
+    return list_round
+
+
+def _sidebar_param(config, round_config):
+    sidebar_param = copy.deepcopy(config.get("sidebar", dict()))
+    sidebar_param.update(copy.deepcopy(round_config.get("sidebar", dict())))
+    sidebar_param.setdefault("round_name", round_config.get("round_name"))
+    return sidebar_param
+
+
+def round_sidebar(config, round_config, tab):
+    """Sidebar of a round and plot tab from the hub configuration
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :parameter round_config: Round configuration, one element of the `rounds` configuration
+    :type round_config: dict
+    :parameter tab: Internal id of the plot tab
+    :type tab: str
+    :return: the output of `make_sidebar()`
+    """
+    return make_sidebar(round_config["round_number"], tab, config["scenario_file"],
+                        config["location_info"], config["scenario_dict"], config["target_dict"],
+                        config["def_target"], **_sidebar_param(config, round_config))
+
+
+def round_sidebars(config, round_config, tabs=None):
+    """Sidebars of all the plot tabs of a round from the hub configuration
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :parameter round_config: Round configuration, one element of the `rounds` configuration
+    :type round_config: dict
+    :parameter tabs: List of the plot tabs internal id, if `None` (default), all the tabs of the
+        round
+    :type tabs: list | None
+    :return: the output of `make_sidebars()`
+    """
+    if tabs is None:
+        tabs = round_config["tabs"]
+    return make_sidebars(round_config["round_number"], tabs, config["scenario_file"],
+                         config["location_info"], config["scenario_dict"], config["target_dict"],
+                         config["def_target"], **_sidebar_param(config, round_config))
+
+
+def round_plot_bar(config, round_config, tab):
+    """Plot bar of a round and plot tab from the hub configuration
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :parameter round_config: Round configuration, one element of the `rounds` configuration
+    :type round_config: dict
+    :parameter tab: Internal id of the plot tab
+    :type tab: str
+    :return: the output of `make_plot_bar()`
+    """
+    bar_param = copy.deepcopy(config.get("plot_bar", dict()))
+    bar_param.update(copy.deepcopy(round_config.get("plot_bar", dict())))
+    return make_plot_bar(plot_tab=tab, **bar_param)
+
+
+def build_round(config, round_config):
+    """Build all the layouts of a round
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :parameter round_config: Round configuration, one element of the `rounds` configuration
+    :type round_config: dict
+    :return: a dictionary with the artifact relative path (key) and the layout component (value)
+    """
+    round_number = round_config["round_number"]
+    layouts = dict()
+    layouts[artifact_path("tab_plots", round_number)] = make_tab_plots(round_config["tabs"],
+                                                                       config["tab_name_dict"])
+    sidebars = round_sidebars(config, round_config)
+    for tab in round_config["tabs"]:
+        layouts[artifact_path("sidebar", round_number, tab)] = sidebars[tab]
+        layouts[artifact_path("plot_bar", round_number, tab)] = round_plot_bar(config,
+                                                                               round_config, tab)
+    if config.get("abstract_path") is not None:
+        if os.path.isdir(config["abstract_path"] + "round" + str(round_number)):
+            layouts[artifact_path("abstract_tab", round_number)] = make_abstract_tab(
+                round_number, path=config["abstract_path"])
+    return layouts
+
+
+def build_hub_layouts(config):
+    """Build the layouts of a hub shared by all the rounds
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :return: a dictionary with the artifact relative path (key) and the layout component (value)
+        of the round tabs, notes and definitions and metadata table
+    """
+    layouts = dict()
+    layouts[artifact_path("round_tab")] = make_round_tab(round_tab_names(config),
+                                                         window=config.get("round_window"))
+    if config.get("notes") is not None:
+        layouts[artifact_path("notes_definition")] = make_notes_definition(
+            dcc.Markdown(config["notes"].get("definitions", "")),
+            dcc.Markdown(config["notes"].get("notes_left", "")),
+            dcc.Markdown(config["notes"].get("notes_right", "")))
+    if config.get("metadata_file") is not None:
+        layouts[artifact_path("dt_metadata")] = make_dt_metadata(config["metadata_file"])
+    return layouts
+
+
+def build_layouts(config):
+    """Build all the layouts of a hub
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :return: a dictionary with the artifact relative path (key) and the layout component (value)
+    """
+    layouts = build_hub_layouts(config)
+    for round_config in config["rounds"]:
+        layouts.update(build_round(config, round_config))
+    return layouts
+
+
+def _replace_file(filename, content):
+    # the file is replaced, never rewritten in place: a process with the previous file
+    # memory-mapped (see `SMHviz_layout.artifacts.load_artifact()`) keeps reading valid content
+    if os.path.isfile(filename):
+        with open(filename, "rb") as f:
+            if f.read() == content:
+                return
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    handle, temp_file = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(filename))
+    try:
+        with os.fdopen(handle, "wb") as f:
+            f.write(content)
+        os.replace(temp_file, filename)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def write_artifacts(config, output_dir, version=None):
+    """Write all the layouts of a hub in a versioned artifact directory
+
+    All the layouts are serialized in `<output_dir>/<version>/`, with a `manifest.json` file
+    listing the artifacts and, if the configuration has an `abstract_path`, the full-text index of
+    the abstracts (`abstract_index.json.gz`, see `SMHviz_layout.search`). Once all the files are
+    written, the `<output_dir>/CURRENT` file is updated with the new version. The files of an
+    existing version (same version name) are atomically replaced, the processes that already
+    loaded them keep the previous content until `SMHviz_layout.artifacts.clear_artifacts()`.
+
+    :parameter config: Hub configuration, see `load_config()`
+    :type config: dict
+    :parameter output_dir: Path to the artifact directory
+    :type output_dir: str
+    :parameter version: Name of the version, if `None` (default), the `version` value of the
+        configuration or, if missing, the first 12 characters of the SHA-256 hash of the artifacts
+    :type version: str | None
+    :return: the name of the written version
+    """
+    payload = dict()
+    for name, layout in build_layouts(config).items():
+        payload[name] = to_json_bytes(layout)
+    if version is None:
+        version = config.get("version")
+    if version is None:
+        content_hash = hashlib.sha256()
+        for name in sorted(payload):
+            content_hash.update(name.encode("utf-8"))
+            content_hash.update(payload[name])
+        version = content_hash.hexdigest()[:12]
+    version_dir = os.path.join(output_dir, check_version(version))
+    for name, content in payload.items():
+        _replace_file(os.path.join(version_dir, name), content)
+    manifest = {
+        "version": str(version),
+        "rounds": [{"round_number": str(i["round_number"]), "tabs": i["tabs"]}
+                   for i in config["rounds"]],
+        "artifacts": sorted(payload)
+    }
+    if config.get("abstract_path") is not None:
+        write_index(build_index(config["abstract_path"]),
+                    os.path.join(version_dir, "abstract_index.json.gz"))
+        manifest["search_index"] = "abstract_index.json.gz"
+    _replace_file(os.path.join(version_dir, "manifest.json"),
+                  json.dumps(manifest, indent=2).encode("utf-8"))
+    current_tmp = os.path.join(output_dir, "CURRENT.tmp")
+    with open(current_tmp, "w") as f:
+        f.write(str(version))
+    os.replace(current_tmp, os.path.join(output_dir, "CURRENT"))
+    return str(version)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m SMHviz_layout.build",
+                                     description="Compile the layouts of a hub in a versioned "
+                                                 "artifact directory")
+    parser.add_argument("config", help="path to the JSON hub configuration file")
+    parser.add_argument("output", help="path to the artifact directory")
+    parser.add_argument("--version", default=None,
+                        help="name of the version (by default: hash of the artifacts)")
+    args = parser.parse_args(argv)
+    version = write_artifacts(load_config(args.config), args.output, version=args.version)
+    print(os.path.join(args.output, version))
+
+
+if __name__ == "__main__":
+    main()
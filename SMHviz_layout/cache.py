@@ -0,0 +1,206 @@
+import collections
+import contextlib
+import contextvars
+import os
+import threading
+
+from SMHviz_layout.instrument import record_cache
+
+_FILE_CACHE = {"enabled": False, "max_entries": 1024}
+# entries of each namespace (see `file_cache_namespace()`), "" by default
+_ENTRIES = dict()
+_NAMESPACE = contextvars.ContextVar("smhviz_file_cache_namespace", default="")
+# invalidation count of the paths being read, to skip storing stale values
+_LOADING = dict()
+_LOCK = threading.Lock()
+
+
+def lru_get(entries, key):
+    """Get an entry of a least recently used cache
+
+    Should be called with the lock of the cache held.
+
+    :parameter entries: Entries of the cache
+    :type entries: collections.OrderedDict
+    :parameter key: Key of the entry
+    :type key: tuple | str
+    :return: the value of the entry (marked as the most recently used) or `None` if missing
+    """
+    value = entries.get(key)
+    if value is not None:
+        entries.move_to_end(key)
+    return value
+
+
+def lru_store(entries, key, value, max_entries):
+    """Store an entry in a least recently used cache
+
+    Store the value (if the key is not already stored) and remove the least recently used entries
+    above `max_entries`. Should be called with the lock of the cache held.
+
+    :parameter entries: Entries of the cache
+    :type entries: collections.OrderedDict
+    :parameter key: Key of the entry
+    :type key: tuple | str
+    :parameter value: Value of the entry
+    :parameter max_entries: Maximum number of entries, if `None`, no limit
+    :type max_entries: int | None
+    :return: the stored value (the value already stored under the key, if any)
+    """
+    value = entries.setdefault(key, value)
+    entries.move_to_end(key)
+    while max_entries is not None and len(entries) > max_entries:
+        entries.popitem(last=False)
+    return value
+
+
+def enable_file_cache(max_entries=1024):
+    """Enable the cache of the file-backed layout inputs
+
+    When enabled, the content of the files read by the layout functions is kept in memory: the
+    scenario CSV file (`make_sidebar()`), the metadata CSV file (`make_dt_metadata()`), the list
+    of abstracts of each round (`make_abstract_tab()`) and the content of each abstract
+    (`render_abstract()`). The cached entries are invalidated with `invalidate_path()`, for
+    example by a file watcher (see `SMHviz_layout.watch`). Disabled by default.
+
+    The cached objects (for example DataFrame) are shared between the layout function calls and
+    should not be modified.
+
+    :parameter max_entries: Maximum number of cached files and folders of each namespace (1024
+        by default, see `file_cache_namespace()`), the least recently used ones are removed first
+    :type max_entries: int
+    :return: None
+    """
+    with _LOCK:
+        _FILE_CACHE["max_entries"] = max_entries
+        for entries in _ENTRIES.values():
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+    _FILE_CACHE["enabled"] = True
+
+
+def disable_file_cache():
+    """Disable and empty the cache of the file-backed layout inputs
+
+    :return: None
+    """
+    _FILE_CACHE["enabled"] = False
+    clear_file_cache()
+
+
+def file_cache_enabled():
+    """File cache status
+
+    :return: `True` if the cache of the file-backed layout inputs is enabled
+    """
+    return _FILE_CACHE["enabled"]
+
+
+@contextlib.contextmanager
+def file_cache_namespace(namespace):
+    """Use a separate file cache in a context
+
+    Context manager storing the files read in the context (current thread or asyncio task) in
+    the namespace `namespace` of the file cache, with its own limit of entries (see
+    `enable_file_cache()`): the files read in one namespace (for example one hub, see
+    `SMHviz_layout.hubs`) do not remove the entries of the other namespaces. The invalidations
+    (see `invalidate_path()`) apply to all the namespaces.
+
+    :parameter namespace: Name of the namespace
+    :type namespace: str
+    """
+    token = _NAMESPACE.set(namespace)
+    try:
+        yield
+    finally:
+        _NAMESPACE.reset(token)
+
+
+def clear_file_cache(namespace=None):
+    """Remove entries of the file cache
+
+    :parameter namespace: Namespace to remove (see `file_cache_namespace()`), if `None`
+        (default), all the entries of all the namespaces are removed
+    :type namespace: str | None
+    :return: None
+    """
+    with _LOCK:
+        if namespace is None:
+            _ENTRIES.clear()
+        else:
+            _ENTRIES.pop(namespace, None)
+        for state in _LOADING.values():
+            state["generation"] += 1
+
+
+def cached_read(kind, path, loader):
+    """Read a file-backed layout input, from the cache if enabled
+
+    :parameter kind: Type of entry: "csv" (DataFrame of a CSV file), "text" (content of a file)
+        or "listing" (list of the files of a folder)
+    :type kind: str
+    :parameter path: Path to the file or folder
+    :type path: str
+    :parameter loader: Function called with `path` to read the input if not cached
+    :type loader: function
+    :return: the output of `loader(path)`
+    """
+    if not _FILE_CACHE["enabled"]:
+        return loader(path)
+    key = (kind, os.path.abspath(path))
+    namespace = _NAMESPACE.get()
+    with _LOCK:
+        entries = _ENTRIES.setdefault(namespace, collections.OrderedDict())
+        value = lru_get(entries, key)
+    record_cache("file", value is not None)
+    if value is not None:
+        return value
+    with _LOCK:
+        state = _LOADING.setdefault(key[1], {"count": 0, "generation": 0})
+        state["count"] += 1
+        generation = state["generation"]
+    value = None
+    try:
+        value = loader(path)
+    finally:
+        with _LOCK:
+            state["count"] -= 1
+            if state["count"] == 0:
+                del _LOADING[key[1]]
+            # do not store a value read while the file was changing
+            if value is not None and state["generation"] == generation:
+                entries = _ENTRIES.setdefault(namespace, collections.OrderedDict())
+                value = lru_store(entries, key, value, _FILE_CACHE["max_entries"])
+    return value
+
+
+def invalidate_path(path, listing=True):
+    """Invalidate the cache entries associated with a file or folder
+
+    Remove the cached content of `path` and of all the files under `path` (if it is a folder) and,
+    if `listing` is `True` (a file is created, deleted or renamed), the cached list of files of
+    its parent folder.
+
+    :parameter path: Path to the changed file or folder
+    :type path: str
+    :parameter listing: Boolean, to also invalidate the list of files of the parent folder
+    :type listing: bool
+    :return: the number of removed entries
+    """
+    path = os.path.abspath(path)
+    paths = [path]
+    if listing:
+        paths.append(os.path.dirname(path))
+    prefix = path + os.sep
+    with _LOCK:
+        for i, state in _LOADING.items():
+            if i in paths or i.startswith(prefix):
+                state["generation"] += 1
+        removed = 0
+        for entries in _ENTRIES.values():
+            keys = [k for k in entries if (k[1] == path or k[1].startswith(prefix) or
+                                           (listing and k == ("listing", paths[-1])))]
+            for k in keys:
+                del entries[k]
+            removed += len(keys)
+    return removed
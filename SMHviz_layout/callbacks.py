@@ -0,0 +1,130 @@
+import json
+import os
+
+from dash import Input, Output, State
+
+from SMHviz_layout.build import round_plot_bar, round_sidebar
+from SMHviz_layout.metadata_content import make_abstract_tab
+from SMHviz_layout.serialize import to_json
+
+_CONTROLS = ["Checklist", "RadioItems", "Dropdown", "Slider", "RangeSlider", "Input", "Tabs"]
+
+
+def _is_disabled(props):
+    if props.get("disabled") is True:
+        return True
+    options = props.get("options")
+    if isinstance(options, list) and len(options) > 0:
+        return all(isinstance(i, dict) and i.get("disabled") is True for i in options)
+    return False
+
+
+def _walk(node, hidden, controls, placeholders):
+    if isinstance(node, list):
+        for child in node:
+            _walk(child, hidden, controls, placeholders)
+    elif isinstance(node, dict) and "props" in node and "type" in node:
+        props = node["props"]
+        hidden = hidden or props.get("hidden") is True
+        component_id = props.get("id")
+        if isinstance(component_id, str):
+            if node["type"] in _CONTROLS:
+                controls[component_id] = not (hidden or _is_disabled(props))
+            elif set(k for k, v in props.items() if v is not None) == {"id"}:
+                placeholders.append(component_id)
+        for value in props.values():
+            if isinstance(value, (list, dict)):
+                _walk(value, hidden, controls, placeholders)
+
+
+def component_specs(component):
+    """Controls and placeholders of a layout
+
+    Return the controls (checklist, radio items, dropdown, slider, input and tabs components) of
+    a layout with their status (active, or disabled or hidden) and the placeholders (components
+    with only an id, filled by a callback, for example the plot tab content).
+
+    :parameter component: Dash component or list of components
+    :type component: dash.development.base_component.Component | list
+    :return: a dictionary with the keys: `controls` (dictionary with the component id as key and
+        `True` if the control is active, `False` if it is disabled or hidden) and `placeholders`
+        (list of component ids)
+    """
+    controls = dict()
+    placeholders = list()
+    _walk(json.loads(to_json(component)), False, controls, placeholders)
+    return {"controls": controls, "placeholders": placeholders}
+
+
+def _dependencies(specs, prop):
+    # order of the first layout, then of the next layouts
+    control_ids = list()
+    placeholder_ids = list()
+    for spec in specs:
+        control_ids += [i for i in spec["controls"] if i not in control_ids]
+        placeholder_ids += [i for i in spec["placeholders"] if i not in placeholder_ids]
+    inputs = list()
+    states = list()
+    partial = list()
+    for i in control_ids:
+        if not all(i in spec["controls"] for spec in specs):
+            partial.append(i)
+        elif any(spec["controls"][i] for spec in specs):
+            inputs.append(Input(i, prop))
+        else:
+            states.append(State(i, prop))
+    outputs = [Output(i, "children") for i in placeholder_ids
+               if all(i in spec["placeholders"] for spec in specs)]
+    return {"inputs": inputs, "states": states, "outputs": outputs, "partial": partial}
+
+
+def callback_specs(config, tabs, round_number=None, prop="value"):
+    """Callback dependencies of a set of plot tabs
+
+    Build the sidebar and plot bar of each plot tab of the set (see
+    `SMHviz_layout.build.round_sidebar()` and `SMHviz_layout.build.round_plot_bar()`) and return
+    the callback dependencies valid for all of the tabs:
+        - `Input`: controls present in all the tabs and active in at least one of them
+        - `State`: controls present in all the tabs but disabled (or hidden) in all of them, a
+          change of value does not trigger the callback
+        - `Output`: placeholder components present in all the tabs (`children` property)
+
+    The controls present only in some of the tabs are not valid dependencies for the tab set and
+    are returned separately. The dependencies of the abstract tab of the round (see
+    `SMHviz_layout.metadata_content.make_abstract_tab()`, for example the `abstract-dropdown`
+    control), independent of the plot tabs, are also returned separately.
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :parameter tabs: List of plot tabs internal id (for example `["scenario", "spaghetti"]`) or
+        plot tab internal id
+    :type tabs: list | str
+    :parameter round_number: Numeric identifier of the round, if `None` (default), the last round
+        of the configuration
+    :type round_number: str | int | None
+    :parameter prop: Property of the controls used as dependency, by default `"value"`
+    :type prop: str
+    :return: a dictionary with the keys: `inputs` (list of `dash.Input`), `states` (list of
+        `dash.State`), `outputs` (list of `dash.Output`), `partial` (list of the controls id
+        present in only some of the tabs) and `abstract` (dependencies of the abstract tab, with
+        the same keys, or `None` if the configuration has no abstract for the round)
+    """
+    if isinstance(tabs, str):
+        tabs = [tabs]
+    if round_number is None:
+        round_config = config["rounds"][-1]
+    else:
+        round_config = [i for i in config["rounds"]
+                        if str(i["round_number"]) == str(round_number)][0]
+    specs = list()
+    for tab in tabs:
+        specs.append(component_specs([round_sidebar(config, round_config, tab),
+                                      round_plot_bar(config, round_config, tab)]))
+    output = _dependencies(specs, prop)
+    output["abstract"] = None
+    round_number = round_config["round_number"]
+    if config.get("abstract_path") is not None:
+        if os.path.isdir(config["abstract_path"] + "round" + str(round_number)):
+            abstract_tab = make_abstract_tab(round_number, path=config["abstract_path"])
+            output["abstract"] = _dependencies([component_specs(abstract_tab)], prop)
+    return output
@@ -0,0 +1,162 @@
+import copy
+import difflib
+import json
+
+from dash import Patch, no_update
+
+from SMHviz_layout.serialize import to_json
+
+
+def _is_component(value):
+    return isinstance(value, dict) and "props" in value and "type" in value and \
+        "namespace" in value
+
+
+def _key(value):
+    # identity of a list element: type and id of a component with an id, content of any other
+    # value
+    if _is_component(value) and value["props"].get("id") is not None:
+        return json.dumps([value["namespace"], value["type"], value["props"].get("id")],
+                          sort_keys=True)
+    return json.dumps(value, sort_keys=True)
+
+
+def _diff(old, new, location, operations):
+    if old == new:
+        return
+    if _is_component(old) and _is_component(new):
+        if old["type"] != new["type"] or old["namespace"] != new["namespace"]:
+            operations.append({"operation": "Assign", "location": location, "value": new})
+        else:
+            _diff(old["props"], new["props"], location + ["props"], operations)
+    elif isinstance(old, dict) and isinstance(new, dict) and not _is_component(old) and \
+            not _is_component(new):
+        for key in old:
+            if key not in new:
+                operations.append({"operation": "Delete", "location": location + [key]})
+        for key, value in new.items():
+            if key not in old:
+                operations.append({"operation": "Assign", "location": location + [key],
+                                   "value": value})
+            else:
+                _diff(old[key], value, location + [key], operations)
+    elif isinstance(old, list) and isinstance(new, list):
+        matcher = difflib.SequenceMatcher(None, [_key(i) for i in old], [_key(i) for i in new],
+                                          autojunk=False)
+        # from the end of the list: the indexes of the previous elements stay valid
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == "equal" or (tag == "replace" and i2 - i1 == j2 - j1):
+                for i, j in reversed(list(zip(range(i1, i2), range(j1, j2)))):
+                    _diff(old[i], new[j], location + [i], operations)
+                continue
+            for i in reversed(range(i1, i2)):
+                operations.append({"operation": "Delete", "location": location + [i]})
+            for j in range(j1, j2):
+                operations.append({"operation": "Insert", "location": location,
+                                   "index": i1 + j - j1, "value": new[j]})
+    else:
+        operations.append({"operation": "Assign", "location": location, "value": new})
+
+
+def layout_diff(old, new):
+    """Differences between two layouts
+
+    Compare two layouts (for example the output of `make_plot_bar()` for two plot tabs) and
+    return the list of operations transforming the first one in the second one: property
+    changes (`Assign`, `Delete`) and insertions (`Insert`) or removals (`Delete`) of elements in
+    the lists of children or options. The elements of the lists are matched by component type
+    and id (or by value, for the components without id), a component with a different type is
+    replaced.
+
+    :parameter old: Previous layout, Dash component, list of components or JSON serializable
+        object
+    :type old: dash.development.base_component.Component | list | dict
+    :parameter new: New layout
+    :type new: dash.development.base_component.Component | list | dict
+    :return: list of dictionaries, with the keys `operation`, `location` (path in the previous
+        layout, list of keys and indexes), `value` (for `Assign` and `Insert`) and `index` (for
+        `Insert`), to apply in order
+    """
+    operations = list()
+    _diff(json.loads(to_json(old)), json.loads(to_json(new)), list(), operations)
+    return operations
+
+
+def apply_diff(old, operations):
+    """Apply the output of `layout_diff()` on a layout
+
+    Apply the operations as done by the browser on a `dash.Patch` output, for example to verify
+    a patch.
+
+    :parameter old: Previous layout
+    :type old: dash.development.base_component.Component | list | dict
+    :parameter operations: Output of `layout_diff()`
+    :type operations: list
+    :return: the new layout, as a JSON object
+    """
+    layout = {"root": json.loads(to_json(old))}
+    for op in operations:
+        location = ["root"] + op["location"]
+        target = layout
+        for i in location[:-1]:
+            target = target[i]
+        if op["operation"] == "Assign":
+            target[location[-1]] = copy.deepcopy(op["value"])
+        elif op["operation"] == "Delete":
+            del target[location[-1]]
+        else:
+            target[location[-1]].insert(op["index"], copy.deepcopy(op["value"]))
+    return layout["root"]
+
+
+def make_patch(old, new, fallback=True):
+    """Create a `dash.Patch` from the difference between two layouts
+
+    Return a `dash.Patch` updating the previous layout `old` (current value of the callback
+    output, for example the children of the plot bar) to the new layout `new`, see
+    `layout_diff()`. The previous layout can be rebuilt from the previous inputs, for example
+    stored in a `dcc.Store` component:
+
+        @app.callback(Output("plot_bar", "children"), Output("plot_bar-tab", "data"),
+                      Input("tabs-plot", "value"), State("plot_bar-tab", "data"))
+        def update_bar(tab, previous_tab):
+            if previous_tab is None:
+                return make_plot_bar(plot_tab=tab, ...), tab
+            return make_patch(make_plot_bar(plot_tab=previous_tab, ...),
+                              make_plot_bar(plot_tab=tab, ...)), tab
+
+    :parameter old: Previous layout, Dash component, list of components or JSON serializable
+        object
+    :type old: dash.development.base_component.Component | list | dict
+    :parameter new: New layout
+    :type new: dash.development.base_component.Component | list | dict
+    :parameter fallback: Boolean, if `True` (default), return `new` instead of the patch if the
+        serialized patch is not smaller than the serialized new layout
+    :type fallback: bool
+    :return: a `dash.Patch`, `dash.no_update` if the layouts are identical or `new` (see
+        `fallback`)
+    """
+    operations = layout_diff(old, new)
+    if len(operations) == 0:
+        return no_update
+    if len(operations) == 1 and operations[0]["location"] == [] and \
+            operations[0]["operation"] == "Assign":
+        return new
+    patch = Patch()
+    for op in operations:
+        target = patch
+        location = op["location"]
+        if op["operation"] == "Insert":
+            for i in location:
+                target = target[i]
+            target.insert(op["index"], op["value"])
+            continue
+        for i in location[:-1]:
+            target = target[i]
+        if op["operation"] == "Assign":
+            target[location[-1]] = op["value"]
+        else:
+            del target[location[-1]]
+    if fallback and len(to_json(patch)) >= len(to_json(new)):
+        return new
+    return patch
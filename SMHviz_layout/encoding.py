@@ -0,0 +1,228 @@
+import collections
+import gzip
+import hashlib
+import threading
+
+from SMHviz_layout.cache import lru_get, lru_store
+from SMHviz_layout.instrument import record_cache
+from SMHviz_layout.serialize import to_json_bytes
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_ENCODED = collections.OrderedDict()
+_KEYED = collections.OrderedDict()
+_SETTINGS = {"max_entries": 512}
+_LOCK = threading.Lock()
+
+
+def set_encoding_cache_size(max_entries):
+    """Set the maximum number of cached encoded layouts
+
+    The content hash cache (see `encode_json()`) and the keyed cache (see `encode_layout()` and
+    `build_encoded()`) each keep at most `max_entries` encoded layouts, 512 by default, the least
+    recently used ones are removed first.
+
+    :parameter max_entries: Maximum number of encoded layouts in each cache
+    :type max_entries: int
+    :return: None
+    """
+    with _LOCK:
+        _SETTINGS["max_entries"] = max_entries
+        for entries in [_ENCODED, _KEYED]:
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+
+def encode_json(payload, compress_level=9, cache=True):
+    """Compress a serialized layout
+
+    Compress the UTF-8 encoded JSON of a layout in gzip and brotli (if the `brotli` package is
+    installed). The output is cached by content hash and compression level: the compression is
+    done only once for each distinct layout (see `set_encoding_cache_size()`).
+
+    :parameter payload: UTF-8 encoded JSON of the layout
+    :type payload: bytes
+    :parameter compress_level: Compression level of gzip (0-9) and brotli (0-11) output
+    :type compress_level: int
+    :parameter cache: Boolean, to store the output in the content hash cache (`True` by default),
+        if `False` the caller is responsible for caching the output
+    :type cache: bool
+    :return: a dictionary with the keys: `json` (UTF-8 encoded JSON), `gzip` (gzip compressed
+        JSON), `br` (brotli compressed JSON or `None` if brotli is not available) and `etag`
+        (content hash of the JSON)
+    """
+    payload = bytes(payload)
+    etag = hashlib.sha256(payload).hexdigest()[:32]
+    encoded = None
+    if cache:
+        with _LOCK:
+            encoded = lru_get(_ENCODED, (etag, compress_level))
+        record_cache("encoding", encoded is not None)
+    if encoded is None:
+        encoded = {
+            "json": payload,
+            "gzip": gzip.compress(payload, compresslevel=compress_level, mtime=0),
+            "br": None,
+            "etag": etag
+        }
+        if brotli is not None:
+            encoded["br"] = brotli.compress(payload, quality=min(compress_level + 2, 11))
+        if cache:
+            with _LOCK:
+                encoded = lru_store(_ENCODED, (etag, compress_level), encoded,
+                                    _SETTINGS["max_entries"])
+    return encoded
+
+
+def _keyed(cache_key, compress_level):
+    if cache_key is None:
+        return None
+    with _LOCK:
+        encoded = lru_get(_KEYED, (cache_key, compress_level))
+    record_cache("encoded_layout", encoded is not None)
+    return encoded
+
+
+def _store_keyed(cache_key, compress_level, encoded):
+    if cache_key is None:
+        return encoded
+    with _LOCK:
+        return lru_store(_KEYED, (cache_key, compress_level), encoded, _SETTINGS["max_entries"])
+
+
+def encode_layout(component, compress_level=9, cache=True, cache_key=None):
+    """Serialize and compress a layout component
+
+    Serialize the component returned by a layout function (`make_sidebar()`, `make_plot_bar()`,
+    `make_tab_plots()`, `make_notes_definition()`, `make_dt_metadata()`, etc.) and compress it
+    in gzip and brotli (if the `brotli` package is installed), see `encode_json()`.
+
+    :parameter component: Dash component, list of components or JSON serializable object
+    :type component: dash.development.base_component.Component | list | dict
+    :parameter compress_level: Compression level of gzip (0-9) and brotli (0-11) output
+    :type compress_level: int
+    :parameter cache: Boolean, to store the output in the content hash cache (`True` by default),
+        if `False` the caller is responsible for caching the output
+    :type cache: bool
+    :parameter cache_key: Hashable key identifying the layout, if provided, the encoded output
+        stored under this key (and compression level) is returned without serializing the
+        component again. If `None` (default), the component is serialized at each call.
+    :type cache_key: tuple | str | None
+    :return: a dictionary with the keys: `json`, `gzip`, `br` and `etag`, see `encode_json()`
+    """
+    encoded = _keyed(cache_key, compress_level)
+    if encoded is not None:
+        return encoded
+    encoded = encode_json(to_json_bytes(component), compress_level=compress_level, cache=cache)
+    return _store_keyed(cache_key, compress_level, encoded)
+
+
+def build_encoded(builder, *args, cache_key=None, compress_level=9, **kwargs):
+    """Run a layout function and return its encoded output
+
+    Run the layout function `builder` with the arguments `args` and `kwargs` and return the
+    output of `encode_layout()`. If `cache_key` is provided, the encoded output is stored under
+    this key and the layout function is not run again for the same key.
+
+    :parameter builder: Layout function (for example: `make_sidebar`)
+    :type builder: function
+    :parameter args: Positional arguments of the layout function
+    :parameter cache_key: Hashable key identifying the layout (for example:
+        `("sidebar", round_number, tab)`), if `None` (default), the layout function is always run
+    :type cache_key: tuple | str | None
+    :parameter compress_level: Compression level of gzip (0-9) and brotli (0-11) output
+    :type compress_level: int
+    :parameter kwargs: Keyword arguments of the layout function
+    :return: the encoded output, see `encode_layout()`
+    """
+    encoded = _keyed(cache_key, compress_level)
+    if encoded is not None:
+        return encoded
+    encoded = encode_layout(builder(*args, **kwargs), compress_level=compress_level)
+    return _store_keyed(cache_key, compress_level, encoded)
+
+
+def clear_encoded(cache_key=None):
+    """Remove encoded layouts from the cache
+
+    :parameter cache_key: Key to remove, if `None` (default), all the encoded layouts are removed
+    :type cache_key: tuple | str | None
+    :return: None
+    """
+    with _LOCK:
+        if cache_key is None:
+            _KEYED.clear()
+            _ENCODED.clear()
+        else:
+            for key in [i for i in _KEYED if i[0] == cache_key]:
+                del _KEYED[key]
+
+
+def layout_response(encoded, max_age=0, immutable=False):
+    """Create a Flask response for an encoded layout
+
+    Return the encoded layout with the best encoding accepted by the client (brotli, gzip or
+    identity) and an ETag header. If the client `If-None-Match` header matches the ETag, an empty
+    "304 Not Modified" response is returned. Should be called in a Flask request context.
+
+    :parameter encoded: Encoded layout, output of `encode_layout()` or `build_encoded()`
+    :type encoded: dict
+    :parameter max_age: Value of the `max-age` directive of the Cache-Control header, by default 0
+        (the client revalidates the layout with its ETag)
+    :type max_age: int
+    :parameter immutable: Boolean, to add the `immutable` directive to the Cache-Control header
+        (for versioned URLs, the content never changes)
+    :type immutable: bool
+    :return: a Flask Response object
+    """
+    from flask import Response, request
+
+    if request.if_none_match.contains(encoded["etag"]):
+        response = Response(status=304)
+    else:
+        if encoded["br"] is not None and request.accept_encodings["br"]:
+            body, content_encoding = encoded["br"], "br"
+        elif request.accept_encodings["gzip"]:
+            body, content_encoding = encoded["gzip"], "gzip"
+        else:
+            body, content_encoding = encoded["json"], None
+        response = Response(body, mimetype="application/json")
+        if content_encoding is not None:
+            response.headers["Content-Encoding"] = content_encoding
+    response.set_etag(encoded["etag"])
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "public, max-age=" + str(max_age)
+    if immutable:
+        response.headers["Cache-Control"] += ", immutable"
+    return response
+
+
+def register_layout_route(server, rule, layout_getter, endpoint=None, max_age=0):
+    """Serve encoded layouts from a Flask server
+
+    Add a route on the Flask server (for a Dash app: `app.server`) returning the precompressed
+    layout, see `layout_response()`.
+
+    :parameter server: Flask server
+    :type server: flask.Flask
+    :parameter rule: URL rule of the route, for example `"/layout/sidebar/<round_number>/<tab>"`
+    :type rule: str
+    :parameter layout_getter: Function called with the URL rule variables as keyword arguments
+        and returning an encoded layout (output of `encode_layout()` or `build_encoded()`)
+    :type layout_getter: function
+    :parameter endpoint: Name of the endpoint, if `None` (default), the name of `layout_getter`
+    :type endpoint: str | None
+    :parameter max_age: Value of the `max-age` directive of the Cache-Control header
+    :type max_age: int
+    :return: None
+    """
+    if endpoint is None:
+        endpoint = layout_getter.__name__
+
+    def view(**kwargs):
+        return layout_response(layout_getter(**kwargs), max_age=max_age)
+
+    server.add_url_rule(rule, endpoint=endpoint, view_func=view)
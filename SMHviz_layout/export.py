@@ -0,0 +1,267 @@
+import argparse
+import html as html_lib
+import json
+import os
+import re
+
+from dash import dcc
+
+from SMHviz_layout.build import load_config
+from SMHviz_layout.metadata_content import list_abstracts, make_dt_metadata, render_abstract
+from SMHviz_layout.notes_definition import make_notes_definition
+from SMHviz_layout.serialize import to_json
+
+try:
+    import markdown
+    from markdown.treeprocessors import Treeprocessor
+except ImportError:
+    markdown = None
+    Treeprocessor = object
+
+_VOID_TAGS = ["area", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source",
+              "track", "wbr"]
+_ATTRIBUTES = {"className": "class", "htmlFor": "for", "colSpan": "colspan",
+               "rowSpan": "rowspan", "tabIndex": "tabindex"}
+_SKIPPED_PROPS = ["children", "style", "n_clicks", "n_clicks_timestamp", "disable_n_clicks",
+                  "loading_state", "setProps"]
+_SAFE_SCHEMES = ["http", "https", "mailto", "tel"]
+
+
+class _SafeUrls(Treeprocessor):
+    # same as the Markdown component of the app: links and images with a script (or any other
+    # non web) URL are kept without the URL
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ["href", "src"]:
+                url = element.get(attribute)
+                if url is None:
+                    continue
+                scheme = re.match(r"\s*([a-zA-Z][a-zA-Z0-9+.-]*):", url)
+                if scheme is not None and scheme.group(1).lower() not in _SAFE_SCHEMES:
+                    element.set(attribute, "")
+
+
+def _css(style):
+    return ";".join(re.sub("([A-Z])", lambda x: "-" + x.group(1).lower(), k) + ":" + str(v)
+                    for k, v in style.items())
+
+
+def _attributes(props, style=None):
+    attributes = ""
+    for prop, value in props.items():
+        if prop in _SKIPPED_PROPS or value is None or value is False:
+            continue
+        name = _ATTRIBUTES.get(prop, prop)
+        if value is True:
+            attributes += " " + name
+        else:
+            attributes += " " + name + '="' + html_lib.escape(str(value)) + '"'
+    if style is None:
+        style = props.get("style")
+    if style:
+        attributes += ' style="' + html_lib.escape(_css(style)) + '"'
+    return attributes
+
+
+def _markdown(props):
+    text = props.get("children") or ""
+    if isinstance(text, list):
+        text = "\n".join(text)
+    if markdown is not None:
+        md = markdown.Markdown(extensions=["tables", "fenced_code"])
+        md.treeprocessors.register(_SafeUrls(md), "safe_urls", 0)
+        if props.get("dangerously_allow_html") is not True:
+            # as the Markdown component of the app, the raw HTML is rendered as text
+            md.preprocessors.deregister("html_block")
+            md.inlinePatterns.deregister("html")
+        content = md.convert(text)
+    else:
+        # without the optional markdown package: paragraphs of escaped text
+        content = "".join("<p>" + html_lib.escape(i.strip()).replace("\n", "<br>") + "</p>"
+                          for i in re.split(r"\n\s*\n", text) if i.strip())
+    return "<div" + _attributes({"id": props.get("id"), "className": props.get("className")},
+                                props.get("style")) + ">" + content + "</div>"
+
+
+def _table(props):
+    columns = props.get("columns") or [{"id": i, "name": i} for i in (props.get("data") or [{}])[0]]
+    cell_style = dict(props.get("style_cell") or dict())
+    header = "".join("<th" + _attributes({}, dict(cell_style, **(props.get("style_header") or {})))
+                     + ">" + html_lib.escape(str(i["name"])) + "</th>" for i in columns)
+    column_style = dict()
+    for i in props.get("style_cell_conditional") or []:
+        column_id = i.get("if", dict()).get("column_id")
+        if column_id is not None:
+            column_style[column_id] = {k: v for k, v in i.items() if k != "if"}
+    rows = list()
+    for row in props.get("data") or []:
+        cells = ""
+        for i in columns:
+            style = dict(cell_style, **(props.get("style_data") or {}))
+            style.update(column_style.get(i["id"], dict()))
+            value = row.get(i["id"])
+            cells += ("<td" + _attributes({}, style) + ">" +
+                      html_lib.escape("" if value is None else str(value)) + "</td>")
+        rows.append("<tr>" + cells + "</tr>")
+    return ("<table" + _attributes({"id": props.get("id")}) + "><thead><tr>" + header +
+            "</tr></thead><tbody>" + "".join(rows) + "</tbody></table>")
+
+
+def _render(node):
+    if node is None:
+        return ""
+    if isinstance(node, list):
+        return "".join(_render(i) for i in node)
+    if not isinstance(node, dict):
+        return html_lib.escape(str(node))
+    props = node.get("props", dict())
+    if node.get("namespace") == "dash_html_components":
+        tag = node["type"].lower()
+        if tag in _VOID_TAGS:
+            return "<" + tag + _attributes(props) + ">"
+        return ("<" + tag + _attributes(props) + ">" + _render(props.get("children")) + "</" +
+                tag + ">")
+    if node.get("type") == "Markdown":
+        return _markdown(props)
+    if node.get("type") == "DataTable":
+        return _table(props)
+    raise ValueError("Component not supported in static HTML (needs a callback or a Dash "
+                     "renderer): " + str(node.get("namespace")) + "." + str(node.get("type")))
+
+
+def render_html(component):
+    """Render a layout component in static HTML
+
+    Render a non-interactive layout (for example the output of `make_notes_definition()`,
+    `make_dt_metadata()` or `render_abstract()`) in an HTML fragment: the HTML components are
+    rendered as the associated HTML elements, the Markdown components are converted in HTML (with
+    the optional `markdown` package, else as paragraphs of text) and the DataTable components are
+    rendered as HTML tables. Any other component raises a ValueError. As in the app, the raw HTML
+    of the Markdown text is rendered as text (unless `dangerously_allow_html=True`) and the
+    script URLs of the links and images are removed.
+
+    :parameter component: Dash component or list of components
+    :type component: dash.development.base_component.Component | list
+    :return: the HTML fragment
+    """
+    return _render(json.loads(to_json(component)))
+
+
+def html_page(fragment, title, stylesheets=None, lang="en"):
+    """Create a standalone HTML page
+
+    :parameter fragment: HTML fragment, output of `render_html()`
+    :type fragment: str
+    :parameter title: Title of the page
+    :type title: str
+    :parameter stylesheets: List of URL of CSS files to include (for example the CSS file of the
+        visualization website)
+    :type stylesheets: list | None
+    :parameter lang: Language of the page
+    :type lang: str
+    :return: the HTML page
+    """
+    links = "".join('<link rel="stylesheet" href="' + html_lib.escape(i) + '">'
+                    for i in (stylesheets or []))
+    return ('<!DOCTYPE html>\n<html lang="' + lang + '"><head><meta charset="utf-8">'
+            '<meta name="viewport" content="width=device-width, initial-scale=1">'
+            "<title>" + html_lib.escape(title) + "</title>" + links + "</head><body>" +
+            fragment + "</body></html>\n")
+
+
+def _write(filename, content):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temp_file = filename + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temp_file, filename)
+
+
+def export_static(config, output_dir, stylesheets=None, fragment=False,
+                  pattern="\d{4}-\d{2}-\d{2}-|-(A|a)bstract.md"):
+    """Export the non-interactive pages of a hub in static HTML
+
+    Write in `output_dir`:
+        - `notes_definition.html`: notes and definitions (if `notes` in the configuration)
+        - `metadata.html`: metadata table (if `metadata_file` in the configuration)
+        - `abstracts/round<N>/<team_model>.html`: each abstract of each round, and
+          `abstracts/round<N>/index.html` the list of the abstracts of the round (if
+          `abstract_path` in the configuration)
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :parameter output_dir: Path to the output folder
+    :type output_dir: str
+    :parameter stylesheets: List of URL of CSS files to include in the pages
+    :type stylesheets: list | None
+    :parameter fragment: Boolean, to write HTML fragments instead of standalone pages
+    :type fragment: bool
+    :parameter pattern: pattern to extract team-model name from the abstract file, see
+        `make_abstract_tab()`
+    :type pattern: str
+    :return: list of the written files
+    """
+    written = list()
+
+    def write_page(name, component, title):
+        content = render_html(component)
+        if not fragment:
+            content = html_page(content, title, stylesheets=stylesheets)
+        filename = os.path.join(output_dir, name)
+        _write(filename, content)
+        written.append(filename)
+
+    if config.get("notes") is not None:
+        write_page("notes_definition.html", make_notes_definition(
+            dcc.Markdown(config["notes"].get("definitions", "")),
+            dcc.Markdown(config["notes"].get("notes_left", "")),
+            dcc.Markdown(config["notes"].get("notes_right", ""))), "Notes and Definitions")
+    if config.get("metadata_file") is not None:
+        write_page("metadata.html", make_dt_metadata(config["metadata_file"]), "Model Metadata")
+    if config.get("abstract_path") is not None:
+        for round_config in config["rounds"]:
+            round_number = round_config["round_number"]
+            round_path = config["abstract_path"] + "round" + str(round_number)
+            if not os.path.isdir(round_path):
+                continue
+            links = list()
+            for filename in list_abstracts(round_path):
+                round_date = re.match(r"\d{4}-\d{2}-\d{2}", filename).group()
+                team_model = re.sub(pattern, "", filename)
+                write_page(os.path.join("abstracts", "round" + str(round_number),
+                                        team_model + ".html"),
+                           render_abstract(round_number, round_date, team_model,
+                                           path=config["abstract_path"]),
+                           team_model + " - Round " + str(round_number))
+                links.append((team_model, team_model + ".html"))
+            index = ("<ul>" + "".join('<li><a href="' + html_lib.escape(link) + '">' +
+                                      html_lib.escape(name) + "</a></li>" for name, link in links)
+                     + "</ul>")
+            if not fragment:
+                index = html_page(index, "Abstracts - Round " + str(round_number),
+                                  stylesheets=stylesheets)
+            filename = os.path.join(output_dir, "abstracts", "round" + str(round_number),
+                                    "index.html")
+            _write(filename, index)
+            written.append(filename)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m SMHviz_layout.export",
+                                     description="Export the non-interactive pages of a hub in "
+                                                 "static HTML")
+    parser.add_argument("config", help="path to the JSON hub configuration file")
+    parser.add_argument("output", help="path to the output folder")
+    parser.add_argument("--stylesheet", action="append", default=None,
+                        help="URL of a CSS file to include in the pages (can be repeated)")
+    parser.add_argument("--fragment", action="store_true",
+                        help="write HTML fragments instead of standalone pages")
+    args = parser.parse_args(argv)
+    written = export_static(load_config(args.config), args.output, stylesheets=args.stylesheet,
+                            fragment=args.fragment)
+    print(str(len(written)) + " files written in " + args.output)
+
+
+if __name__ == "__main__":
+    main()
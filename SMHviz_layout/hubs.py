@@ -0,0 +1,263 @@
+import collections
+import hashlib
+import sys
+import threading
+import weakref
+
+import pandas as pd
+from dash import dcc
+
+from SMHviz_layout.build import load_config, round_plot_bar, round_sidebar, round_tab_names
+from SMHviz_layout.cache import clear_file_cache, file_cache_namespace
+from SMHviz_layout.encoding import encode_layout
+from SMHviz_layout.instrument import record_cache
+from SMHviz_layout.metadata_content import make_abstract_tab, make_dt_metadata
+from SMHviz_layout.notes_definition import make_notes_definition
+from SMHviz_layout.search import build_index
+from SMHviz_layout.singleflight import do
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+_HUBS = dict()
+# removed when the table is not used anymore (last hub using it unregistered)
+_SHARED = weakref.WeakValueDictionary()
+_LOCK = threading.Lock()
+
+
+def _deep_size(value, seen=None):
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(i, seen) for i in value)
+    return size
+
+
+def share_table(df):
+    """Store a table once across hubs
+
+    Return the stored table with the same content as `df` (same columns, index and values) if
+    any, else store and return `df`. The stored tables are shared between the hubs and should not
+    be modified, a table is removed when it is not used anymore (for example when the last hub
+    using it is unregistered).
+
+    :parameter df: Table, for example the location information
+    :type df: DataFrame
+    :return: the shared DataFrame
+    """
+    content_hash = hashlib.sha256()
+    content_hash.update(repr(list(df.columns)).encode("utf-8"))
+    content_hash.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    key = content_hash.hexdigest()
+    with _LOCK:
+        shared = _SHARED.get(key)
+        if shared is None:
+            _SHARED[key] = shared = df
+    return shared
+
+
+def register_hub(name, config, memory_cap=None):
+    """Register a hub
+
+    Register a hub configuration (for example COVID, flu, RSV), with its own cache of layouts and
+    abstracts index limited to `memory_cap` bytes (least recently used entries evicted first).
+    The location information is shared between hubs with the same locations (see
+    `share_table()`). The multi-pathogen plot bars (`multi_pathogen_bar()` and
+    `multi_pathogen_bar_comp()`) are configured by the `plot_bar` parameters of each hub.
+
+    The files read to build the layouts of the hub are stored in the hub namespace of the file
+    cache (if enabled, see `SMHviz_layout.cache.file_cache_namespace()`), with its own limit of
+    entries. The layouts are encoded without the process-wide encoding caches and the abstracts
+    index is stored in the hub cache, so the hubs do not remove each other's entries. The
+    process-wide caches used outside of the hub functions (`SMHviz_layout.encoding` keyed and
+    content hash caches, memory-mapped artifacts and `SMHviz_layout.search.load_index()`) are
+    shared by all the hubs.
+
+    :parameter name: Name of the hub (for example "covid")
+    :type name: str
+    :parameter config: Hub configuration or path to the JSON hub configuration file, see
+        `SMHviz_layout.build.load_config()`
+    :type config: dict | str
+    :parameter memory_cap: Maximum size in bytes of the cached entries of the hub, if `None`
+        (default), no limit
+    :type memory_cap: int | None
+    :return: None
+    """
+    if isinstance(config, str):
+        config = load_config(config)
+    config = dict(config)
+    config["location_info"] = share_table(config["location_info"])
+    hub = {"config": config, "memory_cap": memory_cap, "entries": collections.OrderedDict(),
+           "size": 0, "hits": 0, "misses": 0, "evictions": 0, "lock": threading.Lock()}
+    with _LOCK:
+        _HUBS[name] = hub
+
+
+def unregister_hub(name):
+    """Remove a hub and its cached entries
+
+    The cached entries of the hub, its namespace of the file cache and the shared tables not
+    used by another hub are removed.
+
+    :parameter name: Name of the hub
+    :type name: str
+    :return: None
+    """
+    with _LOCK:
+        _HUBS.pop(name, None)
+    clear_file_cache(_namespace(name))
+
+
+def _namespace(name):
+    return "hub/" + name
+
+
+def hub_config(name):
+    """Configuration of a registered hub
+
+    :parameter name: Name of the hub
+    :type name: str
+    :return: the hub configuration dictionary
+    """
+    return _HUBS[name]["config"]
+
+
+def clear_hub_cache(name=None):
+    """Remove the cached entries of a hub
+
+    :parameter name: Name of the hub, if `None` (default), the entries of all the hubs are removed
+    :type name: str | None
+    :return: None
+    """
+    names = list(_HUBS) if name is None else [name]
+    for i in names:
+        hub = _HUBS[i]
+        with hub["lock"]:
+            hub["entries"].clear()
+            hub["size"] = 0
+
+
+def hub_cached(name, key, func, *args, **kwargs):
+    """Cached value of a hub
+
+    Return the value stored under `key` in the cache of the hub, or run `func(*args, **kwargs)`,
+    store its output (evicting the least recently used entries of the hub above its memory cap)
+    and return it. Concurrent calls for the same hub and key run `func` only once.
+
+    :parameter name: Name of the hub
+    :type name: str
+    :parameter key: Hashable key of the value in the hub cache
+    :type key: tuple | str
+    :parameter func: Function creating the value
+    :type func: function
+    :parameter args: Positional arguments of the function
+    :parameter kwargs: Keyword arguments of the function
+    :return: the cached value
+    """
+    hub = _HUBS[name]
+    with hub["lock"]:
+        entry = hub["entries"].get(key)
+        if entry is not None:
+            hub["entries"].move_to_end(key)
+            hub["hits"] += 1
+        else:
+            hub["misses"] += 1
+    record_cache("hub_" + name, entry is not None)
+    if entry is not None:
+        return entry[0]
+    with file_cache_namespace(_namespace(name)):
+        value = do(("hub", name, key), func, *args, **kwargs)
+    size = _deep_size(value)
+    with hub["lock"]:
+        if hub["memory_cap"] is not None and size > hub["memory_cap"]:
+            return value
+        if key not in hub["entries"]:
+            hub["entries"][key] = (value, size)
+            hub["size"] += size
+        while hub["memory_cap"] is not None and hub["size"] > hub["memory_cap"]:
+            evicted_size = hub["entries"].popitem(last=False)[1][1]
+            hub["size"] -= evicted_size
+            hub["evictions"] += 1
+    return value
+
+
+def _hub_component(config, kind, round_number, tab):
+    round_config = None
+    if round_number is not None:
+        round_config = [i for i in config["rounds"]
+                        if str(i["round_number"]) == str(round_number)][0]
+    if kind == "round_tab":
+        return make_round_tab(round_tab_names(config), window=config.get("round_window"))
+    if kind == "notes_definition":
+        return make_notes_definition(dcc.Markdown(config["notes"].get("definitions", "")),
+                                     dcc.Markdown(config["notes"].get("notes_left", "")),
+                                     dcc.Markdown(config["notes"].get("notes_right", "")))
+    if kind == "dt_metadata":
+        return make_dt_metadata(config["metadata_file"])
+    if kind == "tab_plots":
+        return make_tab_plots(round_config["tabs"], config["tab_name_dict"])
+    if kind == "abstract_tab":
+        return make_abstract_tab(round_config["round_number"], path=config["abstract_path"])
+    if kind == "sidebar":
+        return round_sidebar(config, round_config, tab)
+    if kind == "plot_bar":
+        return round_plot_bar(config, round_config, tab)
+    raise ValueError("Unknown layout kind: " + str(kind))
+
+
+def _hub_encoded(config, kind, round_number, tab):
+    return encode_layout(_hub_component(config, kind, round_number, tab), cache=False)
+
+
+def hub_layout(name, kind, round_number=None, tab=None):
+    """Encoded layout of a hub
+
+    Build (once, then from the hub cache) a layout of a registered hub and return its encoded
+    output, see `SMHviz_layout.encoding.encode_layout()` and
+    `SMHviz_layout.encoding.layout_response()`.
+
+    :parameter name: Name of the hub
+    :type name: str
+    :parameter kind: Type of layout: "round_tab", "notes_definition", "dt_metadata", "tab_plots",
+        "abstract_tab" (by round), "sidebar" or "plot_bar" (by round and plot tab)
+    :type kind: str
+    :parameter round_number: Numeric identifier of the round (for the round specific layouts)
+    :type round_number: str | int | None
+    :parameter tab: Internal id of the plot tab (for the sidebar and plot bar)
+    :type tab: str | None
+    :return: the encoded layout, dictionary with the keys `json`, `gzip`, `br` and `etag`
+    """
+    key = ("layout", kind, None if round_number is None else str(round_number), tab)
+    return hub_cached(name, key, _hub_encoded, hub_config(name), kind, round_number, tab)
+
+
+def hub_search_index(name):
+    """Abstracts index of a hub
+
+    :parameter name: Name of the hub
+    :type name: str
+    :return: the abstracts index of the hub (from the hub cache), see
+        `SMHviz_layout.search.build_index()`
+    """
+    return hub_cached(name, ("search_index",), build_index, hub_config(name)["abstract_path"])
+
+
+def hub_stats():
+    """Cache statistics of the registered hubs
+
+    :return: a dictionary with the hub name (key) and a dictionary with the keys: `entries`,
+        `size` (bytes), `memory_cap`, `hits`, `misses` and `evictions` (value)
+    """
+    stats = dict()
+    for name, hub in list(_HUBS.items()):
+        with hub["lock"]:
+            stats[name] = {"entries": len(hub["entries"]), "size": hub["size"],
+                           "memory_cap": hub["memory_cap"], "hits": hub["hits"],
+                           "misses": hub["misses"], "evictions": hub["evictions"]}
+    return stats
@@ -0,0 +1,118 @@
+from dash import dcc, html
+
+from SMHviz_layout.build import round_plot_bar, round_sidebar, round_tab_names
+from SMHviz_layout.payload import payload_breakdown
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+
+def _default_content(config, round_config, tab, sidebar, plot_bar):
+    return [sidebar, plot_bar]
+
+
+def rendered_outputs(component):
+    """Properties set in a layout
+
+    :parameter component: Dash component or list of components
+    :type component: dash.development.base_component.Component | list
+    :return: a set of `"<component id>.<property>"` character strings, for each property set in
+        a component with an id
+    """
+    outputs = set()
+    for node in payload_breakdown(component):
+        if node["id"] is None or not isinstance(node["id"], str):
+            continue
+        for prop in node["props"]:
+            if prop != "id":
+                outputs.add(node["id"] + "." + prop)
+    return outputs
+
+
+def make_hydrated_layout(config, round_number=None, tab=None, render_content=None,
+                         round_tab_id="tabs-round", round_content_id="round_tabs-content",
+                         tab_id_name="tabs-plot", tab_content_id="plot_tabs-content"):
+    """Create the server-side rendered initial layout
+
+    Create the layout of the default round and plot tab with the round tabs, the plot tabs and
+    the plot tab content (sidebar, plot bar and, with `render_content`, figure) already
+    populated, with the `prevent_initial_call` value of the callbacks: a callback with all its
+    outputs already rendered in the layout does not need to run on page load.
+
+    The round and plot tab components ids should match the ids used in the app callbacks.
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :parameter round_number: Numeric identifier of the default round, if `None` (default), the
+        `default_round` value of the configuration or, if missing, the last round
+    :type round_number: str | int | None
+    :parameter tab: Internal id of the default plot tab, if `None` (default), the first tab of
+        the round
+    :type tab: str | None
+    :parameter render_content: Function called with the parameters: `config`, `round_config`,
+        `tab`, `sidebar` and `plot_bar` and returning the content of the plot tab (for example,
+        with the figure of the default selection), if `None` (default), the sidebar and plot bar
+    :type render_content: function | None
+    :parameter round_tab_id: Id of the round Tabs component
+    :type round_tab_id: str
+    :parameter round_content_id: Id of the round content component (containing the plot tabs)
+    :type round_content_id: str
+    :parameter tab_id_name: Id of the plot Tabs component, see `make_tab_plots()`
+    :type tab_id_name: str
+    :parameter tab_content_id: Id of the plot tab content component, see `make_tab_plots()`
+    :type tab_content_id: str
+    :return: a dictionary with the keys: `layout` (Div component), `round_number`, `tab` and
+        `prevent_initial_call` (dictionary with `"<component id>.<property>"` keys and `True`
+        value for each property already rendered in the layout, see `prevent_initial_call()`)
+    """
+    if round_number is None:
+        round_number = config.get("default_round")
+    if round_number is None:
+        round_config = config["rounds"][-1]
+    else:
+        round_config = [i for i in config["rounds"]
+                        if str(i["round_number"]) == str(round_number)][0]
+    if tab is None:
+        tab = round_config["tabs"][0]
+    if render_content is None:
+        render_content = _default_content
+    round_names = round_tab_names(config)
+    round_name = round_names[config["rounds"].index(round_config)]
+    content = render_content(config, round_config, tab, round_sidebar(config, round_config, tab),
+                             round_plot_bar(config, round_config, tab))
+    tab_plots = make_tab_plots(round_config["tabs"], config["tab_name_dict"], plot_sel=tab,
+                               tab_id_name=tab_id_name, tab_content_id=tab_content_id,
+                               content=content)
+    round_tabs = make_round_tab(round_names, window=config.get("round_window"),
+                                round_sel=round_name)
+    round_value = round_name
+    if round_name not in [i.value for i in round_tabs]:
+        round_value = round_tabs[0].value
+    layout = html.Div([
+        dcc.Tabs(id=round_tab_id, value=round_value, children=round_tabs),
+        html.Div(tab_plots, id=round_content_id)
+    ])
+    return {"layout": layout, "round_number": round_config["round_number"], "tab": tab,
+            "prevent_initial_call": dict.fromkeys(sorted(rendered_outputs(layout)), True)}
+
+
+def prevent_initial_call(hydrated, *outputs):
+    """`prevent_initial_call` value of a callback for a hydrated layout
+
+    Return `True` if all the outputs of the callback are already rendered in the hydrated layout,
+    for example:
+
+        @app.callback(Output("plot_tabs-content", "children"), Input("tabs-plot", "value"),
+                      prevent_initial_call=prevent_initial_call(
+                          hydrated, Output("plot_tabs-content", "children")))
+
+    :parameter hydrated: Output of `make_hydrated_layout()`
+    :type hydrated: dict
+    :parameter outputs: Outputs of the callback, as `"<component id>.<property>"` character strings
+        or `dash.Output` objects
+    :return: a boolean
+    """
+    keys = list()
+    for i in outputs:
+        if not isinstance(i, str):
+            i = str(i.component_id) + "." + i.component_property
+        keys.append(i)
+    return len(keys) > 0 and all(hydrated["prevent_initial_call"].get(i, False) for i in keys)
@@ -0,0 +1,298 @@
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+
+from SMHviz_layout.profiling import profile_call, profiling_enabled
+from SMHviz_layout.serialize import to_json_bytes
+
+TIME_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+
+_SETTINGS = {"enabled": os.environ.get("SMHVIZ_INSTRUMENT", "") not in ["", "0"],
+             "output_size": os.environ.get("SMHVIZ_INSTRUMENT_SIZE", "1") != "0"}
+_BUILDERS = dict()
+_CACHES = dict()
+_LABEL_NAMES = dict()
+_LOCK = threading.Lock()
+# (layout function name, label) of the outermost instrumented call running in the context
+_CURRENT = contextvars.ContextVar("smh_current_builder", default=None)
+
+
+def enable_instrumentation(output_size=True):
+    """Enable the instrumentation of the layout functions
+
+    The instrumentation can also be enabled with the environment variable `SMHVIZ_INSTRUMENT=1`
+    (and `SMHVIZ_INSTRUMENT_SIZE=0` to not record the output size).
+
+    :parameter output_size: Boolean, to record the serialized output size of each call (requires
+        to serialize each output)
+    :type output_size: bool
+    :return: None
+    """
+    _SETTINGS["output_size"] = output_size
+    _SETTINGS["enabled"] = True
+
+
+def disable_instrumentation():
+    """Disable the instrumentation of the layout functions
+
+    :return: None
+    """
+    _SETTINGS["enabled"] = False
+
+
+def reset_stats():
+    """Remove all the recorded statistics
+
+    :return: None
+    """
+    with _LOCK:
+        _BUILDERS.clear()
+        _CACHES.clear()
+
+
+def _builder_stats(builder, label):
+    key = (builder, label)
+    entry = _BUILDERS.get(key)
+    if entry is None:
+        entry = {"calls": 0, "errors": 0, "time_sum": 0.0,
+                 "time_buckets": [0] * (len(TIME_BUCKETS) + 1), "file_reads": 0,
+                 "output_bytes": 0, "output_count": 0}
+        _BUILDERS[key] = entry
+    return entry
+
+
+def _current():
+    current = _CURRENT.get()
+    if current is None:
+        return "", ""
+    return current
+
+
+def record_file_read(count=1):
+    """Record file read(s) of the layout function currently running
+
+    :parameter count: Number of file reads
+    :type count: int
+    :return: None
+    """
+    if _SETTINGS["enabled"]:
+        builder, label = _current()
+        with _LOCK:
+            _builder_stats(builder, label)["file_reads"] += count
+
+
+def record_cache(cache, hit):
+    """Record a cache hit or miss
+
+    The cache access is associated with the layout function currently running (if any).
+
+    :parameter cache: Name of the cache
+    :type cache: str
+    :parameter hit: Boolean, `True` for a cache hit, `False` for a cache miss
+    :type hit: bool
+    :return: None
+    """
+    if _SETTINGS["enabled"]:
+        key = (cache,) + _current()
+        with _LOCK:
+            entry = _CACHES.setdefault(key, {"hit": 0, "miss": 0})
+            entry["hit" if hit else "miss"] += 1
+
+
+def _record_call(name, label, duration, output):
+    size = None
+    if _SETTINGS["output_size"]:
+        size = len(to_json_bytes(output))
+    with _LOCK:
+        entry = _builder_stats(name, label)
+        entry["calls"] += 1
+        entry["time_sum"] += duration
+        bucket = len(TIME_BUCKETS)
+        for i, bound in enumerate(TIME_BUCKETS):
+            if duration <= bound:
+                bucket = i
+                break
+        entry["time_buckets"][bucket] += 1
+        if size is not None:
+            entry["output_bytes"] += size
+            entry["output_count"] += 1
+
+
+def _record_error(name, label):
+    with _LOCK:
+        _builder_stats(name, label)["errors"] += 1
+
+
+def instrumented(label_arg=None):
+    """Decorator to instrument a layout function
+
+    When the instrumentation is enabled, record for each call of the layout function: the call
+    count, the wall time, the file reads, the cache accesses and the serialized output size,
+    labeled by layout function name and by the value of the `label_arg` parameter (for example:
+    `"tab"`). A call inside another instrumented call (for example `location_selection()` called
+    by `make_sidebar()`) is not recorded separately: its wall time, file reads and cache accesses
+    are counted in the outermost call only, and only the output of the outermost call is
+    serialized to record its size. When the profiling of the layout function is enabled, the
+    sampled calls are profiled, see `SMHviz_layout.profiling.configure_profiling()` (synchronous
+    layout functions only).
+
+    :parameter label_arg: Name of the layout function parameter used as label, if `None` no label
+    :type label_arg: str | None
+    :return: the decorator
+    """
+    def decorator(builder):
+        name = builder.__name__
+        position = None
+        if label_arg is not None:
+            position = list(inspect.signature(builder).parameters).index(label_arg)
+            _LABEL_NAMES[name] = label_arg
+
+        def get_label(args, kwargs):
+            label = ""
+            if label_arg is not None:
+                if label_arg in kwargs:
+                    label = str(kwargs[label_arg])
+                elif position < len(args):
+                    label = str(args[position])
+            return label
+
+        if inspect.iscoroutinefunction(builder):
+            @functools.wraps(builder)
+            async def async_wrapper(*args, **kwargs):
+                if not _SETTINGS["enabled"] or _CURRENT.get() is not None:
+                    return await builder(*args, **kwargs)
+                label = get_label(args, kwargs)
+                token = _CURRENT.set((name, label))
+                start = time.perf_counter()
+                try:
+                    output = await builder(*args, **kwargs)
+                except Exception:
+                    _record_error(name, label)
+                    raise
+                finally:
+                    duration = time.perf_counter() - start
+                    _CURRENT.reset(token)
+                _record_call(name, label, duration, output)
+                return output
+
+            return async_wrapper
+
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            if not _SETTINGS["enabled"] or _CURRENT.get() is not None:
+                if profiling_enabled():
+                    return profile_call(name, builder, args, kwargs)
+                return builder(*args, **kwargs)
+            label = get_label(args, kwargs)
+            token = _CURRENT.set((name, label))
+            start = time.perf_counter()
+            try:
+                if profiling_enabled():
+                    output = profile_call(name, builder, args, kwargs)
+                else:
+                    output = builder(*args, **kwargs)
+            except Exception:
+                _record_error(name, label)
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                _CURRENT.reset(token)
+            _record_call(name, label, duration, output)
+            return output
+
+        return wrapper
+
+    return decorator
+
+
+def stats():
+    """Recorded statistics of the layout functions
+
+    :return: a dictionary with the keys:
+        - `builders`: dictionary by layout function name and label, with the call count
+          (`calls`), failed call count (`errors`), total wall time in seconds (`time_sum`), wall
+          time histogram (`time_buckets`, dictionary upper bound: count), file reads
+          (`file_reads`) and total serialized output size in bytes (`output_bytes`)
+        - `caches`: dictionary by cache name, layout function name and label, with the number of
+          hits (`hit`) and misses (`miss`)
+    """
+    output = {"builders": dict(), "caches": dict()}
+    with _LOCK:
+        for (builder, label), entry in _BUILDERS.items():
+            buckets = dict()
+            cumulative = 0
+            for bound, count in zip(TIME_BUCKETS + ["+Inf"], entry["time_buckets"]):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            output["builders"].setdefault(builder, dict())[label] = {
+                "calls": entry["calls"], "errors": entry["errors"], "time_sum": entry["time_sum"],
+                "time_buckets": buckets, "file_reads": entry["file_reads"],
+                "output_bytes": entry["output_bytes"]}
+        for (cache, builder, label), entry in _CACHES.items():
+            output["caches"].setdefault(cache, dict()).setdefault(builder, dict())[label] = \
+                dict(entry)
+    return output
+
+
+def _labels(builder, label, **kwargs):
+    # label of the layout function named as its parameter (for example "tab" or "plot_tab"), no
+    # label for the layout functions without label parameter
+    kwargs = dict(builder=builder, **kwargs)
+    if _LABEL_NAMES.get(builder) is not None:
+        kwargs[_LABEL_NAMES[builder]] = label
+    labels = list()
+    for key, value in kwargs.items():
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        labels.append(key + "=\"" + value + "\"")
+    return "{" + ",".join(labels) + "}"
+
+
+def render_prometheus(prefix="smhviz"):
+    """Render the recorded statistics in the Prometheus text format
+
+    :parameter prefix: Prefix of the metric names
+    :type prefix: str
+    :return: a character string in the Prometheus text exposition format
+    """
+    data = stats()
+    lines = list()
+    metrics = [
+        ("builder_calls_total", "counter", "Number of layout function calls", "calls"),
+        ("builder_errors_total", "counter", "Number of failed layout function calls", "errors"),
+        ("builder_file_reads_total", "counter", "Number of files read by the layout functions",
+         "file_reads"),
+        ("builder_output_bytes_total", "counter",
+         "Total serialized output size of the layout functions", "output_bytes")
+    ]
+    for metric, metric_type, description, key in metrics:
+        lines.append("# HELP " + prefix + "_" + metric + " " + description)
+        lines.append("# TYPE " + prefix + "_" + metric + " " + metric_type)
+        for builder, builder_stats in data["builders"].items():
+            for label, entry in builder_stats.items():
+                lines.append(prefix + "_" + metric + _labels(builder, label) + " " +
+                             str(entry[key]))
+    metric = prefix + "_builder_duration_seconds"
+    lines.append("# HELP " + metric + " Wall time of the layout functions")
+    lines.append("# TYPE " + metric + " histogram")
+    for builder, builder_stats in data["builders"].items():
+        for label, entry in builder_stats.items():
+            for bound, count in entry["time_buckets"].items():
+                lines.append(metric + "_bucket" + _labels(builder, label, le=bound) + " " +
+                             str(count))
+            lines.append(metric + "_sum" + _labels(builder, label) + " " +
+                         repr(entry["time_sum"]))
+            lines.append(metric + "_count" + _labels(builder, label) + " " +
+                         str(entry["calls"]))
+    metric = prefix + "_cache_requests_total"
+    lines.append("# HELP " + metric + " Number of cache hits and misses")
+    lines.append("# TYPE " + metric + " counter")
+    for cache, cache_stats in data["caches"].items():
+        for builder, builder_stats in cache_stats.items():
+            for label, entry in builder_stats.items():
+                for result in ["hit", "miss"]:
+                    lines.append(metric + _labels(builder, label, cache=cache, result=result) +
+                                 " " + str(entry[result]))
+    return "\n".join(lines) + "\n"
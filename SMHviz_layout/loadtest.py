@@ -0,0 +1,444 @@
+"""Load test of a Dash app using the layout functions
+
+Start a minimal Dash app built with the layout functions on a synthetic (or existing) hub and
+replay a traffic mix (page loads, round switches, plot tab switches, abstract browsing, metadata
+paging and notes pages) from concurrent simulated clients, then report the latency percentiles and
+throughput of each callback, usage:
+
+    python -m SMHviz_layout.loadtest [--clients 16] [--duration 30] [--scale small]
+        [--config hub_config.json] [--server] [--url http://127.0.0.1:8050] [--output results.json]
+
+By default the requests are sent in-process with the Flask test client; with `--server` the app
+is served by a local threaded HTTP server; with `--url` the requests are sent to an app already
+running locally, for example with several workers:
+
+    gunicorn -w 4 -b 127.0.0.1:8050 "SMHviz_layout.loadtest:create_server('hub_config.json')"
+"""
+import argparse
+import http.client
+import json
+import random
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from dash import Dash, Input, Output, State, dcc, html
+
+from SMHviz_layout.benchmark import SCALES
+from SMHviz_layout.build import load_config, round_plot_bar, round_sidebar, round_tab_names
+from SMHviz_layout.metadata_content import make_abstract_tab, make_dt_metadata, render_abstract
+from SMHviz_layout.notes_definition import make_notes_definition
+from SMHviz_layout.synthetic import make_hub
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+TRAFFIC_MIX = {
+    "page_load": 0.05,
+    "round_switch": 0.15,
+    "tab_switch": 0.45,
+    "abstract": 0.2,
+    "metadata": 0.1,
+    "notes": 0.05,
+}
+METADATA_PAGE_SIZE = 10
+
+
+def _round_config(config, round_name):
+    return config["rounds"][round_tab_names(config).index(round_name)]
+
+
+def create_app(config):
+    """Create a minimal Dash app on a hub
+
+    The app contains a page selector (visualization, abstracts, metadata, notes and definitions),
+    the round tabs and, for the visualization page, the plot tabs with the sidebar and plot bar
+    of the selected round and plot tab. All the content is created by the layout functions in
+    the callbacks. The metadata table (id: `metadata-table`) is paginated on the server,
+    `METADATA_PAGE_SIZE` rows per page.
+
+    :parameter config: Hub configuration or path to the JSON hub configuration file, see
+        `SMHviz_layout.build.load_config()`
+    :type config: dict | str
+    :return: the Dash app
+    """
+    if isinstance(config, str):
+        config = load_config(config)
+    round_names = round_tab_names(config)
+    app = Dash(__name__, suppress_callback_exceptions=True)
+    app.layout = html.Div([
+        dcc.Tabs(id="tabs-page", value="visualization", children=[
+            dcc.Tab(label=i.title(), value=i)
+            for i in ["visualization", "abstracts", "metadata", "notes"]]),
+        dcc.Tabs(id="tabs-round", value=round_names[-1],
+                 children=make_round_tab(round_names)),
+        html.Div(id="round_tabs-content")
+    ])
+
+    @app.callback(Output("round_tabs-content", "children"), Input("tabs-page", "value"),
+                  Input("tabs-round", "value"))
+    def update_page(page, round_name):
+        round_config = _round_config(config, round_name)
+        if page == "abstracts":
+            return make_abstract_tab(round_config["round_number"], path=config["abstract_path"])
+        if page == "metadata":
+            return _metadata_page(config, 0)
+        if page == "notes":
+            return make_notes_definition(dcc.Markdown(config["notes"].get("definitions", "")),
+                                         dcc.Markdown(config["notes"].get("notes_left", "")),
+                                         dcc.Markdown(config["notes"].get("notes_right", "")))
+        return make_tab_plots(round_config["tabs"], config["tab_name_dict"])
+
+    @app.callback(Output("plot_tabs-content", "children"), Input("tabs-plot", "value"),
+                  State("tabs-round", "value"))
+    def update_tab(tab, round_name):
+        round_config = _round_config(config, round_name)
+        return [round_sidebar(config, round_config, tab),
+                round_plot_bar(config, round_config, tab)]
+
+    @app.callback(Output("metadata-table", "data"), Input("metadata-table", "page_current"),
+                  prevent_initial_call=True)
+    def update_metadata_page(page_current):
+        return _metadata_page(config, page_current or 0).data
+
+    @app.callback(Output("abstract-output", "children"), Input("abstract-dropdown", "value"),
+                  State("tabs-round", "value"))
+    def update_abstract(team_model, round_name):
+        round_config = _round_config(config, round_name)
+        return render_abstract(round_config["round_number"], round_config["round_date"],
+                               team_model, path=config["abstract_path"])
+
+    return app
+
+
+def _metadata_page(config, page_current):
+    table = make_dt_metadata(config["metadata_file"])
+    n_rows = len(table.data)
+    table.data = table.data[page_current * METADATA_PAGE_SIZE:
+                            (page_current + 1) * METADATA_PAGE_SIZE]
+    table.id = "metadata-table"
+    table.page_action = "custom"
+    table.page_current = page_current
+    table.page_size = METADATA_PAGE_SIZE
+    table.page_count = max(-(-n_rows // METADATA_PAGE_SIZE), 1)
+    return table
+
+
+def create_server(config):
+    """Flask server of the load test app
+
+    Entry point for a WSGI server, for example:
+    `gunicorn -w 4 "SMHviz_layout.loadtest:create_server('hub_config.json')"`
+
+    :parameter config: Hub configuration or path to the JSON hub configuration file
+    :type config: dict | str
+    :return: the Flask server of the app created by `create_app()`
+    """
+    return create_app(config).server
+
+
+def _callback_body(output, inputs, state=None, changed=None):
+    def props(values):
+        return [{"id": i.split(".")[0], "property": i.split(".")[1], "value": v}
+                for i, v in values]
+    return {"output": output,
+            "outputs": {"id": output.split(".")[0], "property": output.split(".")[1]},
+            "inputs": props(inputs), "state": props(state or []),
+            "changedPropIds": [changed or inputs[0][0]]}
+
+
+def _page_request(page, round_name, changed):
+    return ("update_page", "POST", "/_dash-update-component",
+            _callback_body("round_tabs-content.children",
+                           [("tabs-page.value", page), ("tabs-round.value", round_name)],
+                           changed=changed))
+
+
+def traffic_plan(config):
+    """Requests of all the simulated user actions
+
+    Create, before the load test, the requests of each possible user action of the traffic mix
+    (one sequence for each round, plot tab, abstract and metadata page), so the simulated clients
+    do not run any layout function.
+
+    :parameter config: Hub configuration
+    :type config: dict
+    :return: a dictionary with the user action (keys of `TRAFFIC_MIX`) as key and the list of
+        the possible request sequences (see `traffic_requests()`) as value
+    """
+    round_names = round_tab_names(config)
+    n_rows = len(make_dt_metadata(config["metadata_file"]).data)
+    n_pages = max(-(-n_rows // METADATA_PAGE_SIZE), 1)
+    plan = {"page_load": [[("page_load", "GET", "/", None),
+                           ("layout", "GET", "/_dash-layout", None),
+                           _page_request("visualization", round_names[-1], None)]],
+            "round_switch": list(), "tab_switch": list(), "abstract": list(),
+            "metadata": list(), "notes": list()}
+    for round_name in round_names:
+        round_config = _round_config(config, round_name)
+        plan["round_switch"].append([_page_request("visualization", round_name,
+                                                   "tabs-round.value")])
+        plan["notes"].append([_page_request("notes", round_name, "tabs-page.value")])
+        for tab in round_config["tabs"]:
+            plan["tab_switch"].append([("update_tab", "POST", "/_dash-update-component",
+                                        _callback_body("plot_tabs-content.children",
+                                                       [("tabs-plot.value", tab)],
+                                                       state=[("tabs-round.value", round_name)]))])
+        abstracts = make_abstract_tab(round_config["round_number"],
+                                      path=config["abstract_path"]).children[0].options
+        for abstract in abstracts:
+            plan["abstract"].append([
+                _page_request("abstracts", round_name, "tabs-page.value"),
+                ("update_abstract", "POST", "/_dash-update-component",
+                 _callback_body("abstract-output.children", [("abstract-dropdown.value", abstract)],
+                                state=[("tabs-round.value", round_name)]))])
+        # metadata page, then paging to one of the next pages (if any)
+        plan["metadata"].append([_page_request("metadata", round_name, "tabs-page.value")])
+        for page in range(1, n_pages):
+            plan["metadata"].append([
+                _page_request("metadata", round_name, "tabs-page.value"),
+                ("metadata_page", "POST", "/_dash-update-component",
+                 _callback_body("metadata-table.data", [("metadata-table.page_current", page)]))])
+    return plan
+
+
+def traffic_requests(plan, rng, action):
+    """Requests of a simulated user action
+
+    :parameter plan: Requests of all the user actions, output of `traffic_plan()`
+    :type plan: dict
+    :parameter rng: Random generator
+    :type rng: random.Random
+    :parameter action: User action, one of the keys of `TRAFFIC_MIX`
+    :type action: str
+    :return: list of tuples (name, method, path, JSON body) of the requests sent by the browser
+    """
+    if action not in plan:
+        raise ValueError("Unknown action: " + str(action))
+    return rng.choice(plan[action])
+
+
+def _percentile(values, q):
+    if len(values) == 0:
+        return None
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    """Latency percentiles and throughput of each request type
+
+    :parameter latencies: Dictionary with the request name (key) and the list of latencies in
+        seconds (value)
+    :type latencies: dict
+    :parameter errors: Dictionary with the request name (key) and the number of errors (value)
+    :type errors: dict
+    :parameter elapsed: Duration of the load test in seconds
+    :type elapsed: float
+    :return: a dictionary with the request name (and `"total"`) as key and a dictionary with the
+        keys `count`, `errors`, `p50`, `p95`, `p99`, `max` (milliseconds) and `throughput`
+        (requests per second) as value
+    """
+    summary = dict()
+    names = sorted(set(latencies) | set(errors))
+    groups = [(name, latencies.get(name, list()), errors.get(name, 0)) for name in names]
+    groups.append(("total", [i for name in names for i in latencies.get(name, list())],
+                   sum(errors.values())))
+    for name, values, n_errors in groups:
+        values = sorted(values)
+        summary[name] = {"count": len(values), "errors": n_errors}
+        for q in [0.5, 0.95, 0.99, 1]:
+            value = _percentile(values, q)
+            if value is not None:
+                value = round(1000 * value, 2)
+            summary[name]["max" if q == 1 else "p" + str(int(q * 100))] = value
+        summary[name]["throughput"] = round(len(values) / elapsed, 2)
+    return summary
+
+
+def _test_client_sender(app):
+    client = app.server.test_client()
+
+    def send(method, path, body):
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+    return send
+
+
+def _http_sender(url):
+    parsed = urllib.parse.urlsplit(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=60)
+    prefix = parsed.path.rstrip("/")
+
+    def send(method, path, body):
+        headers = {"Accept-Encoding": "gzip"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        connection.request(method, prefix + path, body=payload, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    return send
+
+
+def run_loadtest(config, clients=16, duration=30, mix=None, app=None, url=None, seed=0,
+                 think_time=0):
+    """Run a load test
+
+    Run `clients` simulated clients concurrently for `duration` seconds, each one repeating user
+    actions drawn from the traffic mix and sending the associated requests (see
+    `traffic_plan()`, created before the clients start) either to the app `app` (Flask test
+    client) or to the URL `url`.
+
+    :parameter config: Hub configuration
+    :type config: dict
+    :parameter clients: Number of concurrent simulated clients
+    :type clients: int
+    :parameter duration: Duration of the load test in seconds
+    :type duration: float
+    :parameter mix: Dictionary with the user action (key) and its weight (value), if `None`
+        (default), `TRAFFIC_MIX`
+    :type mix: dict | None
+    :parameter app: Dash app (see `create_app()`), if `None` and `url` is `None`, the app is
+        created from the configuration
+    :type app: dash.Dash | None
+    :parameter url: URL of an app running locally (for example "http://127.0.0.1:8050")
+    :type url: str | None
+    :parameter seed: Seed of the random generators of the clients
+    :type seed: int
+    :parameter think_time: Pause in seconds between two user actions of a client
+    :type think_time: float
+    :return: the output of `summarize()`, with the test parameters in the key `parameters`
+    """
+    if mix is None:
+        mix = TRAFFIC_MIX
+    if url is None and app is None:
+        app = create_app(config)
+    plan = traffic_plan(config)
+    latencies = dict()
+    errors = dict()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(number):
+        rng = random.Random(seed * 100003 + number)
+        if url is None:
+            send = _test_client_sender(app)
+        else:
+            send = _http_sender(url)
+        local_latencies = dict()
+        local_errors = dict()
+        while time.perf_counter() < deadline:
+            action = rng.choices(list(mix), weights=list(mix.values()))[0]
+            for name, method, path, body in traffic_requests(plan, rng, action):
+                start = time.perf_counter()
+                try:
+                    status = send(method, path, body)
+                except Exception:
+                    status = None
+                latency = time.perf_counter() - start
+                if status == 200:
+                    local_latencies.setdefault(name, list()).append(latency)
+                else:
+                    local_errors[name] = local_errors.get(name, 0) + 1
+            if think_time > 0:
+                time.sleep(think_time)
+        with lock:
+            for name, values in local_latencies.items():
+                latencies.setdefault(name, list()).extend(values)
+            for name, count in local_errors.items():
+                errors[name] = errors.get(name, 0) + count
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = summarize(latencies, errors, time.perf_counter() - start)
+    summary["parameters"] = {"clients": clients, "duration": duration, "mix": mix,
+                             "url": url, "seed": seed, "think_time": think_time}
+    return summary
+
+
+def serve_app(app, host="127.0.0.1", port=0):
+    """Serve an app with a local threaded HTTP server
+
+    :parameter app: Dash app
+    :type app: dash.Dash
+    :parameter host: Host name, by default "127.0.0.1" (local only)
+    :type host: str
+    :parameter port: Port, if 0 (default), a free port
+    :type port: int
+    :return: a tuple (server, URL of the app), stop the server with `server.shutdown()`
+    """
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietRequestHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server(host, port, app.server, threaded=True,
+                         request_handler=QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://" + host + ":" + str(server.server_port)
+
+
+def _print_summary(summary):
+    print("{:<16}{:>8}{:>8}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+        "request", "count", "errors", "p50 ms", "p95 ms", "p99 ms", "max ms", "req/s"))
+    for name, values in summary.items():
+        if name == "parameters":
+            continue
+        print("{:<16}{:>8}{:>8}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+            name, values["count"], values["errors"], str(values.get("p50")),
+            str(values.get("p95")), str(values.get("p99")), str(values.get("max")),
+            str(values.get("throughput"))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m SMHviz_layout.loadtest",
+                                     description="Load test of a Dash app using the layout "
+                                                 "functions")
+    parser.add_argument("--config", default=None,
+                        help="path to the JSON hub configuration file (by default: synthetic hub)")
+    parser.add_argument("--scale", choices=list(SCALES), default="small",
+                        help="scale of the synthetic hub (by default: small)")
+    parser.add_argument("--clients", type=int, default=16, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="duration in seconds")
+    parser.add_argument("--think-time", type=float, default=0,
+                        help="pause in seconds between two actions of a client")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generators")
+    parser.add_argument("--server", action="store_true",
+                        help="serve the app with a local threaded HTTP server")
+    parser.add_argument("--url", default=None,
+                        help="URL of an app already running locally (see create_server())")
+    parser.add_argument("--output", default=None, help="path to a JSON output file")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as hub_dir:
+        if args.config is None:
+            config = load_config(make_hub(hub_dir, seed=args.seed, **SCALES[args.scale]))
+        else:
+            config = load_config(args.config)
+        server = None
+        url = args.url
+        app = None
+        if url is None:
+            app = create_app(config)
+            if args.server:
+                server, url = serve_app(app)
+        try:
+            summary = run_loadtest(config, clients=args.clients, duration=args.duration,
+                                   app=app, url=url, seed=args.seed, think_time=args.think_time)
+        finally:
+            if server is not None:
+                server.shutdown()
+    _print_summary(summary)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,30 @@
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 from dash import dash_table, html, dcc
 
+from SMHviz_layout.cache import cached_read
+from SMHviz_layout.instrument import instrumented, record_file_read
+from SMHviz_layout.singleflight import do_async
 
-def make_dt_metadata(metadata_file):
-    """Create the Data Table output
+_IO = {"executor": None, "max_workers": 4}
+_IO_LOCK = threading.Lock()
 
-    Output the table in a  DataTable format with the information for the metadata information
 
-    :parameter metadata_file: Path to the CSV file containing the metadata information
-    :type metadata_file: str
-    :return: the DataTable information
-    """
+def _load_metadata(metadata_file):
     df = pd.read_csv(metadata_file)
+    record_file_read()
+    return df
+
+
+def _read_metadata(metadata_file):
+    return cached_read("csv", metadata_file, _load_metadata)
+
+
+def _metadata_table(df):
     output = dash_table.DataTable(df.to_dict('records'), [{"name": i, "id": i} for i in df.columns],
                                   style_data={
                                       'whiteSpace': 'normal',
@@ -28,6 +38,135 @@ def make_dt_metadata(metadata_file):
     return output
 
 
+def _load_abstract_list(round_path):
+    file_list = os.listdir(round_path)
+    record_file_read()
+    return file_list
+
+
+def _list_abstracts(round_path):
+    return cached_read("listing", round_path, _load_abstract_list)
+
+
+def list_abstracts(round_path):
+    """List the abstract files of a round
+
+    List the files of a round folder following the SMH standard filename
+    `"YYYY-MM-DD-team_model-(A|a)bstract.md"` (see `render_abstract()`): the subfolders and the
+    files without the round date at the start of the filename are ignored.
+
+    :parameter round_path: Path to the folder containing the abstracts of a round (for example
+        `"PATH/TO/round13"`)
+    :type round_path: str
+    :return: the sorted list of the abstract filenames
+    """
+    return sorted(i for i in _list_abstracts(round_path)
+                  if re.match(r"\d{4}-\d{2}-\d{2}", i) is not None and
+                  os.path.isfile(os.path.join(round_path, i)))
+
+
+def _abstract_dropdown(file_list, id_append, pattern):
+    checkbox_list = list()
+    for i in file_list:
+        checkbox_entry = re.sub(pattern, "", i)
+        checkbox_list.append(checkbox_entry)
+    checkbox_list.sort()
+    output = html.Div([
+        dcc.Dropdown(
+            id='abstract' + id_append + '-dropdown', clearable=False,
+            options=checkbox_list, value=checkbox_list[0]),
+        html.Br(),
+        html.Div(id="abstract" + id_append + "-output")
+    ])
+    return output
+
+
+def _abstract_filename(round_number, round_date, team_model_name, path, file_append,
+                       file_extension):
+    if file_append is None:
+        filename = (path + "round" + str(round_number) + "/" + round_date + "-" + team_model_name +
+                    file_extension)
+    else:
+        for i in file_append:
+            filename = (path + "round" + str(round_number) + "/" + round_date + "-" +
+                        team_model_name + i + file_extension)
+            if os.path.isfile(filename):
+                break
+    return filename
+
+
+def _load_abstract(filename):
+    with open(filename, "r") as f:
+        markdown_text = f.read()
+    record_file_read()
+    return markdown_text
+
+
+def _read_abstract(filename):
+    return cached_read("text", filename, _load_abstract)
+
+
+def _find_and_read_abstract(round_number, round_date, team_model_name, path, file_append,
+                            file_extension):
+    return _read_abstract(_abstract_filename(round_number, round_date, team_model_name, path,
+                                             file_append, file_extension))
+
+
+def _abstract_div(markdown_text):
+    return html.Div([
+        dcc.Markdown(markdown_text)
+    ])
+
+
+def set_io_workers(max_workers):
+    """Set the number of threads used by the asynchronous layout functions
+
+    The asynchronous layout functions (`make_dt_metadata_async()`, `make_abstract_tab_async()`
+    and `render_abstract_async()`) run the blocking disk I/O in a bounded thread pool, 4 threads
+    by default.
+
+    :parameter max_workers: Maximum number of threads of the pool
+    :type max_workers: int
+    :return: None
+    """
+    with _IO_LOCK:
+        previous = _IO["executor"]
+        _IO["executor"] = None
+        _IO["max_workers"] = max_workers
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def _io_executor():
+    executor = _IO["executor"]
+    if executor is None:
+        with _IO_LOCK:
+            if _IO["executor"] is None:
+                _IO["executor"] = ThreadPoolExecutor(max_workers=_IO["max_workers"],
+                                                     thread_name_prefix="smhviz_io")
+            executor = _IO["executor"]
+    return executor
+
+
+async def _run_io(key, func, *args):
+    # Concurrent reads of the same file(s) share a single read
+    return await do_async(("metadata_content",) + key, func, *args, executor=_io_executor())
+
+
+@instrumented()
+def make_dt_metadata(metadata_file):
+    """Create the Data Table output
+
+    Output the table in a  DataTable format with the information for the metadata information
+
+    :parameter metadata_file: Path to the CSV file containing the metadata information
+    :type metadata_file: str
+    :return: the DataTable information
+    """
+    return _metadata_table(_read_metadata(metadata_file))
+
+
+@instrumented()
 def make_abstract_tab(round_number, path="./visualization/data-visualization/model_abstracts/",
                       id_append="", pattern="\d{4}-\d{2}-\d{2}-|-(A|a)bstract.md"):
     """Create the abstract page
@@ -46,22 +185,11 @@ def make_abstract_tab(round_number, path="./visualization/data-visualization/mod
     :type pattern: str
     :return: Div component associated with the round, tab selected and associated abstract
     """
-    file_list = os.listdir(path + "round" + str(round_number))
-    checkbox_list = list()
-    for i in file_list:
-        checkbox_entry = re.sub(pattern, "", i)
-        checkbox_list.append(checkbox_entry)
-    checkbox_list.sort()
-    output = html.Div([
-        dcc.Dropdown(
-            id='abstract' + id_append + '-dropdown', clearable=False,
-            options=checkbox_list, value=checkbox_list[0]),
-        html.Br(),
-        html.Div(id="abstract" + id_append + "-output")
-    ])
-    return output
+    file_list = _list_abstracts(path + "round" + str(round_number))
+    return _abstract_dropdown(file_list, id_append, pattern)
 
 
+@instrumented()
 def render_abstract(round_number, round_date, team_model_name,
                     path="./visualization/data-visualization/model_abstracts/",
                     file_append=["-abstract", "-Abstract"], file_extension=".md"):
@@ -93,17 +221,80 @@ def render_abstract(round_number, round_date, team_model_name,
     :type file_extension: str
     :return: Div component associated with a specific abstract
     """
-    if file_append is None:
-        filename = (path + "round" + str(round_number) + "/" + round_date + "-" + team_model_name +
-                    file_extension)
-    else:
-        for i in file_append:
-            filename = (path + "round" + str(round_number) + "/" + round_date + "-" +
-                        team_model_name + i + file_extension)
-            if os.path.isfile(filename):
-                break
-    with open(filename, "r") as f:
-        markdown_text = f.read()
-    return html.Div([
-        dcc.Markdown(markdown_text)
-    ])
+    markdown_text = _find_and_read_abstract(round_number, round_date, team_model_name, path,
+                                            file_append, file_extension)
+    return _abstract_div(markdown_text)
+
+
+@instrumented()
+async def make_dt_metadata_async(metadata_file):
+    """Create the Data Table output (asynchronous)
+
+    Asynchronous version of `make_dt_metadata()`: the CSV file is read in a bounded thread pool
+    (see `set_io_workers()`) and concurrent calls for the same file share a single read.
+
+    :parameter metadata_file: Path to the CSV file containing the metadata information
+    :type metadata_file: str
+    :return: the DataTable information
+    """
+    df = await _run_io(("metadata", metadata_file), _read_metadata, metadata_file)
+    return _metadata_table(df)
+
+
+@instrumented()
+async def make_abstract_tab_async(round_number,
+                                  path="./visualization/data-visualization/model_abstracts/",
+                                  id_append="", pattern="\d{4}-\d{2}-\d{2}-|-(A|a)bstract.md"):
+    """Create the abstract page (asynchronous)
+
+    Asynchronous version of `make_abstract_tab()`: the folder is listed in a bounded thread pool
+    (see `set_io_workers()`) and concurrent calls for the same round share a single listing.
+
+    :parameter round_number: Numeric identifier of a specific round tab (for example "13")
+    :type round_number: str
+    :parameter path: Relative path to the folder containing the abstracts information for all round
+    :type path: str
+    :parameter id_append: Character to append to the objects IDs.
+    :type id_append: str
+    :parameter pattern: pattern to extract team-model name from the file, by default
+        `"\d{4}-\d{2}-\d{2}-|-(A|a)bstract.md"`
+    :type pattern: str
+    :return: Div component associated with the round, tab selected and associated abstract
+    """
+    round_path = path + "round" + str(round_number)
+    file_list = await _run_io(("abstract_list", round_path), _list_abstracts, round_path)
+    return _abstract_dropdown(file_list, id_append, pattern)
+
+
+@instrumented()
+async def render_abstract_async(round_number, round_date, team_model_name,
+                                path="./visualization/data-visualization/model_abstracts/",
+                                file_append=["-abstract", "-Abstract"], file_extension=".md"):
+    """Create the abstract content (asynchronous)
+
+    Asynchronous version of `render_abstract()`: the abstract file is searched and read in a
+    bounded thread pool (see `set_io_workers()`) and concurrent calls for the same abstract share
+    a single read.
+
+    :parameter round_number: Numeric identifier of a specific round tab (for example "13")
+    :type round_number: str
+    :parameter round_date: Date identifier of a specific round tab in a YYYY-MM-DD format
+        (for example "2022-03-13")
+    :type round_date: str
+    :parameter team_model_name: Name of a team_model (same as in the filename) specifying which
+        abstract content to read
+    :type team_model_name: str
+    :parameter path: Relative path to the folder containing the abstracts information for all round
+    :type path: str
+    :parameter file_append: List of possible additional text in the filename, if None (default), no
+        additional text
+    :type file_append: list | None
+    :parameter file_extension: Character string, extension of the file, ".md" by default
+    :type file_extension: str
+    :return: Div component associated with a specific abstract
+    """
+    key = ("abstract", path, str(round_number), round_date, team_model_name,
+           None if file_append is None else tuple(file_append), file_extension)
+    markdown_text = await _run_io(key, _find_and_read_abstract, round_number, round_date,
+                                  team_model_name, path, file_append, file_extension)
+    return _abstract_div(markdown_text)
@@ -1,6 +1,9 @@
 from dash import html
 
+from SMHviz_layout.instrument import instrumented
 
+
+@instrumented()
 def make_notes_definition(definitions, notes_left, notes_right, html_id="html-table",
                           css_title="title", css_column_left="column left",
                           css_column_right="column right",
@@ -0,0 +1,152 @@
+import sys
+import threading
+import weakref
+
+_OPTIONS = {"compact": False}
+# bounded by the objects in use: an OptionList is removed when it is not referenced anymore, the
+# values of a column when its table is deleted
+_STORE = weakref.WeakValueDictionary()
+_COLUMNS = dict()
+_LOCK = threading.Lock()
+
+
+class OptionList(object):
+    """Read-only list of options
+
+    Compact storage of a list of Dash options (dictionaries with the same keys, for example
+    `{"label": ..., "value": ..., "disabled": True}`): the keys are stored once and the values of
+    each option in a tuple. The Dash options are created only when the layout is serialized.
+    """
+    __slots__ = ("_keys", "_rows", "__weakref__")
+
+    def __init__(self, keys, rows):
+        self._keys = keys
+        self._rows = rows
+
+    def to_plotly_json(self):
+        return [dict(zip(self._keys, i)) for i in self._rows]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [dict(zip(self._keys, j)) for j in self._rows[i]]
+        return dict(zip(self._keys, self._rows[i]))
+
+    def __iter__(self):
+        for i in self._rows:
+            yield dict(zip(self._keys, i))
+
+    def __repr__(self):
+        return "OptionList(" + repr(self.to_plotly_json()) + ")"
+
+
+def set_compact_options(compact):
+    """Enable or disable the compact option storage
+
+    Disabled by default: new lists of options are created by each layout function call. If
+    enabled, the options of the sidebar components are stored in shared, read-only `OptionList`
+    and tuples (see `option_list()` and `column_values()`): the `options` property of these
+    components is then an `OptionList` (a read-only sequence of dictionaries, not a list: no
+    list equality, `append()` or concatenation) and the location dropdown options a tuple.
+
+    :parameter compact: Boolean, to enable the compact option storage
+    :type compact: bool
+    :return: None
+    """
+    _OPTIONS["compact"] = compact
+    with _LOCK:
+        _COLUMNS.clear()
+
+
+def compact_options_enabled():
+    """Compact option storage status
+
+    :return: `True` if the compact option storage is enabled (see `set_compact_options()`)
+    """
+    return _OPTIONS["compact"]
+
+
+def _intern(value):
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def option_list(options, **extra):
+    """Shared read-only list of options
+
+    Return the list of options `options` with the additional keys `extra` (for example
+    `disabled=True`) as an `OptionList`. Equal lists of options share the same `OptionList`
+    (and the character strings are interned) while in use.
+
+    :parameter options: Iterable of dictionaries (for example `{"label": ..., "value": ...}`)
+    :type options: list
+    :parameter extra: Keys to add (or replace) in each option
+    :return: an `OptionList`, or a list of dictionaries if the compact storage is disabled or
+        if the options do not all have the same keys or are not hashable
+    """
+    if not _OPTIONS["compact"]:
+        return [dict(i, **extra) for i in options]
+    options = list(options)
+    if len(options) == 0:
+        return options
+    # keys and values of `dict(i, **extra)`, without creating the dictionaries
+    keys = tuple(options[0]) + tuple(k for k in extra if k not in options[0])
+    rows = list()
+    for i in options:
+        if tuple(i) + tuple(k for k in extra if k not in i) != keys:
+            return [dict(j, **extra) for j in options]
+        rows.append(tuple(_intern(extra[k] if k in extra else i[k]) for k in keys))
+    keys = tuple(_intern(i) for i in keys)
+    key = (keys, tuple(rows))
+    try:
+        hash(key)
+    except TypeError:
+        return [dict(i, **extra) for i in options]
+    with _LOCK:
+        stored = _STORE.get(key)
+        if stored is None:
+            stored = OptionList(keys, key[1])
+            _STORE[key] = stored
+    return stored
+
+
+def _remove_column(key):
+    with _LOCK:
+        _COLUMNS.pop(key, None)
+
+
+def column_values(df, column, exclude=None):
+    """Shared read-only values of a table column
+
+    Return the values of the column `column` of the table `df` (without the first occurrence of
+    each value in `exclude`) as a tuple of interned values, computed once for each table (until
+    the table is deleted). The table should not be modified after the first call.
+
+    :parameter df: Table, for example the location information
+    :type df: DataFrame
+    :parameter column: Name of the column, for example "location_name"
+    :type column: str
+    :parameter exclude: List of values to remove
+    :type exclude: list | None
+    :return: a tuple of values, or a list if the compact storage is disabled
+    """
+    key = (id(df), column, None if exclude is None else tuple(exclude))
+    if _OPTIONS["compact"]:
+        stored = _COLUMNS.get(key)
+        if stored is not None and stored[0]() is df:
+            return stored[1]
+    values = list(df[column])
+    if exclude is not None:
+        for i in exclude:
+            if i in values:
+                values.remove(i)
+    if not _OPTIONS["compact"]:
+        return values
+    values = tuple(_intern(i) for i in values)
+    reference = weakref.ref(df, lambda _: _remove_column(key))
+    with _LOCK:
+        _COLUMNS[key] = (reference, values)
+    return values
@@ -0,0 +1,163 @@
+import fnmatch
+import json
+
+from SMHviz_layout.serialize import to_json
+
+
+class PayloadBudgetError(AssertionError):
+    """Serialized layout size above the budget"""
+
+
+def _size(value):
+    return len(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _id_key(component_id):
+    # pattern-matching (dictionary) id as canonical JSON, the same string as Dash
+    if isinstance(component_id, dict):
+        return json.dumps(component_id, sort_keys=True, separators=(",", ":"))
+    return component_id
+
+
+def _is_component(value):
+    return isinstance(value, dict) and "props" in value and "type" in value
+
+
+def _walk(node, path, nodes):
+    if isinstance(node, list):
+        for i, child in enumerate(node):
+            _walk(child, path + "[" + str(i) + "]", nodes)
+    elif _is_component(node):
+        props = dict()
+        for prop, value in node["props"].items():
+            props[prop] = _size(value)
+        nodes.append({"path": path, "id": node["props"].get("id"), "type": node["type"],
+                      "size": _size(node), "props": props})
+        for prop, value in node["props"].items():
+            if isinstance(value, (list, dict)):
+                _walk(value, path + "." + prop, nodes)
+
+
+def payload_breakdown(component):
+    """Serialized size of a layout by component
+
+    Return the serialized size (in bytes) of each component of the layout tree, with the size of
+    each of its properties (the size of a component and of its `children` property includes the
+    size of its child components).
+
+    :parameter component: Dash component, list of components (output of a layout function) or
+        deserialized layout (for example output of `SMHviz_layout.artifacts.load_layout()`)
+    :type component: dash.development.base_component.Component | list | dict
+    :return: a list of dictionaries, one per component (depth-first order), with the keys: `path`
+        (position in the tree, for example "root.children[2]"), `id` (component id or `None`),
+        `type` (component type), `size` (serialized size of the subtree) and `props` (dictionary,
+        serialized size of each property)
+    """
+    nodes = list()
+    _walk(json.loads(to_json(component)), "root", nodes)
+    return nodes
+
+
+def largest_contributors(component, n=10):
+    """Largest properties of a layout
+
+    Return the `n` largest properties (excluding the `children` property) of the components of
+    the layout, for example: the options of the location dropdown, the data of the metadata
+    DataTable or the options of the scenario checklist.
+
+    :parameter component: Dash component, list of components or deserialized layout
+    :type component: dash.development.base_component.Component | list | dict
+    :parameter n: Number of properties to return
+    :type n: int
+    :return: a list of dictionaries sorted by decreasing size, with the keys: `id` (component id,
+        or path if the component has no id), `type`, `prop` and `size`
+    """
+    contributors = list()
+    for node in payload_breakdown(component):
+        for prop, size in node["props"].items():
+            if prop == "children":
+                continue
+            name = node["id"] if node["id"] is not None else node["path"]
+            contributors.append({"id": name, "type": node["type"], "prop": prop, "size": size})
+    contributors.sort(key=lambda x: x["size"], reverse=True)
+    return contributors[:n]
+
+
+def payload_report(component, n=10):
+    """Text report of the serialized size of a layout
+
+    :parameter component: Dash component, list of components or deserialized layout
+    :type component: dash.development.base_component.Component | list | dict
+    :parameter n: Number of largest properties to report
+    :type n: int
+    :return: a character string with the total size and the largest properties of the layout
+    """
+    total = len(to_json(component).encode("utf-8"))
+    lines = ["Total: " + str(total) + " B"]
+    for i in largest_contributors(component, n=n):
+        lines.append("  " + str(i["id"]) + " (" + i["type"] + ") " + i["prop"] + ": " +
+                     str(i["size"]) + " B (" + str(round(100 * i["size"] / total, 1)) + "%)")
+    return "\n".join(lines)
+
+
+def check_budget(component, budget, name="layout"):
+    """Verify the serialized size of a layout
+
+    :parameter component: Dash component, list of components or deserialized layout
+    :type component: dash.development.base_component.Component | list | dict
+    :parameter budget: Maximum serialized size in bytes of the layout, or dictionary with the
+        maximum size of the layout (key `"total"`) and/or of specific components (component id as
+        key, for example: `{"total": 100000, "location-dropdown": 60000}`), a pattern-matching
+        (dictionary) id is given as canonical JSON (sorted keys, no whitespace, for example:
+        `'{"index":1,"type":"graph"}'`)
+    :type budget: int | dict
+    :parameter name: Name of the layout, used in the error message
+    :type name: str
+    :return: the serialized size of the layout. A PayloadBudgetError (AssertionError) is raised
+        if the layout or a component is above its budget.
+    """
+    if not isinstance(budget, dict):
+        budget = {"total": budget}
+    total = len(to_json(component).encode("utf-8"))
+    errors = list()
+    if budget.get("total") is not None and total > budget["total"]:
+        errors.append(name + ": " + str(total) + " B > " + str(budget["total"]) + " B")
+    component_budget = {k: v for k, v in budget.items() if k != "total"}
+    if len(component_budget) > 0:
+        for node in payload_breakdown(component):
+            key = _id_key(node["id"])
+            if key in component_budget and node["size"] > component_budget[key]:
+                errors.append(name + " - " + str(key) + ": " + str(node["size"]) + " B > " +
+                              str(component_budget[key]) + " B")
+    if len(errors) > 0:
+        raise PayloadBudgetError("Payload budget exceeded:\n" + "\n".join(errors) + "\n" +
+                                 payload_report(component, n=5))
+    return total
+
+
+def check_budgets(layouts, budgets):
+    """Verify the serialized size of multiple layouts
+
+    :parameter layouts: Dictionary of layouts by name (for example output of
+        `SMHviz_layout.build.build_layouts()`)
+    :type layouts: dict
+    :parameter budgets: Dictionary of budgets (see `check_budget()`) by layout name or name
+        pattern (for example: `{"round*/sidebar/*": 80000, "dt_metadata.json": 200000}`), for a
+        layout matching multiple patterns, the first matching one is used
+    :type budgets: dict
+    :return: a dictionary with the serialized size of each checked layout. A PayloadBudgetError
+        (AssertionError) is raised if at least one layout is above its budget.
+    """
+    sizes = dict()
+    errors = list()
+    for name, component in layouts.items():
+        for pattern, budget in budgets.items():
+            if fnmatch.fnmatch(name, pattern):
+                try:
+                    sizes[name] = check_budget(component, budget, name=name)
+                except PayloadBudgetError as e:
+                    errors.append(str(e))
+                break
+    if len(errors) > 0:
+        raise PayloadBudgetError("\n\n".join(errors))
+    return sizes
@@ -1,9 +1,13 @@
 import re
 
 from SMHviz_layout.utils import *
+from SMHviz_layout.instrument import instrumented
+from SMHviz_layout.selections import apply_selections, tab_selections
+from SMHviz_layout.styles import style_props
 import dash_bootstrap_components as dbc
 
 
+@instrumented()
 def multi_pathogen_notes(pathogen, other_pathogen, website, style=None, ensemble=True):
     """Create a Div component with the notes associated with the multi-pathogen plot
 
@@ -26,8 +30,6 @@ def multi_pathogen_notes(pathogen, other_pathogen, website, style=None, ensemble
     :type ensemble: bool
     :return: a html.Div() component containing the multi-pathogen plot associated notes
     """
-    if style is None:
-        style = {"margin-left": "5%", "width": "95%"}
     if len(other_pathogen) > 1:
         other_pathogen_name = ", ".join(other_pathogen)
     else:
@@ -55,10 +57,11 @@ def multi_pathogen_notes(pathogen, other_pathogen, website, style=None, ensemble
                 " one or more of these viruses. For more information on " + other_pathogen_name +
                 " projections and  scenarios, please consult the ",
                 html.Span(other_pathogen_website), html.Span(".")]),
-    ], style=style)
+    ], **style_props("smh-notes", style))
     return notes
 
 
+@instrumented()
 def multi_pathogen_bar(pathogen, other_pathogen, quant_opt=None, sel_quant=0.5, bar_style=None,
                        note_style=None, clearable=False, css_class="plot_bar_sel",
                        css_multi_radio="multi_bar_radio"):
@@ -100,8 +103,6 @@ def multi_pathogen_bar(pathogen, other_pathogen, quant_opt=None, sel_quant=0.5,
     :type css_multi_radio: str
     :return: a Div component with the Multi-pathogen specific top bar
     """
-    if bar_style is None:
-        bar_style = {'width': '100%', 'display': 'flex'}
     if quant_opt is None:
         quant_opt = [0.05, 0.25, 0.5, 0.75, 0.95]
     other_scenario = other_pathogen["scenario"]
@@ -117,12 +118,13 @@ def multi_pathogen_bar(pathogen, other_pathogen, quant_opt=None, sel_quant=0.5,
                          value=other_pathogen["default_sel"][0], css_class=css_multi_radio),
         make_dropdown(other_pathogen["name"] + " Quantile", "other-quantile_dropdown", quant_opt,
                       sel_quant, clearable=clearable, css_class=css_class)
-    ], style=bar_style)
+    ], **style_props("smh-bar-flex", bar_style))
     plot_bar = [bar, multi_pathogen_notes(pathogen, [other_pathogen["name"]],
                                           [other_pathogen["website"]], style=note_style)]
     return html.Div(plot_bar)
 
 
+@instrumented()
 def multi_pathogen_bar_comp(pathogen, other_pathogen, bar_style=None, note_style=None):
     """Create Combine Multi-pathogen specific top bar filter
 
@@ -147,8 +149,8 @@ def multi_pathogen_bar_comp(pathogen, other_pathogen, bar_style=None, note_style
     :type note_style: dict | str
     :return: a Div component with the Multi-pathogen specific top bar
     """
-    if bar_style is None:
-        bar_style = {'width': '100%', 'display': 'flex'}
+    check_props = style_props("smh-inline-grid", style_prop="check_style",
+                              class_prop="css_check")
     list_bar = list()
     list_patho_name = list()
     list_website = list()
@@ -164,18 +166,19 @@ def multi_pathogen_bar_comp(pathogen, other_pathogen, bar_style=None, note_style
                             options=patho_scen_dict, value=patho_information["default_sel"],
                             style={"display": "inline-block", "margin-left": "5%",
                                    "width": str(width) + "%"},
-                            check_style={"display": "inline-grid"})
+                            **check_props)
         list_bar.append(bar)
         list_patho_name.append(patho_information["name"])
         list_website.append(patho_information["website"])
-    bar = html.Div(list_bar, style=bar_style)
+    bar = html.Div(list_bar, **style_props("smh-bar-flex", bar_style))
     plot_bar = [bar, multi_pathogen_notes(pathogen, list_patho_name, list_website,
                                           style=note_style, ensemble=False)]
     return html.Div(plot_bar)
 
 
+@instrumented()
 def scen_comp_bar(max_horizon, panel_name, multi_panel=False, sidebar_option=False,
-                  css_class="plot_bar_sel", tooltip=None, radio_comp_style=None):
+                  css_class="plot_bar_sel", tooltip=None, radio_comp_style=None, max_marks=None):
     """Create Scenario Comparison specific top bar
 
     Create Scenario Comparison top bar filter containing (depending on the input):
@@ -207,26 +210,29 @@ def scen_comp_bar(max_horizon, panel_name, multi_panel=False, sidebar_option=Fal
     :parameter radio_comp_style: Style associated with the checkbox,
         if `None`: {"display": "inline-block", "margin-left": "5%", "width": "45%"}
     :type radio_comp_style: dict | str
+    :parameter max_marks: Maximum number of marks on the slider (with "nice" values), see
+        `SMHviz_layout.utils.make_slider()`
+    :type max_marks: int | None
     :return:  a Div component with the Scenario Comparison specific top bar
     """
-    if radio_comp_style is None:
-        radio_comp_style = {"display": "inline-block", "margin-left": "5%", "width": "45%"}
     week_slider = make_slider("Cumulative Starting From Projection Week:", "week-slider", 1,
-                              max_horizon, 4, css_class=css_class, tooltip=tooltip)
+                              max_horizon, 4, css_class=css_class, tooltip=tooltip,
+                              max_marks=max_marks)
     panel_choice = html.Div([
         html.Br(), dcc.RadioItems(id="multi-ref", options=panel_name, value=panel_name[0])],
-        style=radio_comp_style)
+        **style_props("smh-bar-comp", radio_comp_style))
     if sidebar_option is False:
         week_slider = html.Div(week_slider, hidden=True)
     if multi_panel is False:
         panel_choice = html.Div(panel_choice, hidden=True)
     plot_bar = [week_slider, panel_choice]
-    return html.Div(plot_bar, style={"width": "100%"})
+    return html.Div(plot_bar, **style_props("smh-full-width"))
 
 
+@instrumented()
 def spaghetti_bar(min_slide=10, max_slide=100, step_slide=10, checkbox_median=True,
                   css_med="plot_bar_sel", traj_slider_style=None, traj_by_model=False,
-                  traj_model_id="t_model_check"):
+                  traj_model_id="t_model_check", max_marks=None):
     """Create Individual Trajectories specific top bar filter
 
     Create Individual Trajectories top bar filter containing:
@@ -254,10 +260,15 @@ def spaghetti_bar(min_slide=10, max_slide=100, step_slide=10, checkbox_median=Tr
     :type traj_by_model: bool
     :parameter traj_model_id: Character, id name of the model checkbox, by default "t_model_check"
     :type traj_model_id: str
+    :parameter max_marks: Maximum number of marks on the slider (with "nice" values), if `None`
+        (default), the marks are set by the slider step, see `SMHviz_layout.utils.slider_marks()`
+    :type max_marks: int | None
     :return: a Div component with the Individual Trajectories specific top bar
     """
-    if traj_slider_style is None:
-        traj_slider_style = {"display": "inline-block", "margin-left": "5%", "width": "60%"}
+    slider_param = dict()
+    if max_marks is not None:
+        slider_param["marks"] = slider_marks(min_slide, max_slide, step_slide,
+                                             max_marks=max_marks)
     traj_slider = html.Div([
         html.P("Number of Trajectories to plot"),
         html.Div([
@@ -265,8 +276,9 @@ def spaghetti_bar(min_slide=10, max_slide=100, step_slide=10, checkbox_median=Tr
             "number of trajectories to plot"
         ]),
         html.Br(),
-        dcc.Slider(min_slide, max_slide, step_slide, value=step_slide, id='sample-slider')
-    ], style=traj_slider_style)
+        dcc.Slider(min_slide, max_slide, step_slide, value=step_slide, id='sample-slider',
+                   **slider_param)
+    ], **style_props("smh-bar-traj", traj_slider_style))
     check_med = html.Div([
         dcc.Checklist(
             id="median-checkbox",
@@ -278,15 +290,17 @@ def spaghetti_bar(min_slide=10, max_slide=100, step_slide=10, checkbox_median=Tr
     if traj_by_model is True:
         model_checkbox = html.Div([
             html.P("Select Team-Model to include in the plot:",),
-            dcc.Checklist(id=traj_model_id, options=[], style={"display": "inline-flex"},
-                          labelStyle={"padding-right": 10})
-        ], style={"display": "inline-block", "margin-left": "5%", "width": "95%"})
+            dcc.Checklist(id=traj_model_id, options=[], **style_props("smh-inline-flex"),
+                          **style_props("smh-label-pad", style_prop="labelStyle",
+                                        class_prop="labelClassName"))
+        ], **style_props("smh-bar-wide"))
     else:
         model_checkbox = None
     plot_bar = [traj_slider, check_med, model_checkbox]
     return html.Div(plot_bar)
 
 
+@instrumented()
 def heatmap_bar(model_sel, scen_choice, hide_ens, quant_opt=None, sel_quant=0.5, method_list=None,
                 clearable=False, css_class="plot_bar_sel", css_h_radio="radio_heatmap",
                 css_h_drop="dropdown_heatmap", css_h_plot="plot_bar", style=None):
@@ -335,8 +349,6 @@ def heatmap_bar(model_sel, scen_choice, hide_ens, quant_opt=None, sel_quant=0.5,
     :type style: dict | str
     :return: a Div component with the Heatmap specific top bar
     """
-    if style is None:
-        style = {"display": "inline-block", "width": "100%"}
     if quant_opt is None:
         quant_opt = [0.05, 0.25, 0.5, 0.75, 0.95]
     if method_list is None:
@@ -346,9 +358,8 @@ def heatmap_bar(model_sel, scen_choice, hide_ens, quant_opt=None, sel_quant=0.5,
         dbc.Checklist(id="ensemble-checkbox",
                       options=[{"label": "Show Additional Ensemble", "value": "True"}]),
         dbc.Tooltip("Click to display all available ensembles for the round.",
-                    target="ensemble-checkbox", placement="auto",
-                    style={"background": "#bfbfbf", "padding": "5px", "border-radius": "5px"}),
-    ], style={"display": "inline-block", "margin-left": "5%", "width": "25%"})
+                    target="ensemble-checkbox", placement="auto", **style_props("smh-tooltip")),
+    ], **style_props("smh-bar-sel"))
     if hide_ens is True:
         checkbox = html.Div(checkbox, hidden=True)
     quant_drop = make_dropdown("Quantile", "heatmap-quantile_dropdown", quant_opt, sel_quant,
@@ -366,12 +377,13 @@ def heatmap_bar(model_sel, scen_choice, hide_ens, quant_opt=None, sel_quant=0.5,
         html.Div([model_sel, checkbox, order_radio, method_dropdown], className=css_h_plot),
         html.Br(),
         html.Div("Following options are not available for the model 'Ground Truth':",
-                 style={"margin-left": "5%"}),
+                 **style_props("smh-margin-left")),
         html.Div([scenario_sel2, quant_drop], className=css_h_plot)
-    ], style=style)
+    ], **style_props("smh-bar-block", style))
     return plot_bar
 
 
+@instrumented()
 def sample_peak_bar(tf_options=None, clearable=False, css_class="plot_bar_sel",
                     css_bar_plot="plot_bar"):
     """Create Peak specific top bar filter
@@ -413,6 +425,7 @@ def sample_peak_bar(tf_options=None, clearable=False, css_class="plot_bar_sel",
     return plot_bar
 
 
+@instrumented("plot_tab")
 def make_plot_bar(val_default, max_horizon, hide_ens, sc_panel_name, sc_multi_panel,
                   sc_sidebar_option, pathogen, scen_choice, other_pathogen, plot_tab,
                   quant_opt=None, sel_quant=0.5, method_list=None, tf_options=None, traj_min=10,
@@ -422,7 +435,8 @@ def make_plot_bar(val_default, max_horizon, hide_ens, sc_panel_name, sc_multi_pa
                   css_multi_radio="multi_bar_radio", traj_slider_style=None,
                   css_h_radio="radio_heatmap", css_h_drop="dropdown_heatmap",
                   css_bar_plot="plot_bar", heatmap_style=None, traj_by_model=False,
-                  mod_drop_id="model_dropdown", tooltipclass=None):
+                  mod_drop_id="model_dropdown", tooltipclass=None, selections=None,
+                  max_marks=None):
     """Create plot specific top bar filter
 
     Create plot top bar filter depending on the round and on the plot tab selected
@@ -522,20 +536,27 @@ def make_plot_bar(val_default, max_horizon, hide_ens, sc_panel_name, sc_multi_pa
     :type mod_drop_id: str
     :parameter tooltipclass: String, Classname for tooltip, None by default
     :type mod_drop_id: str | None
+    :parameter selections: Data of the selection store component (see
+        `SMHviz_layout.selections.selection_store()`), the controls of the plot tab are set to the
+        last values selected by the user, if still valid. If `None` (default), the default
+        values are used
+    :type selections: dict | None
+    :parameter max_marks: Maximum number of marks on the sliders ("Scenario Comparison", "Trend
+        Map" and "Individual Trajectories" plot tabs), with "nice" values, see
+        `SMHviz_layout.utils.slider_marks()`. If `None` (default), default marks
+    :type max_marks: int | None
     :return: a Div component with the Individual Trajectories specific top bar
     """
     # Prepare Specific Plot tab Selection component
     if method_list is None:
         method_list = ["population size", "all projection"]
-    if style_checkbox is None:
-        style_checkbox = {"display": "inline-block", "margin-left": "5%", "width": "25%"}
     checkbox = html.Div([
             html.P(""),
             dbc.Checklist(id="ensemble-checkbox",
                           options=[{"label": "Show Additional Ensemble", "value": "True"}]),
             dbc.Tooltip("Click to display all available ensembles for the round",
                         target="ensemble-checkbox", placement="auto", className=tooltipclass),
-        ], style=style_checkbox)
+        ], **style_props("smh-bar-sel", style_checkbox))
     if hide_ens is True:
         checkbox = html.Div(checkbox, hidden=True)
     radio_target = make_radio_items(
@@ -548,8 +569,6 @@ def make_plot_bar(val_default, max_horizon, hide_ens, sc_panel_name, sc_multi_pa
         title="Y-axis Scale", id_name="yaxis-scale-radio",
         options=[{"label": "Linear", "value": "linear"}, {"label": "Log", "value": "log"}],
         value='linear', css_class=css_sel, inline=inline_radio)
-    week_slider = make_slider("Wks to Show Beyond Observed Data", "week-slider", 6, max_horizon,
-                              4, css_class=css_sel, tooltip=tooltip)
     radio_week = make_radio_items("Week", "week-radio", [max_horizon / 2, max_horizon],
                                   max_horizon / 2, css_class=css_sel, inline=inline_radio)
     # Prepare plot bar
@@ -566,10 +585,14 @@ def make_plot_bar(val_default, max_horizon, hide_ens, sc_panel_name, sc_multi_pa
     elif plot_tab in ["scen_comparison"]:
         plot_bar = scen_comp_bar(max_horizon, sc_panel_name, multi_panel=sc_multi_panel,
                                  sidebar_option=sc_sidebar_option, css_class=css_sel,
-                                 tooltip=tooltip, radio_comp_style=radio_comp_style)
+                                 tooltip=tooltip, radio_comp_style=radio_comp_style,
+                                 max_marks=max_marks)
     elif plot_tab in ["state_deviation"]:
         plot_bar = [radio_yaxis]
     elif plot_tab in ["trend_map"]:
+        week_slider = make_slider("Wks to Show Beyond Observed Data", "week-slider", 6,
+                                  max_horizon, 4, css_class=css_sel, tooltip=tooltip,
+                                  max_marks=max_marks)
         plot_bar = [model_sel, checkbox, week_slider]
     elif plot_tab in ["model_distribution"]:
         plot_bar = [checkbox, radio_target, radio_week]
@@ -589,7 +612,7 @@ def make_plot_bar(val_default, max_horizon, hide_ens, sc_panel_name, sc_multi_pa
         plot_bar = spaghetti_bar(
             min_slide=traj_min, max_slide=traj_max, step_slide=traj_step, checkbox_median=check_med,
             css_med=css_sel, traj_slider_style=traj_slider_style, traj_by_model=traj_by_model,
-            traj_model_id=traj_model_id)
+            traj_model_id=traj_model_id, max_marks=max_marks)
     elif plot_tab in ["heatmap"]:
         plot_bar = heatmap_bar(model_sel, scen_choice, hide_ens, quant_opt=quant_opt,
                                sel_quant=sel_quant, method_list=method_list, clearable=clearable,
@@ -609,4 +632,5 @@ def make_plot_bar(val_default, max_horizon, hide_ens, sc_panel_name, sc_multi_pa
     else:
         plot_bar = []
     # return
-    return html.Div(plot_bar, className="plot_bar")
+    return apply_selections(html.Div(plot_bar, className="plot_bar"),
+                            tab_selections(selections, plot_tab))
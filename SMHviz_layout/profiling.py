@@ -0,0 +1,244 @@
+import contextlib
+import contextvars
+import cProfile
+import glob
+import os
+import queue
+import re
+import threading
+import time
+import tracemalloc
+
+_PROFILING = {"builders": set(), "directory": "./smhviz_profiles", "every": 100, "keep": 20,
+              "memory": True, "counts": dict()}
+# configuration of `profile_builders()`, replaces `_PROFILING` in its context
+_CONTEXT = contextvars.ContextVar("smhviz_profiling", default=None)
+_WRITER = {"queue": queue.Queue(), "thread": None}
+_LOCK = threading.Lock()
+_MEMORY_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def configure_profiling(builders, directory="./smhviz_profiles", every=100, keep=20, memory=True):
+    """Configure the sampled profiling of the layout functions
+
+    One call every `every` calls of each selected layout function is run under `cProfile` (and
+    `tracemalloc` if `memory` is `True`). For each profiled call, the files
+    `<builder>-<timestamp>-<call number>.prof` (cProfile statistics, can be read with `pstats`)
+    and `<builder>-<timestamp>-<call number>.mem.txt` (peak memory and top 50 allocation lines)
+    are written in `directory` by a background thread (see `flush_profiles()`), only the last
+    `keep` profiles of each layout function are kept.
+
+    `tracemalloc` traces the allocations of the whole process: the peak memory and allocations of
+    a profiled call include the allocations of the other threads running during the call (for
+    example concurrent requests).
+
+    The profiling can also be configured with the environment variables: `SMHVIZ_PROFILE`
+    (comma separated list of layout functions names or "all"), `SMHVIZ_PROFILE_DIR`,
+    `SMHVIZ_PROFILE_EVERY`, `SMHVIZ_PROFILE_KEEP` and `SMHVIZ_PROFILE_MEMORY` ("0" to disable
+    the memory profiling).
+
+    :parameter builders: List of the layout functions names to profile (for example:
+        `["make_sidebar", "render_abstract"]`), "all" for all the layout functions, or an empty
+        list to disable the profiling
+    :type builders: list | str
+    :parameter directory: Path to the folder in which the profiles are written
+    :type directory: str
+    :parameter every: Sampling rate, one call profiled every `every` calls
+    :type every: int
+    :parameter keep: Number of profiles kept for each layout function
+    :type keep: int
+    :parameter memory: Boolean, to profile the memory allocations with `tracemalloc`
+    :type memory: bool
+    :return: None
+    """
+    with _LOCK:
+        _PROFILING.update(_configuration(builders, directory, every, keep, memory))
+
+
+def _configuration(builders, directory, every, keep, memory):
+    if isinstance(builders, str):
+        builders = [builders]
+    return {"builders": set(builders), "directory": directory, "every": max(int(every), 1),
+            "keep": max(int(keep), 1), "memory": memory, "counts": dict()}
+
+
+def disable_profiling():
+    """Disable the profiling of the layout functions
+
+    :return: None
+    """
+    configure_profiling([])
+
+
+@contextlib.contextmanager
+def profile_builders(builders, directory="./smhviz_profiles", every=1, keep=20, memory=True):
+    """Profile the layout functions in a context
+
+    Context manager enabling the sampled profiling (see `configure_profiling()`) for the calls
+    made in the context (current thread or asyncio task, the other threads and tasks keep the
+    global configuration), for example:
+
+        with profile_builders(["make_sidebar"], "./profiles", every=10):
+            ...
+
+    :parameter builders: List of the layout functions names to profile or "all"
+    :type builders: list | str
+    :parameter directory: Path to the folder in which the profiles are written
+    :type directory: str
+    :parameter every: Sampling rate, one call profiled every `every` calls (every call by default)
+    :type every: int
+    :parameter keep: Number of profiles kept for each layout function
+    :type keep: int
+    :parameter memory: Boolean, to profile the memory allocations with `tracemalloc`
+    :type memory: bool
+    """
+    token = _CONTEXT.set(_configuration(builders, directory, every, keep, memory))
+    try:
+        yield
+    finally:
+        _CONTEXT.reset(token)
+
+
+def _current():
+    config = _CONTEXT.get()
+    return _PROFILING if config is None else config
+
+
+def profiling_enabled():
+    """Profiling status
+
+    :return: `True` if at least one layout function is profiled (in the current context)
+    """
+    return len(_current()["builders"]) > 0
+
+
+def _sampled(config, name):
+    builders = config["builders"]
+    if name not in builders and "all" not in builders:
+        return None
+    if getattr(_LOCAL, "active", False):
+        return None
+    with _LOCK:
+        count = config["counts"].get(name, 0) + 1
+        config["counts"][name] = count
+    if (count - 1) % config["every"] != 0:
+        return None
+    return count
+
+
+def _rotate(directory, name, keep):
+    profiles = dict()
+    for filename in glob.glob(os.path.join(directory, name + "-*")):
+        prefix = re.sub(r"\.(prof|mem\.txt)$", "", filename)
+        profiles.setdefault(prefix, list()).append(filename)
+    old_profiles = sorted(profiles, key=lambda x: max(map(os.path.getmtime, profiles[x])))
+    for prefix in old_profiles[:-keep]:
+        for filename in profiles[prefix]:
+            os.remove(filename)
+
+
+def _write(directory, name, count, keep, profiler, snapshot, peak):
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, name + "-" + time.strftime("%Y%m%dT%H%M%S") + "-" +
+                          str(count))
+    if profiler is not None:
+        profiler.dump_stats(prefix + ".prof")
+    if snapshot is not None:
+        lines = [name + " call " + str(count) + ", peak traced memory (process-wide): " +
+                 str(peak) + " B"]
+        for stat in snapshot.statistics("lineno")[:50]:
+            lines.append(str(stat))
+        with open(prefix + ".mem.txt", "w") as f:
+            f.write("\n".join(lines) + "\n")
+    _rotate(directory, name, keep)
+
+
+def _writer():
+    while True:
+        profile = _WRITER["queue"].get()
+        try:
+            _write(*profile)
+        except Exception:
+            # a failed write does not stop the writer
+            pass
+        finally:
+            _WRITER["queue"].task_done()
+
+
+def _submit(profile):
+    with _LOCK:
+        if _WRITER["thread"] is None:
+            _WRITER["thread"] = threading.Thread(target=_writer, daemon=True,
+                                                 name="smhviz_profile_writer")
+            _WRITER["thread"].start()
+    _WRITER["queue"].put(profile)
+
+
+def flush_profiles():
+    """Wait for the profiles to be written
+
+    The profiles are written (and the old profiles removed) by a background thread, outside of
+    the profiled calls. Block until all the pending profiles are written.
+
+    :return: None
+    """
+    _WRITER["queue"].join()
+
+
+def profile_call(name, builder, args, kwargs):
+    """Run a layout function call, profiled if sampled
+
+    :parameter name: Name of the layout function
+    :type name: str
+    :parameter builder: Layout function
+    :type builder: function
+    :parameter args: Positional arguments of the layout function
+    :type args: tuple
+    :parameter kwargs: Keyword arguments of the layout function
+    :type kwargs: dict
+    :return: the output of the layout function
+    """
+    config = _current()
+    count = _sampled(config, name)
+    if count is None:
+        return builder(*args, **kwargs)
+    # tracemalloc is process-wide: only one call at a time is memory profiled
+    memory = config["memory"] and _MEMORY_LOCK.acquire(blocking=False)
+    profiler = cProfile.Profile()
+    start_tracemalloc = memory and not tracemalloc.is_tracing()
+    _LOCAL.active = True
+    try:
+        if start_tracemalloc:
+            tracemalloc.start()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already active in the process
+            profiler = None
+        try:
+            output = builder(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        snapshot = None
+        peak = None
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if start_tracemalloc:
+            tracemalloc.stop()
+        if memory:
+            _MEMORY_LOCK.release()
+        _LOCAL.active = False
+    _submit((config["directory"], name, count, config["keep"], profiler, snapshot, peak))
+    return output
+
+
+if os.environ.get("SMHVIZ_PROFILE"):
+    configure_profiling([i.strip() for i in os.environ["SMHVIZ_PROFILE"].split(",") if i.strip()],
+                        directory=os.environ.get("SMHVIZ_PROFILE_DIR", "./smhviz_profiles"),
+                        every=int(os.environ.get("SMHVIZ_PROFILE_EVERY", "100")),
+                        keep=int(os.environ.get("SMHVIZ_PROFILE_KEEP", "20")),
+                        memory=os.environ.get("SMHVIZ_PROFILE_MEMORY", "1") != "0")
@@ -0,0 +1,264 @@
+import argparse
+import collections
+import gzip
+import json
+import os
+import re
+import threading
+
+from dash import html, dcc
+
+from SMHviz_layout.cache import lru_get, lru_store
+from SMHviz_layout.instrument import instrumented, record_cache, record_file_read
+from SMHviz_layout.metadata_content import list_abstracts
+
+_INDEX_VERSION = 1
+# loaded index files, the least recently used are removed above _MAX_LOADED
+_LOADED = collections.OrderedDict()
+_MAX_LOADED = 8
+_LOCK = threading.Lock()
+
+
+def _tokenize(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def build_index(path="./visualization/data-visualization/model_abstracts/",
+                pattern="\d{4}-\d{2}-\d{2}-|-(A|a)bstract.md"):
+    """Create the full-text index of the abstracts
+
+    Create a positional inverted index of all the abstracts of all the rounds, from the same
+    folder structure as `make_abstract_tab()`: `"PATH/TO/roundX/YYYY-MM-DD-team_model-Abstract.md"`
+    (the other files and the subfolders of the round folders are ignored, see
+    `SMHviz_layout.metadata_content.list_abstracts()`). The abstracts are read as UTF-8, the
+    invalid characters are replaced.
+
+    :parameter path: Relative path to the folder containing the abstracts information for all round
+    :type path: str
+    :parameter pattern: pattern to extract team-model name from the file, by default
+        `"\d{4}-\d{2}-\d{2}-|-(A|a)bstract.md"`
+    :type pattern: str
+    :return: a dictionary with the keys: `docs` (list of the abstracts, with the round number,
+        round date, team-model name and filename relative to `path`) and `terms` (dictionary, for
+        each term, list of `[document number, [positions]]`)
+    """
+    docs = list()
+    terms = dict()
+    for round_folder in sorted(os.listdir(path)):
+        round_path = os.path.join(path, round_folder)
+        if not round_folder.startswith("round") or not os.path.isdir(round_path):
+            continue
+        for filename in list_abstracts(round_path):
+            with open(os.path.join(round_path, filename), "r", encoding="utf-8",
+                      errors="replace") as f:
+                text = f.read()
+            record_file_read()
+            date = re.match(r"\d{4}-\d{2}-\d{2}", filename)
+            docs.append([re.sub("^round", "", round_folder), date.group() if date else None,
+                         re.sub(pattern, "", filename), round_folder + "/" + filename])
+            postings = dict()
+            for position, term in enumerate(_tokenize(text)):
+                postings.setdefault(term, list()).append(position)
+            for term, positions in postings.items():
+                terms.setdefault(term, list()).append([len(docs) - 1, positions])
+    return {"docs": docs, "terms": terms}
+
+
+def write_index(index, filename):
+    """Write the abstracts index in a compact file
+
+    The index is written as gzip compressed JSON, with delta encoded positions.
+
+    :parameter index: Abstracts index, output of `build_index()`
+    :type index: dict
+    :parameter filename: Path to the output file (for example "abstract_index.json.gz")
+    :type filename: str
+    :return: None
+    """
+    terms = dict()
+    for term, postings in index["terms"].items():
+        terms[term] = [[doc, [positions[0]] + [positions[i] - positions[i - 1]
+                                               for i in range(1, len(positions))]]
+                       for doc, positions in postings]
+    payload = json.dumps({"version": _INDEX_VERSION, "docs": index["docs"], "terms": terms},
+                         separators=(",", ":")).encode("utf-8")
+    temp_file = filename + ".tmp"
+    with open(temp_file, "wb") as f:
+        f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+    os.replace(temp_file, filename)
+
+
+def load_index(filename):
+    """Load an abstracts index file
+
+    The index is read on the first call and kept in memory until the file changes (at most 8
+    index files are kept, the least recently used ones are removed first).
+
+    :parameter filename: Path to the index file, output of `write_index()`
+    :type filename: str
+    :return: the abstracts index, see `build_index()`
+    """
+    key = os.path.abspath(filename)
+    mtime = os.stat(key).st_mtime_ns
+    with _LOCK:
+        loaded = lru_get(_LOADED, key)
+    record_cache("search_index", loaded is not None and loaded[0] == mtime)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+    with gzip.open(key, "rb") as f:
+        content = json.loads(f.read())
+    record_file_read()
+    if content.get("version") != _INDEX_VERSION:
+        raise ValueError("Unsupported abstracts index version: " + str(content.get("version")))
+    terms = dict()
+    for term, postings in content["terms"].items():
+        terms[term] = list()
+        for doc, deltas in postings:
+            positions = list()
+            position = 0
+            for i in deltas:
+                position += i
+                positions.append(position)
+            terms[term].append([doc, positions])
+    index = {"docs": content["docs"], "terms": terms}
+    with _LOCK:
+        # replace the index of the previous version of the file
+        _LOADED.pop(key, None)
+        lru_store(_LOADED, key, (mtime, index), _MAX_LOADED)
+    return index
+
+
+def _parse_query(query):
+    phrases = list()
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        tokens = _tokenize(phrase if phrase else word)
+        if len(tokens) > 0:
+            phrases.append(tokens)
+    return phrases
+
+
+def _phrase_matches(index, tokens):
+    postings = [dict((doc, positions) for doc, positions in index["terms"].get(i, []))
+                for i in tokens]
+    matches = dict()
+    for doc, positions in postings[0].items():
+        if not all(doc in i for i in postings[1:]):
+            continue
+        following = [set(i[doc]) for i in postings[1:]]
+        count = sum(1 for p in positions
+                    if all(p + n + 1 in following[n] for n in range(len(following))))
+        if count > 0:
+            matches[doc] = count
+    return matches
+
+
+def search(index, query, round_number=None, limit=20):
+    """Search the abstracts
+
+    Return the abstracts containing all the keywords and phrases (between double quotes) of the
+    query, case-insensitive, sorted by number of matches.
+
+    :parameter index: Abstracts index, output of `build_index()` or `load_index()`
+    :type index: dict
+    :parameter query: Query, for example: `'"agent based" vaccination'`
+    :type query: str
+    :parameter round_number: Numeric identifier of a specific round (for example "13"), if `None`
+        (default), all the rounds are searched
+    :type round_number: str | int | None
+    :parameter limit: Maximum number of results
+    :type limit: int
+    :return: a list of dictionaries with the keys: `round`, `date`, `team_model`, `filename` and
+        `matches`
+    """
+    phrases = _parse_query(query)
+    if len(phrases) == 0:
+        return list()
+    scores = None
+    for tokens in phrases:
+        matches = _phrase_matches(index, tokens)
+        if scores is None:
+            scores = matches
+        else:
+            scores = {k: v + matches[k] for k, v in scores.items() if k in matches}
+    results = list()
+    for doc, score in scores.items():
+        round_id, date, team_model, filename = index["docs"][doc]
+        if round_number is not None and round_id != str(round_number):
+            continue
+        results.append({"round": round_id, "date": date, "team_model": team_model,
+                        "filename": filename, "matches": score})
+    results.sort(key=lambda x: (-x["matches"], x["filename"]))
+    return results[:limit]
+
+
+@instrumented()
+def make_abstract_search(id_append="", placeholder="Search the abstracts"):
+    """Create the abstract search box
+
+    Create a search box (id: `abstract-search<id_append>-input`) and an empty results list (id:
+    `abstract-search<id_append>-output`), to update with `render_search_results()`.
+
+    :parameter id_append: Character to append to the objects IDs.
+    :type id_append: str
+    :parameter placeholder: Placeholder text of the search box
+    :type placeholder: str
+    :return: Div component with the search box and results list
+    """
+    output = html.Div([
+        dcc.Input(id="abstract-search" + id_append + "-input", type="search", debounce=True,
+                  placeholder=placeholder),
+        html.Br(),
+        html.Div(id="abstract-search" + id_append + "-output")
+    ])
+    return output
+
+
+@instrumented()
+def render_search_results(index, query, round_number=None, limit=20, id_append=""):
+    """Create the abstract search results
+
+    Each result is a link with a pattern-matching id: `{"type": "abstract-search<id_append>-result",
+    "round": <round number>, "team_model": <team-model name>}`, to open the matching abstract
+    (value of the `abstract<id_append>-dropdown` dropdown of `make_abstract_tab()`) in a callback.
+
+    :parameter index: Abstracts index, output of `build_index()` or `load_index()`
+    :type index: dict
+    :parameter query: Query, see `search()`
+    :type query: str
+    :parameter round_number: Numeric identifier of a specific round (for example "13"), if `None`
+        (default), all the rounds are searched
+    :type round_number: str | int | None
+    :parameter limit: Maximum number of results
+    :type limit: int
+    :parameter id_append: Character to append to the objects IDs, see `make_abstract_search()`
+    :type id_append: str
+    :return: Div component with the list of the matching abstracts
+    """
+    if query is None or len(_parse_query(query)) == 0:
+        return html.Div()
+    results = search(index, query, round_number=round_number, limit=limit)
+    if len(results) == 0:
+        return html.Div([html.P("No abstract found.")])
+    entries = list()
+    for i in results:
+        link = html.A("Round " + i["round"] + " - " + i["team_model"], href="#", n_clicks=0,
+                      id={"type": "abstract-search" + id_append + "-result", "round": i["round"],
+                          "team_model": i["team_model"]})
+        entries.append(html.Li([link, " (" + str(i["matches"]) + " match" +
+                                ("es" if i["matches"] > 1 else "") + ")"]))
+    return html.Div([html.Ul(entries)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m SMHviz_layout.search",
+                                     description="Create the full-text index of the abstracts")
+    parser.add_argument("path", help="folder containing the abstracts of all the rounds")
+    parser.add_argument("output", help="output index file, for example abstract_index.json.gz")
+    args = parser.parse_args(argv)
+    index = build_index(args.path)
+    write_index(index, args.output)
+    print(str(len(index["docs"])) + " abstracts, " + str(len(index["terms"])) + " terms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from dash import dcc
+from dash.development.base_component import Component
+
+_CONTROLS = ["Checklist", "RadioItems", "Dropdown", "Slider", "RangeSlider", "Input"]
+
+
+def selection_store(store_id="plot-selections", storage_type="session"):
+    """Create the store of the plot tab selections
+
+    Store component keeping the last values selected by the user in the sidebar and plot bar of
+    each plot tab, see `store_selections()`. The store data (`data` property) can then be given
+    to `make_sidebar()` and `make_plot_bar()` (`selections` parameter) to create the controls
+    already set to the last values of the tab.
+
+    :parameter store_id: Id of the Store component, by default `"plot-selections"`
+    :type store_id: str
+    :parameter storage_type: Storage of the data in the browser: "memory" (until the page is
+        refreshed), "session" (default, until the browser tab is closed) or "local"
+    :type storage_type: str
+    :return: a Store component
+    """
+    return dcc.Store(id=store_id, storage_type=storage_type, data=dict())
+
+
+def store_selections(data, tab, values):
+    """Store the values selected in a plot tab
+
+    :parameter data: Data of the store component (`data` property), `None` if empty
+    :type data: dict | None
+    :parameter tab: Internal id of the plot tab
+    :type tab: str
+    :parameter values: Dictionary with the control component id (key) and the selected value
+        (value)
+    :type values: dict
+    :return: the new data of the store component
+    """
+    data = dict(data or dict())
+    data[tab] = dict(data.get(tab, dict()), **values)
+    return data
+
+
+def tab_selections(data, tab):
+    """Values stored for a plot tab
+
+    :parameter data: Data of the store component (`data` property), `None` if empty
+    :type data: dict | None
+    :parameter tab: Internal id of the plot tab
+    :type tab: str
+    :return: a dictionary with the control component id (key) and the stored value (value)
+    """
+    if not data:
+        return dict()
+    return data.get(tab) or dict()
+
+
+def _walk(component):
+    yield component
+    children = getattr(component, "children", None)
+    if isinstance(children, Component):
+        children = [children]
+    if isinstance(children, (list, tuple)):
+        for child in children:
+            if isinstance(child, Component):
+                yield from _walk(child)
+
+
+def _allowed_values(options):
+    if isinstance(options, dict):
+        return list(options)
+    values = list()
+    for i in options:
+        if isinstance(i, dict):
+            if i.get("disabled") is not True:
+                values.append(i.get("value"))
+        else:
+            values.append(i)
+    return values
+
+
+def _valid_value(component, value):
+    if component._type in ["Slider", "RangeSlider"]:
+        bounds = [getattr(component, "min", None), getattr(component, "max", None)]
+        for i in (value if isinstance(value, list) else [value]):
+            if not isinstance(i, (int, float)) or isinstance(i, bool):
+                return None
+            if (bounds[0] is not None and i < bounds[0]) or \
+                    (bounds[1] is not None and i > bounds[1]):
+                return None
+        if (component._type == "RangeSlider") != isinstance(value, list):
+            return None
+        return value
+    options = getattr(component, "options", None)
+    if options is None:
+        return value
+    allowed = _allowed_values(options)
+    if component._type == "Checklist" or (component._type == "Dropdown" and
+                                          getattr(component, "multi", None) is True):
+        if not isinstance(value, list):
+            return None
+        valid = [i for i in value if i in allowed]
+        if len(value) > 0 and len(valid) == 0:
+            return None
+        return valid
+    if value not in allowed:
+        return None
+    return value
+
+
+def apply_selections(component, selections):
+    """Set the controls of a layout to the stored values
+
+    Set the value of each control (checklist, radio items, dropdown, slider, input) of the
+    layout with a stored value, only if the control is not disabled and if the value is still
+    valid (in the non-disabled options, or in the slider range): a stored value not available in
+    the layout (for example in another round) is ignored and the default value is kept.
+
+    :parameter component: Layout, for example the output of `make_sidebar()`
+    :type component: dash.development.base_component.Component
+    :parameter selections: Dictionary with the control component id (key) and the stored value
+        (value), see `tab_selections()`
+    :type selections: dict
+    :return: the layout (modified in place)
+    """
+    if not selections:
+        return component
+    for i in _walk(component):
+        component_id = getattr(i, "id", None)
+        if i._type not in _CONTROLS or not isinstance(component_id, str) or \
+                component_id not in selections:
+            continue
+        if getattr(i, "disabled", None) is True:
+            continue
+        options = getattr(i, "options", None)
+        if options is not None and len(options) > 0 and len(_allowed_values(options)) == 0:
+            continue
+        value = _valid_value(i, selections[component_id])
+        if value is not None:
+            i.value = value
+    return component
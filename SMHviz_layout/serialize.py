@@ -0,0 +1,39 @@
+import json
+
+from plotly.io.json import to_json_plotly
+
+
+def to_json(component):
+    """Serialize a layout component
+
+    Serialize any component (or list of components) returned by the layout functions in the same
+    JSON format as the one sent by Dash to the browser.
+
+    :parameter component: Dash component, list of components or JSON serializable object
+    :type component: dash.development.base_component.Component | list | dict
+    :return: the JSON string of the component
+    """
+    return to_json_plotly(component)
+
+
+def to_json_bytes(component):
+    """Serialize a layout component in UTF-8 encoded bytes
+
+    :parameter component: Dash component, list of components or JSON serializable object
+    :type component: dash.development.base_component.Component | list | dict
+    :return: the UTF-8 encoded JSON of the component
+    """
+    return to_json(component).encode("utf-8")
+
+
+def canonical_json(component):
+    """Serialize a layout component in a canonical form
+
+    Serialize the component with sorted keys and without whitespace, two components with the
+    same content always return the same string (can be used for comparison or hashing).
+
+    :parameter component: Dash component, list of components or JSON serializable object
+    :type component: dash.development.base_component.Component | list | dict
+    :return: the canonical JSON string of the component
+    """
+    return json.dumps(json.loads(to_json(component)), sort_keys=True, separators=(",", ":"))
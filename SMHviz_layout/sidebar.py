@@ -1,8 +1,19 @@
 import re
 import pandas as pd
 from SMHviz_layout.utils import *
+from SMHviz_layout.cache import cached_read
+from SMHviz_layout.instrument import instrumented, record_file_read
+from SMHviz_layout.options import column_values, option_list
+from SMHviz_layout.selections import apply_selections, tab_selections
 
 
+def _read_scenario(scenario_file):
+    scen_info = pd.read_csv(scenario_file)
+    record_file_read()
+    return scen_info
+
+
+@instrumented()
 def scenario_selection(scen_check, invert_scen, unselect_scenario=None, div_type="radio",
                        disabled=False, css_check="checklist", css_radio="radioItems",
                        css_p_disabled="p disabled", css_check_disabled="checklist disabled",
@@ -59,9 +70,8 @@ def scenario_selection(scen_check, invert_scen, unselect_scenario=None, div_type
         if unselect_scenario is not None:
             if i in unselect_scenario:
                 scen_value.remove(invert_scen.get(i))
-    list_opt = list()
-    for i in scen_check:
-        list_opt.append({"label": scen_check[i], "value": i, "disabled": True})
+    list_opt = option_list(({"label": scen_check[i], "value": i} for i in scen_check),
+                           disabled=True)
     # Div component
     if div_type == "radio":
         if disabled is True:
@@ -97,6 +107,7 @@ def scenario_selection(scen_check, invert_scen, unselect_scenario=None, div_type
     return scenario_sel
 
 
+@instrumented()
 def location_selection(location_info, sel_value="US", disabled=False, clearable=False,
                        css_drop="dropdown", css_drop_disabled="dropdown disabled",
                        css_p_disabled="p disabled"):
@@ -142,6 +153,7 @@ def location_selection(location_info, sel_value="US", disabled=False, clearable=
     return location_sel
 
 
+@instrumented()
 def target_selection(target_dict, def_target, title="Target:", id_name="target-radio",
                      disabled=False, css_p_disabled="p disabled", css_radio="radioItems",
                      css_radio_disabled="radioItems disabled"):
@@ -171,9 +183,8 @@ def target_selection(target_dict, def_target, title="Target:", id_name="target-r
     :return: Component for Target selection
     """
     if disabled is True:
-        list_opt = list()
-        for i in target_dict:
-            list_opt.append({"label": target_dict[i], "value": i, "disabled": True})
+        list_opt = option_list(({"label": target_dict[i], "value": i} for i in target_dict),
+                               disabled=True)
         target_sel = html.Div([
             html.P(title, className=css_p_disabled),
             dcc.RadioItems(
@@ -189,6 +200,7 @@ def target_selection(target_dict, def_target, title="Target:", id_name="target-r
     return target_sel
 
 
+@instrumented()
 def ui_selection(options, value, disabled=False, add_description=None,
                  css_radio="radioItems", css_p_disabled="p disabled",
                  css_radio_disabled="radioItems disabled"):
@@ -216,8 +228,7 @@ def ui_selection(options, value, disabled=False, add_description=None,
     """
     # Prerequisite
     if disabled is True:
-        for i in options:
-            i.update({"disabled": True})
+        options = option_list(options, disabled=True)
         ui_sel = html.Div([
             html.P("Uncertainty Interval: ", className=css_p_disabled),
             dcc.RadioItems(
@@ -237,80 +248,52 @@ def ui_selection(options, value, disabled=False, add_description=None,
     return ui_sel
 
 
-def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict, target_dict,
-                 def_target, age_group=None, race_ethnicity=None, ui_sel_list=None, ui_val=95,
-                 unselect_scenario=None, cumulative=True, multi_ui=True, round_name=None,
-                 css_left_col="column left", css_check="checklist", css_radio="radioItems",
-                 css_p_disabled="p disabled", css_check_disabled="checklist disabled",
-                 css_radio_disabled="radioItems disabled", css_drop="dropdown",
-                 css_drop_disabled="dropdown disabled"):
-    """Create the sidebar on the SMH visualization websites
-
-    The sidebar is depending on the round and on the plot tab selected.
+def _sidebar_prerequisites(round_number, scenario_file, location_info, scenario_dict,
+                           target_dict, def_target):
+    # Tab independent information of the sidebar of a round
+    # Scenario
+    scen_info = cached_read("csv", scenario_file, _read_scenario)
+    scen_info = scen_info[scen_info["round"] == "round" + str(round_number)]
+    scen_info = dict(zip(scen_info["scenario_id"], scen_info["scenario_fullname"]))
+    scen_check = list()
+    for i in scen_info:
+        scen_check.append(i + " (" + scen_info[i] + ")")
+    scen_check = dict(zip(scen_info.keys(), scen_check))
+    invert_scen = {v: k for k, v in scenario_dict.items()}
+    # Location
+    list_location = column_values(location_info, "location_name",
+                                  exclude=['U.S. Minor Outlying Islands'])
+    # Target
+    def_targ = str()
+    for targ in target_dict.keys():
+        if len(re.findall(def_target, targ)) > 0:
+            def_targ = targ
+            break
+    target_partition = dict()
+    for search_term in ["inc ", "cum "]:
+        part_def_targ = def_targ
+        for targ in target_dict.keys():
+            if len(re.findall(search_term + def_target, targ)) > 0:
+                part_def_targ = targ
+                break
+        sel_target = list()
+        for i in target_dict:
+            if re.search(search_term, i) is not None:
+                sel_target.append(i)
+        target_partition[search_term] = (dict(zip(sel_target, [target_dict[x] for x in
+                                                               sel_target])), part_def_targ)
+    return {"scen_check": scen_check, "invert_scen": invert_scen, "list_location": list_location,
+            "target_dict": target_dict, "def_targ": def_targ,
+            "target_partition": target_partition}
 
-    For the "Scenario plot" only: if the `multi_ui` parameter is set to True, a "multi" choice
-    will be appended to the uncertainty interval radioItems (`ui_sel_list`) with
-    `{"label": "Multi", "value": -1}` and a small description will  be displayed: 'multi'
-    displays 95%, 90%, 80%, and 50% uncertainty intervals, shaded from lightest (95%) to darkest
-    (50%)"`, with a CSS: `className="span_sidebar"`
 
-    :parameter round_number: Numeric identifier of a specific round tab (for example "13")
-    :type round_number: str | int
-    :parameter tab: Selected tab associated with the sidebar
-    :type tab: str
-    :parameter scenario_file: Path to CSV file containing scenario information per round
-    :type scenario_file: str
-    :parameter location_info: table containing location information in the SMH standard
-    :type location_info: DataFrame
-    :parameter scenario_dict: A dictionary with scenario id (value) and associated number (key)
-    :type scenario_dict: dict
-    :parameter target_dict: A dictionary with target name (as in submission file) as keys and
-        target full name as value
-    :type target_dict: dict
-    :parameter def_target: Character indicating default target selection (for example: "hosp")
-    :type def_target: str
-    :parameter age_group: A dictionary with age group (value) and associated variable (key), if `
-        None` (default), no age group filter in the output
-    :type age_group: None | dict
-    :parameter race_ethnicity:  A dictionary with race ethnicity (value) and associated variable
-        (key), if `None` (default), no race ethnicity filter in the output
-    :type race_ethnicity: None | dict
-    :parameter ui_sel_list: A dictionary with the "label" and "value" information (example:
-        "{"label": "None", "value": 0}"). If `None`: [{"label": "None", "value": 0},
-        {"label": "50%", "value": 50}, {"label": "95%", "value": 95}]
-    :type ui_sel_list: dict
-    :parameter age_group: age group information, None if not included
-    :type age_group: None | str | dict
-    :parameter ui_val: Value indicating default uncertainty interval selection (default: 95).
-    :type ui_val: int
-    :parameter unselect_scenario: A list of scenario id to uncheck by default. If None, all selected
-    :type unselect_scenario: list
-    :parameter cumulative: [For risk map only] Boolean, to use cumulative (True) or incident
-        target(s) (False)
-    :type cumulative: bool
-    :parameter multi_ui: [For scenario plot only] Boolean, to include a "multi" options in the
-        uncertainty interval choices
-    :type multi_ui: bool
-    :parameter round_name: Name of the round to display, if None "Round <Number>"
-    :type round_name: str
-    :parameter css_left_col: string, name of the associated CSS element, see documentation
-    :type css_left_col: str
-    :parameter css_check: string, name of the associated CSS element, see documentation
-    :type css_check: str
-    :parameter css_radio: string, name of the associated CSS element, see documentation
-    :type css_radio: str
-    :parameter css_p_disabled: string, name of the associated CSS element, see documentation
-    :type css_p_disabled: str
-    :parameter css_check_disabled: string, name of the associated CSS element, see documentation
-    :type css_check_disabled: str
-    :parameter css_radio_disabled: string, name of the associated CSS element, see documentation
-    :type css_radio_disabled: str
-    :parameter css_drop: string, name of the associated CSS element, see documentation
-    :type css_drop: str
-    :parameter css_drop_disabled: string, name of the associated CSS element, see documentation
-    :type css_drop_disabled: str
-    :return: a Div component with the sidebar code associated with the round and tab selected
-    """
+def _tab_sidebar(prerequisites, round_number, tab, age_group=None, race_ethnicity=None,
+                 ui_sel_list=None, ui_val=95, unselect_scenario=None, cumulative=True,
+                 multi_ui=True, round_name=None, css_left_col="column left", css_check="checklist",
+                 css_radio="radioItems", css_p_disabled="p disabled",
+                 css_check_disabled="checklist disabled",
+                 css_radio_disabled="radioItems disabled", css_drop="dropdown",
+                 css_drop_disabled="dropdown disabled"):
     # Prerequisite
     if ui_sel_list is None:
         ui_sel_list = [{"label": "None", "value": 0},
@@ -318,14 +301,8 @@ def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict,
                        {"label": "95%", "value": 95}]
     # Tab-specific output
     # Scenario
-    scen_info = pd.read_csv(scenario_file)
-    scen_info = scen_info[scen_info["round"] == "round" + str(round_number)]
-    scen_info = dict(zip(scen_info["scenario_id"], scen_info["scenario_fullname"]))
-    scen_check = list()
-    for i in scen_info:
-        scen_check.append(i + " (" + scen_info[i] + ")")
-    scen_check = dict(zip(scen_info.keys(), scen_check))
-    invert_scen = {v: k for k, v in scenario_dict.items()}
+    scen_check = prerequisites["scen_check"]
+    invert_scen = prerequisites["invert_scen"]
     if tab in ["scenario", "model_distribution", "spaghetti", "multipat_plot", "proj_peaks",
                "peak_time_model", "peak_size", "multipat_plot_comb", "multipat_plot_comb1",
                "scenario_disp", "spaghetti_disp"]:
@@ -351,9 +328,7 @@ def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict,
                                           css_radio_disabled=css_radio_disabled,
                                           css_radio=css_radio)
     # Location
-    list_location = list(location_info["location_name"])
-    if 'U.S. Minor Outlying Islands' in list_location:
-        list_location.remove('U.S. Minor Outlying Islands')
+    list_location = prerequisites["list_location"]
     if tab in ["scenario", "spaghetti", "model_specific", "scen_comparison", "model_distribution",
                "multipat_plot", "peak_size", "multipat_plot_comb", "multipat_plot_comb1",
                "scenario_disp", "spaghetti_disp", "model_disp", "scen_sample_comp",
@@ -366,11 +341,8 @@ def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict,
                                           css_drop_disabled=css_drop_disabled,
                                           css_p_disabled=css_p_disabled)
     # Target
-    def_targ = str()
-    for targ in target_dict.keys():
-        if len(re.findall(def_target, targ)) > 0:
-            def_targ = targ
-            break
+    target_dict = prerequisites["target_dict"]
+    def_targ = prerequisites["def_targ"]
     if tab in ["scenario", "spaghetti", "scenario_disp", "spaghetti_disp"]:
         target_sel = target_selection(target_dict, def_targ)
     elif tab in ["state_deviation", "trend_map", "multipat_plot", "proj_peaks", "heatmap",
@@ -380,15 +352,7 @@ def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict,
             search_term = "cum "
         else:
             search_term = "inc "
-        for targ in target_dict.keys():
-            if len(re.findall(search_term + def_target, targ)) > 0:
-                def_targ = targ
-                break
-        sel_target = list()
-        for i in target_dict:
-            if re.search(search_term, i) is not None:
-                sel_target.append(i)
-        target_dict = dict(zip(sel_target, [target_dict[x] for x in sel_target]))
+        target_dict, def_targ = prerequisites["target_partition"][search_term]
         target_sel = target_selection(target_dict, def_targ, css_p_disabled=css_p_disabled,
                                       css_radio_disabled=css_radio_disabled, css_radio=css_radio)
     else:
@@ -398,7 +362,7 @@ def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict,
     # UI
     if tab in ["scenario", "model_specific", "scenario_disp", "model_disp"]:
         if (multi_ui is True) and (tab in ["scenario", "scenario_disp"]):
-            ui_sel_list.append({"label": "Multi", "value": -1})
+            ui_sel_list = ui_sel_list + [{"label": "Multi", "value": -1}]
             ui_text = html.Span("'multi' displays 95%, 90%, 80%, and 50% uncertainty "
                                 "intervals, shaded from lightest (95%) to darkest (50%)",
                                 className="span_sidebar")
@@ -461,3 +425,183 @@ def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict,
         ui_sel,
     ], className=css_left_col)
     return sidebar
+
+
+@instrumented("tab")
+def make_sidebar(round_number, tab, scenario_file, location_info, scenario_dict, target_dict,
+                 def_target, age_group=None, race_ethnicity=None, ui_sel_list=None, ui_val=95,
+                 unselect_scenario=None, cumulative=True, multi_ui=True, round_name=None,
+                 css_left_col="column left", css_check="checklist", css_radio="radioItems",
+                 css_p_disabled="p disabled", css_check_disabled="checklist disabled",
+                 css_radio_disabled="radioItems disabled", css_drop="dropdown",
+                 css_drop_disabled="dropdown disabled", selections=None):
+    """Create the sidebar on the SMH visualization websites
+
+    The sidebar is depending on the round and on the plot tab selected.
+
+    For the "Scenario plot" only: if the `multi_ui` parameter is set to True, a "multi" choice
+    will be appended to the uncertainty interval radioItems (`ui_sel_list`) with
+    `{"label": "Multi", "value": -1}` and a small description will  be displayed: 'multi'
+    displays 95%, 90%, 80%, and 50% uncertainty intervals, shaded from lightest (95%) to darkest
+    (50%)"`, with a CSS: `className="span_sidebar"`
+
+    :parameter round_number: Numeric identifier of a specific round tab (for example "13")
+    :type round_number: str | int
+    :parameter tab: Selected tab associated with the sidebar
+    :type tab: str
+    :parameter scenario_file: Path to CSV file containing scenario information per round
+    :type scenario_file: str
+    :parameter location_info: table containing location information in the SMH standard
+    :type location_info: DataFrame
+    :parameter scenario_dict: A dictionary with scenario id (value) and associated number (key)
+    :type scenario_dict: dict
+    :parameter target_dict: A dictionary with target name (as in submission file) as keys and
+        target full name as value
+    :type target_dict: dict
+    :parameter def_target: Character indicating default target selection (for example: "hosp")
+    :type def_target: str
+    :parameter age_group: A dictionary with age group (value) and associated variable (key), if `
+        None` (default), no age group filter in the output
+    :type age_group: None | dict
+    :parameter race_ethnicity:  A dictionary with race ethnicity (value) and associated variable
+        (key), if `None` (default), no race ethnicity filter in the output
+    :type race_ethnicity: None | dict
+    :parameter ui_sel_list: A dictionary with the "label" and "value" information (example:
+        "{"label": "None", "value": 0}"). If `None`: [{"label": "None", "value": 0},
+        {"label": "50%", "value": 50}, {"label": "95%", "value": 95}]
+    :type ui_sel_list: dict
+    :parameter age_group: age group information, None if not included
+    :type age_group: None | str | dict
+    :parameter ui_val: Value indicating default uncertainty interval selection (default: 95).
+    :type ui_val: int
+    :parameter unselect_scenario: A list of scenario id to uncheck by default. If None, all selected
+    :type unselect_scenario: list
+    :parameter cumulative: [For risk map only] Boolean, to use cumulative (True) or incident
+        target(s) (False)
+    :type cumulative: bool
+    :parameter multi_ui: [For scenario plot only] Boolean, to include a "multi" options in the
+        uncertainty interval choices
+    :type multi_ui: bool
+    :parameter round_name: Name of the round to display, if None "Round <Number>"
+    :type round_name: str
+    :parameter css_left_col: string, name of the associated CSS element, see documentation
+    :type css_left_col: str
+    :parameter css_check: string, name of the associated CSS element, see documentation
+    :type css_check: str
+    :parameter css_radio: string, name of the associated CSS element, see documentation
+    :type css_radio: str
+    :parameter css_p_disabled: string, name of the associated CSS element, see documentation
+    :type css_p_disabled: str
+    :parameter css_check_disabled: string, name of the associated CSS element, see documentation
+    :type css_check_disabled: str
+    :parameter css_radio_disabled: string, name of the associated CSS element, see documentation
+    :type css_radio_disabled: str
+    :parameter css_drop: string, name of the associated CSS element, see documentation
+    :type css_drop: str
+    :parameter css_drop_disabled: string, name of the associated CSS element, see documentation
+    :type css_drop_disabled: str
+    :parameter selections: Data of the selection store component (see
+        `SMHviz_layout.selections.selection_store()`), the controls of the plot tab are set to the
+        last values selected by the user, if still valid. If `None` (default), the default
+        values are used
+    :type selections: dict | None
+    :return: a Div component with the sidebar code associated with the round and tab selected
+    """
+    prerequisites = _sidebar_prerequisites(round_number, scenario_file, location_info,
+                                           scenario_dict, target_dict, def_target)
+    sidebar = _tab_sidebar(prerequisites, round_number, tab, age_group=age_group,
+                           race_ethnicity=race_ethnicity, ui_sel_list=ui_sel_list, ui_val=ui_val,
+                           unselect_scenario=unselect_scenario, cumulative=cumulative,
+                           multi_ui=multi_ui, round_name=round_name, css_left_col=css_left_col,
+                           css_check=css_check, css_radio=css_radio,
+                           css_p_disabled=css_p_disabled, css_check_disabled=css_check_disabled,
+                           css_radio_disabled=css_radio_disabled, css_drop=css_drop,
+                           css_drop_disabled=css_drop_disabled)
+    return apply_selections(sidebar, tab_selections(selections, tab))
+
+
+@instrumented()
+def make_sidebars(round_number, tabs, scenario_file, location_info, scenario_dict, target_dict,
+                  def_target, age_group=None, race_ethnicity=None, ui_sel_list=None, ui_val=95,
+                  unselect_scenario=None, cumulative=True, multi_ui=True, round_name=None,
+                  css_left_col="column left", css_check="checklist", css_radio="radioItems",
+                  css_p_disabled="p disabled", css_check_disabled="checklist disabled",
+                  css_radio_disabled="radioItems disabled", css_drop="dropdown",
+                  css_drop_disabled="dropdown disabled", selections=None):
+    """Create the sidebars of multiple plot tabs
+
+    Create the sidebar of each plot tab in `tabs` for a round, same output as calling
+    `make_sidebar()` for each tab, but the scenario file is read and the scenario, location and
+    target information are prepared only once for all the tabs.
+
+    :parameter round_number: Numeric identifier of a specific round tab (for example "13")
+    :type round_number: str | int
+    :parameter tabs: List of plot tabs associated with the sidebars
+    :type tabs: list
+    :parameter scenario_file: Path to CSV file containing scenario information per round
+    :type scenario_file: str
+    :parameter location_info: table containing location information in the SMH standard
+    :type location_info: DataFrame
+    :parameter scenario_dict: A dictionary with scenario id (value) and associated number (key)
+    :type scenario_dict: dict
+    :parameter target_dict: A dictionary with target name (as in submission file) as keys and
+        target full name as value
+    :type target_dict: dict
+    :parameter def_target: Character indicating default target selection (for example: "hosp")
+    :type def_target: str
+    :parameter age_group: see `make_sidebar()`
+    :type age_group: None | dict
+    :parameter race_ethnicity: see `make_sidebar()`
+    :type race_ethnicity: None | dict
+    :parameter ui_sel_list: see `make_sidebar()`
+    :type ui_sel_list: dict
+    :parameter ui_val: see `make_sidebar()`
+    :type ui_val: int
+    :parameter unselect_scenario: see `make_sidebar()`
+    :type unselect_scenario: list
+    :parameter cumulative: see `make_sidebar()`
+    :type cumulative: bool
+    :parameter multi_ui: see `make_sidebar()`
+    :type multi_ui: bool
+    :parameter round_name: see `make_sidebar()`
+    :type round_name: str
+    :parameter css_left_col: string, name of the associated CSS element, see documentation
+    :type css_left_col: str
+    :parameter css_check: string, name of the associated CSS element, see documentation
+    :type css_check: str
+    :parameter css_radio: string, name of the associated CSS element, see documentation
+    :type css_radio: str
+    :parameter css_p_disabled: string, name of the associated CSS element, see documentation
+    :type css_p_disabled: str
+    :parameter css_check_disabled: string, name of the associated CSS element, see documentation
+    :type css_check_disabled: str
+    :parameter css_radio_disabled: string, name of the associated CSS element, see documentation
+    :type css_radio_disabled: str
+    :parameter css_drop: string, name of the associated CSS element, see documentation
+    :type css_drop: str
+    :parameter css_drop_disabled: string, name of the associated CSS element, see documentation
+    :type css_drop_disabled: str
+    :parameter selections: Data of the selection store component (see
+        `SMHviz_layout.selections.selection_store()`), the controls of each plot tab are set to
+        the last values selected by the user, if still valid. If `None` (default), the default
+        values are used
+    :type selections: dict | None
+    :return: a dictionary with the plot tab (key) and the Div component with the sidebar
+        associated with the round and tab (value)
+    """
+    prerequisites = _sidebar_prerequisites(round_number, scenario_file, location_info,
+                                           scenario_dict, target_dict, def_target)
+    sidebars = dict()
+    for tab in tabs:
+        sidebars[tab] = _tab_sidebar(prerequisites, round_number, tab, age_group=age_group,
+                                     race_ethnicity=race_ethnicity, ui_sel_list=ui_sel_list,
+                                     ui_val=ui_val, unselect_scenario=unselect_scenario,
+                                     cumulative=cumulative, multi_ui=multi_ui,
+                                     round_name=round_name, css_left_col=css_left_col,
+                                     css_check=css_check, css_radio=css_radio,
+                                     css_p_disabled=css_p_disabled,
+                                     css_check_disabled=css_check_disabled,
+                                     css_radio_disabled=css_radio_disabled, css_drop=css_drop,
+                                     css_drop_disabled=css_drop_disabled)
+        apply_selections(sidebars[tab], tab_selections(selections, tab))
+    return sidebars
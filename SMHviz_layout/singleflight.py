@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import weakref
+
+_CALLS = dict()
+# running calls of each event loop, removed with the event loop
+_ASYNC_CALLS = weakref.WeakKeyDictionary()
+_LOCK = threading.Lock()
+
+
+def make_key(builder, args, kwargs):
+    """Key of a layout function call
+
+    Return a hashable key identifying a call of a layout function: lists, tuples, sets and
+    dictionaries are compared by content, the other hashable values by type and value (`True`,
+    `1` and `1.0` are different arguments), other unhashable objects (for example DataFrame or
+    Dash components) are compared by identity (same object).
+
+    :parameter builder: Layout function
+    :type builder: function
+    :parameter args: Positional arguments of the layout function
+    :type args: tuple
+    :parameter kwargs: Keyword arguments of the layout function
+    :type kwargs: dict
+    :return: a hashable key
+    """
+    return (builder.__module__, builder.__qualname__, _freeze(args), _freeze(kwargs))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted(((_freeze(k), _freeze(v)) for k, v in value.items()),
+                                     key=lambda x: repr(x[0]))))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", tuple(sorted((_freeze(v) for v in value), key=repr)))
+    try:
+        hash(value)
+    except TypeError:
+        return ("id", id(value))
+    return (type(value), value)
+
+
+def do(key, func, *args, **kwargs):
+    """Run a function once for concurrent identical calls (threads)
+
+    If a call with the same `key` is already running in another thread, wait for its end and
+    return its output (or raise its exception), else run `func(*args, **kwargs)`. The output is
+    shared between all the waiting callers and should not be modified.
+
+    :parameter key: Hashable key identifying the call, see `make_key()`
+    :type key: tuple | str
+    :parameter func: Function to run
+    :type func: function
+    :parameter args: Positional arguments of the function
+    :parameter kwargs: Keyword arguments of the function
+    :return: the output of the function
+    """
+    with _LOCK:
+        call = _CALLS.get(key)
+        leader = call is None
+        if leader:
+            call = {"event": threading.Event(), "output": None, "error": None}
+            _CALLS[key] = call
+    if not leader:
+        call["event"].wait()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["output"]
+    try:
+        call["output"] = func(*args, **kwargs)
+    except BaseException as e:
+        call["error"] = e
+        raise
+    finally:
+        with _LOCK:
+            _CALLS.pop(key, None)
+        call["event"].set()
+    return call["output"]
+
+
+async def do_async(key, func, *args, executor=None, **kwargs):
+    """Run a function once for concurrent identical calls (asyncio)
+
+    If a call with the same `key` is already running in the event loop, await its end and return
+    its output, else run the function: a coroutine function is awaited, a synchronous function is
+    run in `executor` (and shares its call with the threaded callers of `do()`). The output is
+    shared between all the waiting callers and should not be modified.
+
+    :parameter key: Hashable key identifying the call, see `make_key()`
+    :type key: tuple | str
+    :parameter func: Function or coroutine function to run
+    :type func: function
+    :parameter args: Positional arguments of the function
+    :parameter executor: Executor running the synchronous functions, if `None` (default), the
+        default executor of the event loop
+    :type executor: concurrent.futures.Executor | None
+    :parameter kwargs: Keyword arguments of the function
+    :return: the output of the function
+    """
+    loop = asyncio.get_running_loop()
+    calls = _ASYNC_CALLS.get(loop)
+    if calls is None:
+        with _LOCK:
+            calls = _ASYNC_CALLS.setdefault(loop, dict())
+    future = calls.get(key)
+    if future is None:
+        if inspect.iscoroutinefunction(func):
+            future = asyncio.ensure_future(func(*args, **kwargs))
+        else:
+            call = functools.partial(contextvars.copy_context().run, do, key, func, *args,
+                                     **kwargs)
+            future = loop.run_in_executor(executor, call)
+        calls[key] = future
+        future.add_done_callback(lambda _: calls.pop(key, None))
+    return await asyncio.shield(future)
+
+
+def single_flight(builder):
+    """Single-flight version of a layout function (threads)
+
+    Return a function with the same parameters as `builder`, concurrent calls with identical
+    arguments (see `make_key()`) run the layout function only once and share its output, for
+    example:
+
+        make_sidebar_once = single_flight(make_sidebar)
+
+    :parameter builder: Layout function
+    :type builder: function
+    :return: the single-flight layout function
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        return do(make_key(builder, args, kwargs), builder, *args, **kwargs)
+
+    return wrapper
+
+
+def single_flight_async(builder, executor=None):
+    """Single-flight version of a layout function (asyncio)
+
+    Return a coroutine function with the same parameters as `builder`, concurrent calls with
+    identical arguments (see `make_key()`) run the layout function only once and share its
+    output. A synchronous layout function is run in `executor`.
+
+    :parameter builder: Layout function or asynchronous layout function
+    :type builder: function
+    :parameter executor: Executor running the synchronous layout function, if `None` (default),
+        the default executor of the event loop
+    :type executor: concurrent.futures.Executor | None
+    :return: the single-flight coroutine function
+    """
+    @functools.wraps(builder)
+    async def wrapper(*args, **kwargs):
+        return await do_async(make_key(builder, args, kwargs), builder, *args, executor=executor,
+                              **kwargs)
+
+    return wrapper
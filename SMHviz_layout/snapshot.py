@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from SMHviz_layout.artifacts import load_artifact
+from SMHviz_layout.build import build_hub_layouts, build_round, load_config
+from SMHviz_layout.serialize import canonical_json, to_json_bytes
+
+_VERSIONS = dict()
+_LOCK = threading.Lock()
+_ROUND_KINDS = ["tab_plots", "abstract_tab", "sidebar", "plot_bar"]
+
+
+def content_hash(layouts, scope=""):
+    """Content hash of a set of layouts
+
+    The hash only depends on the content of the layouts (canonical JSON, see
+    `SMHviz_layout.serialize.canonical_json()`) and on their names: building the same layouts
+    again always returns the same hash.
+
+    :parameter layouts: Dictionary with the artifact relative path (key) and the layout component
+        (value), for example the output of `SMHviz_layout.build.build_round()`
+    :type layouts: dict
+    :parameter scope: Name of the set of layouts (for example "round13"), included in the hash
+    :type scope: str
+    :return: the first 16 characters of the SHA-256 hash
+    """
+    digest = hashlib.sha256(scope.encode("utf-8"))
+    for name in sorted(layouts):
+        digest.update(b"\0" + name.encode("utf-8") + b"\0")
+        digest.update(canonical_json(layouts[name]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _write_snapshot(snapshot_dir, version, layouts):
+    version_dir = os.path.join(snapshot_dir, version)
+    if os.path.isdir(version_dir):
+        # a snapshot is never modified: same hash, same content
+        return
+    temp_dir = tempfile.mkdtemp(prefix="." + version + "-", dir=snapshot_dir)
+    try:
+        for name, layout in layouts.items():
+            filename = os.path.join(temp_dir, name)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, "wb") as f:
+                f.write(to_json_bytes(layout))
+        os.rename(temp_dir, version_dir)
+    except OSError:
+        if not os.path.isdir(version_dir):
+            raise
+    finally:
+        if os.path.isdir(temp_dir):
+            shutil.rmtree(temp_dir)
+
+
+def write_snapshots(config, snapshot_dir, rounds=None):
+    """Write the content-hash versioned snapshots of a hub
+
+    Build and write the layouts of each round (plot tabs, sidebar and plot bar of each plot tab,
+    abstract list) in `<snapshot_dir>/<round version>/` and the layouts shared by all the rounds
+    (round tabs, notes and definitions, metadata table) in `<snapshot_dir>/<hub version>/`, the
+    version being the content hash of the layouts (see `content_hash()`). A snapshot is written
+    only once: a round without any change keeps the same version and files. The current version
+    of each round is then written in `<snapshot_dir>/versions.json`.
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :parameter snapshot_dir: Path to the snapshot directory
+    :type snapshot_dir: str
+    :parameter rounds: List of round numbers to build, if `None` (default), all the rounds. The
+        versions of the other rounds are kept from the previous `versions.json` file.
+    :type rounds: list | None
+    :return: the versions dictionary, with the keys `hub` (version of the shared layouts) and
+        `rounds` (dictionary with the round number as key and the round version as value)
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    try:
+        versions = snapshot_versions(snapshot_dir)
+    except FileNotFoundError:
+        versions = {"hub": None, "rounds": dict()}
+    versions = {"hub": versions["hub"], "rounds": dict(versions["rounds"])}
+    layouts = build_hub_layouts(config)
+    versions["hub"] = content_hash(layouts, scope="hub")
+    _write_snapshot(snapshot_dir, versions["hub"], layouts)
+    for round_config in config["rounds"]:
+        round_number = str(round_config["round_number"])
+        if rounds is not None and round_number not in [str(i) for i in rounds]:
+            continue
+        layouts = build_round(config, round_config)
+        versions["rounds"][round_number] = content_hash(layouts, scope="round" + round_number)
+        _write_snapshot(snapshot_dir, versions["rounds"][round_number], layouts)
+    temp_file = os.path.join(snapshot_dir, "versions.json.tmp")
+    with open(temp_file, "w") as f:
+        json.dump(versions, f, indent=2, sort_keys=True)
+    os.replace(temp_file, os.path.join(snapshot_dir, "versions.json"))
+    return versions
+
+
+def snapshot_versions(snapshot_dir):
+    """Current versions of a snapshot directory
+
+    The `versions.json` file is read again only when it changes.
+
+    :parameter snapshot_dir: Path to the snapshot directory
+    :type snapshot_dir: str
+    :return: the versions dictionary, see `write_snapshots()`
+    """
+    filename = os.path.join(snapshot_dir, "versions.json")
+    mtime = os.stat(filename).st_mtime_ns
+    cached = _VERSIONS.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(filename, "r") as f:
+        versions = json.load(f)
+    with _LOCK:
+        _VERSIONS[filename] = (mtime, versions)
+    return versions
+
+
+def snapshot_version(snapshot_dir, round_number=None):
+    """Current version of a round
+
+    :parameter snapshot_dir: Path to the snapshot directory
+    :type snapshot_dir: str
+    :parameter round_number: Numeric identifier of the round, if `None` (default), the version of
+        the layouts shared by all the rounds
+    :type round_number: str | int | None
+    :return: the current version (content hash)
+    """
+    versions = snapshot_versions(snapshot_dir)
+    if round_number is None:
+        return versions["hub"]
+    return versions["rounds"][str(round_number)]
+
+
+def load_snapshot(snapshot_dir, kind, round_number=None, tab=None, version=None):
+    """Load a layout from a snapshot
+
+    :parameter snapshot_dir: Path to the snapshot directory
+    :type snapshot_dir: str
+    :parameter kind: Type of layout, see `SMHviz_layout.artifacts.artifact_path()`
+    :type kind: str
+    :parameter round_number: Numeric identifier of the round (for the round specific layouts)
+    :type round_number: str | int | None
+    :parameter tab: Internal id of the plot tab (for "sidebar" and "plot_bar" only)
+    :type tab: str | None
+    :parameter version: Version of the snapshot, if `None` (default), the current version of the
+        round (or of the shared layouts)
+    :type version: str | None
+    :return: a read-only memoryview on the UTF-8 encoded JSON of the layout, see
+        `SMHviz_layout.artifacts.load_artifact()`
+    """
+    if version is None:
+        version = snapshot_version(snapshot_dir, round_number if kind in _ROUND_KINDS else None)
+    return load_artifact(snapshot_dir, kind, round_number=round_number, tab=tab, version=version)
+
+
+def register_snapshot_routes(server, snapshot_dir, prefix="/snapshot"):
+    """Serve the snapshots from a Flask server
+
+    Add two routes on the Flask server (for a Dash app: `app.server`):
+        - `<prefix>/versions`: current versions (see `write_snapshots()`), revalidated by the
+          client with its ETag
+        - `<prefix>/<version>/<path>`: layout of a snapshot (for example
+          `/snapshot/3f2a.../round13/sidebar/scenario.json`), cached indefinitely by the client
+          and the intermediate caches (the content of a version never changes)
+
+    :parameter server: Flask server
+    :type server: flask.Flask
+    :parameter snapshot_dir: Path to the snapshot directory
+    :type snapshot_dir: str
+    :parameter prefix: URL prefix of the routes
+    :type prefix: str
+    :return: None
+    """
+    from flask import abort
+    from werkzeug.utils import safe_join
+
+    from SMHviz_layout.encoding import encode_json, layout_response
+
+    def versions_view():
+        payload = json.dumps(snapshot_versions(snapshot_dir), sort_keys=True,
+                             separators=(",", ":")).encode("utf-8")
+        return layout_response(encode_json(payload))
+
+    def layout_view(version, name):
+        if re.fullmatch("[0-9a-f]{16}", version) is None:
+            abort(404)
+        filename = safe_join(os.path.abspath(snapshot_dir), version, name)
+        if filename is None or not os.path.isfile(filename):
+            abort(404)
+        with open(filename, "rb") as f:
+            payload = f.read()
+        return layout_response(encode_json(payload), max_age=31536000, immutable=True)
+
+    server.add_url_rule(prefix + "/versions", endpoint="snapshot_versions",
+                        view_func=versions_view)
+    server.add_url_rule(prefix + "/<version>/<path:name>", endpoint="snapshot_layout",
+                        view_func=layout_view)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m SMHviz_layout.snapshot",
+                                     description="Write the content-hash versioned snapshots of "
+                                                 "the layouts of a hub")
+    parser.add_argument("config", help="path to the JSON hub configuration file")
+    parser.add_argument("output", help="path to the snapshot directory")
+    parser.add_argument("--rounds", nargs="+", default=None,
+                        help="round numbers to build (by default: all)")
+    args = parser.parse_args(argv)
+    versions = write_snapshots(load_config(args.config), args.output, rounds=args.rounds)
+    print(json.dumps(versions, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import contextlib
+import contextvars
+
+from SMHviz_layout.serialize import to_json_bytes
+
+DEFAULT_STYLES = {
+    "smh-bar-sel": {"display": "inline-block", "margin-left": "5%", "width": "25%"},
+    "smh-bar-comp": {"display": "inline-block", "margin-left": "5%", "width": "45%"},
+    "smh-bar-traj": {"display": "inline-block", "margin-left": "5%", "width": "60%"},
+    "smh-bar-wide": {"display": "inline-block", "margin-left": "5%", "width": "95%"},
+    "smh-bar-flex": {"width": "100%", "display": "flex"},
+    "smh-bar-block": {"display": "inline-block", "width": "100%"},
+    "smh-full-width": {"width": "100%"},
+    "smh-notes": {"margin-left": "5%", "width": "95%"},
+    "smh-margin-left": {"margin-left": "5%"},
+    "smh-inline-grid": {"display": "inline-grid"},
+    "smh-inline-flex": {"display": "inline-flex"},
+    "smh-label-pad": {"padding-right": 10},
+    "smh-tooltip": {"background": "#bfbfbf", "padding": "5px", "border-radius": "5px"},
+}
+
+_MODE = {"mode": "inline"}
+_MODE_OVERRIDE = contextvars.ContextVar("smh_style_mode", default=None)
+
+
+def set_style_mode(mode):
+    """Set the style mode of the layout functions
+
+    - `"inline"` (default): the default styles are written in the `style` property of each
+      component
+    - `"class"`: the default styles are replaced by CSS classes (`className` property), the
+      associated CSS classes are available in the output of `make_stylesheet()`
+
+    The "class" mode saves 16 to 108 B per plot bar (about 30 to 60 B gzip compressed, the
+    multi-pathogen plot bars are slightly larger compressed) against 809 B for the stylesheet
+    (254 B gzip compressed, cached by the browser): it reduces the transferred size only after
+    about 5 to 10 gzip compressed plot bar updates per client (8 to 50 uncompressed), see
+    `style_payload_report()`.
+
+    :parameter mode: Style mode, "inline" or "class"
+    :type mode: str
+    :return: None
+    """
+    if mode not in ["inline", "class"]:
+        raise ValueError("'mode' should be 'inline' or 'class', not: " + str(mode))
+    _MODE["mode"] = mode
+
+
+def get_style_mode():
+    """Get the current style mode of the layout functions
+
+    :return: the current style mode, "inline" or "class"
+    """
+    mode = _MODE_OVERRIDE.get()
+    if mode is None:
+        mode = _MODE["mode"]
+    return mode
+
+
+@contextlib.contextmanager
+def style_mode(mode):
+    """Temporarily set the style mode of the layout functions
+
+    Context manager to set the style mode (see `set_style_mode()`) of the layout functions called
+    in the current context only, for example:
+
+        with style_mode("class"):
+            sidebar = make_plot_bar(...)
+
+    :parameter mode: Style mode, "inline" or "class"
+    :type mode: str
+    """
+    if mode not in ["inline", "class"]:
+        raise ValueError("'mode' should be 'inline' or 'class', not: " + str(mode))
+    token = _MODE_OVERRIDE.set(mode)
+    try:
+        yield
+    finally:
+        _MODE_OVERRIDE.reset(token)
+
+
+def style_props(name, style=None, css_class=None, style_prop="style", class_prop="className"):
+    """Style properties of a component
+
+    Return the style properties of a component, depending on the style mode:
+    - If `style` is not `None` (style set by the user), or in the "inline" mode: the style is
+      returned in the `style_prop` property (default style `DEFAULT_STYLES[name]` if `style` is
+      `None`)
+    - In the "class" mode: the `name` CSS class is appended to the `class_prop` property
+
+    :parameter name: Name of the default style, key of `DEFAULT_STYLES`
+    :type name: str
+    :parameter style: Style set by the user, if `None` the default style is used
+    :type style: dict | None
+    :parameter css_class: string, name of the associated CSS element(s) of the component, if any
+    :type css_class: str | None
+    :parameter style_prop: Name of the style property, by default "style"
+    :type style_prop: str
+    :parameter class_prop: Name of the class property, by default "className"
+    :type class_prop: str
+    :return: a dictionary of component properties
+    """
+    if style is None and get_style_mode() == "class":
+        if css_class is None:
+            return {class_prop: name}
+        return {class_prop: css_class + " " + name}
+    if style is None:
+        style = dict(DEFAULT_STYLES[name])
+    props = {style_prop: style}
+    if css_class is not None:
+        props[class_prop] = css_class
+    return props
+
+
+def make_stylesheet():
+    """Create the CSS of the default styles
+
+    Return the CSS classes associated with the default styles, required with the "class" style
+    mode. The output can be added in a CSS file of the `assets` folder of the Dash app.
+
+    :return: a character string containing the CSS classes
+    """
+    css = list()
+    for name, style in DEFAULT_STYLES.items():
+        declaration = list()
+        for key, value in style.items():
+            if isinstance(value, (int, float)) and value != 0:
+                value = str(value) + "px"
+            declaration.append("    " + key + ": " + str(value) + ";")
+        css.append("." + name + " {\n" + "\n".join(declaration) + "\n}\n")
+    return "\n".join(css)
+
+
+def style_payload_report(builder, *args, **kwargs):
+    """Compare the payload size of a layout function in both style modes
+
+    Run the layout function in the "inline" and "class" style modes and return the size (in
+    bytes) of both serialized outputs.
+
+    :parameter builder: Layout function (for example: `make_plot_bar`)
+    :type builder: function
+    :parameter args: Positional arguments of the layout function
+    :parameter kwargs: Keyword arguments of the layout function
+    :return: a dictionary with the keys: `inline` (size in the inline mode), `class` (size in the
+        class mode), `saved` (difference in bytes), `ratio` (class/inline sizes ratio) and
+        `stylesheet` (size of the output of `make_stylesheet()`, sent only once)
+    """
+    with style_mode("inline"):
+        inline_size = len(to_json_bytes(builder(*args, **kwargs)))
+    with style_mode("class"):
+        class_size = len(to_json_bytes(builder(*args, **kwargs)))
+    return {
+        "inline": inline_size,
+        "class": class_size,
+        "saved": inline_size - class_size,
+        "ratio": class_size / inline_size,
+        "stylesheet": len(make_stylesheet().encode("utf-8"))
+    }
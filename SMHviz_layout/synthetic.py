@@ -0,0 +1,141 @@
+import datetime
+import json
+import os
+import random
+import string
+
+import pandas as pd
+
+ALL_TABS = ["scenario", "model_specific", "scen_comparison", "state_deviation", "trend_map",
+            "risk_map", "model_distribution", "multipat_plot", "multipat_plot_comb", "spaghetti",
+            "proj_peaks", "heatmap", "sample_peak", "peak_time_model", "peak_size",
+            "scen_sample_comp", "scenario_disp", "spaghetti_disp", "model_disp", "so_boxplot"]
+
+OUTCOMES = ["hosp", "death", "case", "inf"]
+
+
+def make_hub(output_dir, n_rounds=2, n_locations=10, n_targets=4, n_scenarios=4, n_pathogens=2,
+             n_abstracts=4, tabs=None, seed=0):
+    """Create a synthetic hub
+
+    Write the files of a synthetic hub in `output_dir` (scenario, location and metadata CSV files,
+    model abstracts folder and JSON hub configuration file, see `SMHviz_layout.build.load_config()`)
+    for tests, benchmarks and load tests.
+
+    :parameter output_dir: Path to the folder in which the hub files are written
+    :type output_dir: str
+    :parameter n_rounds: Number of rounds
+    :type n_rounds: int
+    :parameter n_locations: Number of locations (including "US")
+    :type n_locations: int
+    :parameter n_targets: Number of targets (incident and cumulative targets alternate)
+    :type n_targets: int
+    :parameter n_scenarios: Number of scenarios per round (at least 2)
+    :type n_scenarios: int
+    :parameter n_pathogens: Number of pathogens (principal pathogen included)
+    :type n_pathogens: int
+    :parameter n_abstracts: Total number of abstracts, distributed across the rounds (at least one
+        per round)
+    :type n_abstracts: int
+    :parameter tabs: List of plot tabs internal id of each round, if `None` (default): `ALL_TABS`
+        (without the multi-pathogen tabs if `n_pathogens` is 1)
+    :type tabs: list | None
+    :parameter seed: Seed of the random generator
+    :type seed: int
+    :return: the path of the JSON hub configuration file
+    """
+    if tabs is None:
+        tabs = ALL_TABS
+        if n_pathogens < 2:
+            tabs = [i for i in ALL_TABS if not i.startswith("multipat_plot")]
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    # Rounds and scenarios
+    start = datetime.date(2021, 1, 3)
+    scen_rows = list()
+    scenario_dict = dict()
+    rounds = list()
+    for r in range(1, n_rounds + 1):
+        round_date = (start + datetime.timedelta(weeks=4 * r)).isoformat()
+        scen_choice = list()
+        for s in range(n_scenarios):
+            letter = string.ascii_uppercase[s % 26] * (s // 26 + 1)
+            scen_id = letter + "-" + round_date
+            scen_rows.append({"round": "round" + str(r), "scenario_id": scen_id,
+                              "scenario_fullname": "Scenario " + letter + " " +
+                                                   rng.choice(["optimistic", "pessimistic",
+                                                               "baseline", "high immunity",
+                                                               "low vaccination"])})
+            scenario_dict[str(len(scenario_dict) + 1)] = scen_id
+            scen_choice.append(scen_id)
+        rounds.append({"round_number": r, "round_name": "Round " + str(r),
+                       "round_date": round_date, "tabs": list(tabs),
+                       "plot_bar": {"scen_choice": scen_choice}})
+    pd.DataFrame(scen_rows).to_csv(os.path.join(output_dir, "scenario.csv"), index=False)
+    # Locations
+    list_location = ["US"] + ["Location " + str(i).zfill(4) for i in range(1, n_locations)]
+    list_location.append("U.S. Minor Outlying Islands")
+    pd.DataFrame({"location_name": list_location,
+                  "location": [str(i).zfill(5) for i in range(len(list_location))]}).to_csv(
+        os.path.join(output_dir, "location.csv"), index=False)
+    # Targets
+    target_dict = dict()
+    for i in range(n_targets):
+        outcome = OUTCOMES[(i // 2) % len(OUTCOMES)]
+        if i // 2 >= len(OUTCOMES):
+            outcome = outcome + str(i // (2 * len(OUTCOMES)))
+        target_type = ["inc", "cum"][i % 2]
+        target_dict[target_type + " " + outcome] = ["Incident", "Cumulative"][i % 2] + " " + \
+            outcome.capitalize()
+    # Abstracts and metadata
+    abstract_path = os.path.join(output_dir, "model_abstracts")
+    meta_rows = list()
+    for i in range(max(n_abstracts, n_rounds)):
+        round_config = rounds[i % n_rounds]
+        round_dir = os.path.join(abstract_path, "round" + str(round_config["round_number"]))
+        os.makedirs(round_dir, exist_ok=True)
+        team_model = "team" + str(i).zfill(3) + "-model" + str(i % 7)
+        words = rng.choices(["compartmental", "agent-based", "ensemble", "SEIR", "waning",
+                             "immunity", "vaccination", "hospitalization", "calibration",
+                             "mobility", "seasonality", "variant", "bayesian", "forecast"], k=80)
+        with open(os.path.join(round_dir, round_config["round_date"] + "-" + team_model +
+                                          "-Abstract.md"), "w") as f:
+            f.write("# " + team_model + "\n\n## Methods\n\n" + " ".join(words) + "\n")
+        meta_rows.append({"Model": team_model, "Team": "Team " + str(i),
+                          "Description": " ".join(words[:20])})
+    pd.DataFrame(meta_rows).to_csv(os.path.join(output_dir, "metadata.csv"), index=False)
+    # Other pathogens
+    other_pathogen = list()
+    for i in range(1, n_pathogens):
+        other_pathogen.append({
+            "scenario": {"id": ["A", "B"], "name": ["Scenario A", "Scenario B"]},
+            "default_sel": ["A"], "name": "Pathogen" + str(i), "round_int": i,
+            "website": "https://pathogen" + str(i) + ".example.org"})
+    if len(other_pathogen) == 0:
+        other_pathogen = None
+    # Configuration
+    config = {
+        "version": None,
+        "scenario_file": "scenario.csv",
+        "location_file": "location.csv",
+        "metadata_file": "metadata.csv",
+        "abstract_path": "model_abstracts",
+        "scenario_dict": scenario_dict,
+        "target_dict": target_dict,
+        "def_target": "hosp",
+        "tab_name_dict": dict(zip(tabs, [i.replace("_", " ").title() for i in tabs])),
+        "notes": {"definitions": "**Epiweek:** Epidemiological Week as defined by MMWR",
+                  "notes_left": "**Ensemble** is obtained by calculating the weighted median of "
+                                "each submitted quantile.",
+                  "notes_right": "**Disclaimer:** The content of the Scenario Modeling Hub is "
+                                 "solely the responsibility of the participating teams."},
+        "plot_bar": {"val_default": "Ensemble", "max_horizon": 52, "hide_ens": False,
+                     "sc_panel_name": ["Panel 1", "Panel 2"], "sc_multi_panel": True,
+                     "sc_sidebar_option": True, "pathogen": "COVID",
+                     "other_pathogen": other_pathogen},
+        "rounds": rounds
+    }
+    config_file = os.path.join(output_dir, "hub_config.json")
+    with open(config_file, "w") as f:
+        json.dump(config, f, indent=2)
+    return config_file
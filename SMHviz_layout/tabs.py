@@ -1,10 +1,13 @@
 from dash import dcc, html
 
+from SMHviz_layout.instrument import instrumented
 
+
+@instrumented()
 def make_tab_plots(sel_plot, tab_name_dict, show=None, plot_sel=None, tab_id_name="tabs-plot",
                    tab_content_id="plot_tabs-content", css_plot_tabs="plot_tabs",
                    css_plot_tabs_container="plot_tabs-container", css_right_sidebar="column right-sidebar",
-                   css_plot_tab="plot_tab", css_plot_tab_sel="plot_tab--selected"):
+                   css_plot_tab="plot_tab", css_plot_tab_sel="plot_tab--selected", content=None):
     """Create the plot tabs on the SMH visualization websites
 
     Output a Div component with the plot tabs information with the Tabs component identified as
@@ -50,6 +53,13 @@ def make_tab_plots(sel_plot, tab_name_dict, show=None, plot_sel=None, tab_id_nam
     :type css_plot_tab: str
     :parameter css_plot_tab_sel: string, name of the associated CSS element, see documentation
     :type css_plot_tab_sel: str
+    :parameter content: Content of the plot tab content component for the selected tab (for
+        example, server-side rendered sidebar, plot bar and figure), if `None` (default), the
+        plot tab content component is empty. Can also be a function taking the internal id tab
+        name as parameter and returning the content (lazy mode): it is called only for the
+        selected tab, the content of the other tabs is built when the tab is activated (by the
+        callback updating the plot tab content)
+    :type content: list | dash.development.base_component.Component | function
     :return: a Div component with the plot tabs information with the Tabs component identified as
         `tab_plot` with the
     content identified as `plot_tabs-content`
@@ -69,17 +79,31 @@ def make_tab_plots(sel_plot, tab_name_dict, show=None, plot_sel=None, tab_id_nam
             plot_tab_list.append(tab)
         if plot_sel is None:
             plot_sel = sel_plot[0]
+        if callable(content):
+            content = content(plot_sel)
+        if content is None:
+            tab_content = html.Div(id=tab_content_id)
+        else:
+            tab_content = html.Div(content, id=tab_content_id)
         plot_tab = html.Div([
             dcc.Tabs(id=tab_id_name, value=plot_sel, parent_className=css_plot_tabs,
                      className=css_plot_tabs_container, children=plot_tab_list),
-            html.Div(id=tab_content_id)
+            tab_content
         ], className=css_right_sidebar)
     return plot_tab
 
 
-def make_round_tab(list_round, css_round_tab="round_tab", css_round_tab_sel="round_tab--selected"):
+@instrumented()
+def make_round_tab(list_round, css_round_tab="round_tab", css_round_tab_sel="round_tab--selected",
+                   window=None, round_sel=None, older_value="older_rounds",
+                   older_label="Older rounds", older_id="round_tab-older"):
     """Make tab for each element of list_round
 
+    Make a tab for each element of list_round or, in windowed mode (`window` parameter), a tab for
+    each of the `window` most recent rounds (last elements of `list_round`) and an additional
+    tab, with the value `older_value`, containing a dropdown (identified as `older_id`) to select
+    one of the older rounds. See `selected_round()` to get the selected round in windowed mode.
+
      The output contains multiple CSS class information that need to be available:
         - `round_tab`, `round_tab--selected`: style information for an individual tab (and when
             selected)
@@ -92,11 +116,52 @@ def make_round_tab(list_round, css_round_tab="round_tab", css_round_tab_sel="rou
     :type css_round_tab: str
     :parameter css_round_tab_sel: string, name of the associated CSS element, see documentation
     :type css_round_tab_sel: str
+    :parameter window: Number of most recent rounds with a tab, if `None` (default), one tab for
+        each round
+    :type window: int | None
+    :parameter round_sel: Round selected by default in the older rounds dropdown (windowed mode
+        only, if the round is not one of the most recent rounds)
+    :type round_sel: str | None
+    :parameter older_value: Value of the older rounds tab, by default `"older_rounds"`
+    :type older_value: str
+    :parameter older_label: Label of the older rounds tab, by default `"Older rounds"`
+    :type older_label: str
+    :parameter older_id: Id of the older rounds dropdown, by default `"round_tab-older"`
+    :type older_id: str
     :return: list of Tab with round information written as "Round 1" for example
     """
     round_tab_list = list()
+    if window is not None and len(list_round) > window:
+        older_round = list(list_round[:len(list_round) - window])
+        list_round = list_round[len(list_round) - window:]
+        older_round.reverse()
+        if round_sel not in older_round:
+            round_sel = older_round[0]
+        older_dropdown = dcc.Dropdown(options=older_round, value=round_sel, clearable=False,
+                                      id=older_id)
+        round_tab_list.append(dcc.Tab(older_dropdown, label=older_label, value=older_value,
+                                      className=css_round_tab,
+                                      selected_className=css_round_tab_sel))
     for i in list_round:
         tab = dcc.Tab(label=i, value=i, className=css_round_tab,
                       selected_className=css_round_tab_sel)
         round_tab_list.append(tab)
     return round_tab_list
+
+
+def selected_round(value, older_round=None, older_value="older_rounds"):
+    """Round selected in the round tabs
+
+    :parameter value: Value of the round Tabs component
+    :type value: str
+    :parameter older_round: Value of the older rounds dropdown (windowed mode, see
+        `make_round_tab()`)
+    :type older_round: str | None
+    :parameter older_value: Value of the older rounds tab, see `make_round_tab()`
+    :type older_value: str
+    :return: the selected round, for example "Round 1"
+    """
+    if value == older_value:
+        return older_round
+    return value
+
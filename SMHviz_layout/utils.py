@@ -1,7 +1,12 @@
+import functools
+
 from dash import html, dcc
 
+from SMHviz_layout.styles import style_props
+
 
-def make_checkbox(title, id_name, options, hide=False, style=None, value=None, check_style=None):
+def make_checkbox(title, id_name, options, hide=False, style=None, value=None, check_style=None,
+                  css_check=None):
     """Create a Div component with a Checkbox
 
     Make a Div component with a Checkbox and a title. For more information, please consult
@@ -22,20 +27,24 @@ def make_checkbox(title, id_name, options, hide=False, style=None, value=None, c
     :type value: str | list | int | float | bool |dict
     :parameter check_style: Style associated with each element of the checkbox, by default None
     :type check_style: dict | str
+    :parameter css_check: string, name of the associated CSS element of the Checklist, by default
+        None
+    :type css_check: str
     :return: Div component with a Checkbox component
     """
-    if style is None:
-        style = {"display": "inline-block", "margin-left": "5%", "width": "25%"}
+    check_props = {"style": check_style}
+    if css_check is not None:
+        check_props["className"] = css_check
     if value is not None:
         checkbox = html.Div([
             html.P(title),
-            dcc.Checklist(id=id_name, options=options, value=value, style=check_style)
-        ], style=style)
+            dcc.Checklist(id=id_name, options=options, value=value, **check_props)
+        ], **style_props("smh-bar-sel", style))
     else:
         checkbox = html.Div([
             html.P(title),
-            dcc.Checklist(id=id_name, options=options, style=check_style)
-        ], style=style)
+            dcc.Checklist(id=id_name, options=options, **check_props)
+        ], **style_props("smh-bar-sel", style))
     if hide is True:
         checkbox = html.Div(checkbox, hidden=True)
     return checkbox
@@ -95,7 +104,67 @@ def make_dropdown(title, id_name, options, value, clearable=False, css_class="pl
     return model_sel
 
 
-def make_slider(title, id_name, min_value, max_value, step, css_class="plot_bar_sel", tooltip=None):
+@functools.lru_cache(maxsize=256)
+def _even_marks(min_value, max_value, step):
+    range_val = sorted(set(list(range(min_value, max_value, max(int(max_value / step), 1))) +
+                           [max_value]))
+    return tuple((i, str(i)) for i in range_val)
+
+
+@functools.lru_cache(maxsize=256)
+def _nice_marks(min_value, max_value, step, max_marks):
+    span = max_value - min_value
+    if span <= 0 or max_marks < 2:
+        return ((min_value, str(min_value)),)
+    # nice tick interval: 1, 2 or 5 x 10^n (multiple of the slider step)
+    interval = None
+    magnitude = 1
+    while interval is None:
+        for i in [1, 2, 5]:
+            candidate = i * magnitude * step
+            start = -(-min_value // candidate) * candidate
+            if (start - min_value) % step != 0:
+                # the multiples of the interval are not selectable: ticks from min_value
+                start = min_value + candidate
+            interior = [v for v in range(start, max_value, candidate)
+                        if min_value + candidate / 2 <= v <= max_value - candidate / 2]
+            if len(interior) + 2 <= max_marks:
+                interval = candidate
+                break
+        magnitude *= 10
+    range_val = [min_value] + interior + [max_value]
+    return tuple((i, str(i)) for i in range_val)
+
+
+def slider_marks(min_value, max_value, step, max_marks=None):
+    """Marks of a Slider
+
+    Create the marks (values and labels) of a Slider, computed once for each set of parameters
+    (each call returns a new dictionary):
+        - if `max_marks` is `None`: `step` marks evenly spaced between `min_value` and
+          `max_value` (as in `make_slider()`)
+        - else: at most `max_marks` marks, `min_value`, `max_value` and the multiples of a "nice"
+          interval (1, 2 or 5 x 10^n times the slider step) between them, counted from
+          `min_value` if the multiples of the interval are not selectable in the slider
+
+    :parameter min_value: Minimum value in the slider
+    :type min_value: int
+    :parameter max_value: Maximum value in the slider
+    :type max_value: int
+    :parameter step: Number of intervals between marks (if `max_marks` is `None`), or slider
+        step (marks are set only on values selectable in the slider)
+    :type step: int
+    :parameter max_marks: Maximum number of marks, if `None` (default), see above
+    :type max_marks: int | None
+    :return: a dictionary with the mark value (key) and label (value)
+    """
+    if max_marks is None:
+        return dict(_even_marks(min_value, max_value, step))
+    return dict(_nice_marks(min_value, max_value, step, max_marks))
+
+
+def make_slider(title, id_name, min_value, max_value, step, css_class="plot_bar_sel", tooltip=None,
+                max_marks=None):
     """Create a Div component with a Slider
 
     Make a Div component with a Slider and a title. For more information, please consult
@@ -116,18 +185,20 @@ def make_slider(title, id_name, min_value, max_value, step, css_class="plot_bar_
     :parameter tooltip: style associated with the slider tooltip
         if `None`: {"placement": "bottom", "always_visible": True}
     :type tooltip: dict | str
+    :parameter max_marks: Maximum number of marks on the slider (with "nice" values), if `None`
+        (default), `step` marks evenly spaced, see `slider_marks()`
+    :type max_marks: int | None
     :return: Div component with a Dropdown component
     """
     if tooltip is None:
         tooltip = {"placement": "bottom", "always_visible": True}
-    range_val = list(set(list(range(min_value, max_value, int(max_value/step))) + [max_value]))
-    range_val.sort()
-    range_lab = list()
-    for i in range_val:
-        range_lab.append(str(i))
+    if max_marks is None:
+        marks = slider_marks(min_value, max_value, step)
+    else:
+        marks = slider_marks(min_value, max_value, 1, max_marks=max_marks)
     week_slider = html.Div([
         html.P(title),
-        dcc.Slider(min=min_value, max=max_value, step=1, marks=dict(zip(range_val, range_lab)),
-                   value=min_value, id=id_name, tooltip=tooltip)
+        dcc.Slider(min=min_value, max=max_value, step=1, marks=marks, value=min_value, id=id_name,
+                   tooltip=tooltip)
     ], className=css_class)
     return week_slider
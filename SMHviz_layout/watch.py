@@ -0,0 +1,240 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+from SMHviz_layout.cache import clear_file_cache, invalidate_path
+
+_IN_MODIFY = 0x2
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_CONTENT_MASK = _IN_MODIFY | _IN_CLOSE_WRITE
+_LISTING_MASK = _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _split_roots(paths):
+    files = set()
+    folders = set()
+    for i in paths:
+        i = os.path.abspath(i)
+        if os.path.isdir(i):
+            folders.add(i)
+        else:
+            files.add(i)
+    return files, folders
+
+
+def _watched(path, files, folders):
+    if path in files or path in folders:
+        return True
+    return any(path.startswith(i + os.sep) for i in folders)
+
+
+def _notify(watcher, path, listing):
+    invalidate_path(path, listing=listing)
+    if watcher["on_change"] is not None:
+        watcher["on_change"](path)
+
+
+def _scan(files, folders):
+    state = dict()
+    for i in files:
+        try:
+            st = os.stat(i)
+        except OSError:
+            continue
+        state[i] = (st.st_mtime_ns, st.st_size)
+    for folder in folders:
+        for root, dirs, names in os.walk(folder):
+            for i in dirs + names:
+                path = os.path.join(root, i)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size) if i in names else None
+    return state
+
+
+def _poll(watcher, files, folders):
+    state = _scan(files, folders)
+    while not watcher["stop"].wait(watcher["interval"]):
+        new_state = _scan(files, folders)
+        for path in set(state) | set(new_state):
+            if path not in state or path not in new_state:
+                _notify(watcher, path, True)
+            elif state[path] != new_state[path]:
+                _notify(watcher, path, False)
+        state = new_state
+
+
+def _overflow(watcher, libc, fd, wds, files, folders):
+    # events were dropped: the changed files are unknown
+    clear_file_cache()
+    for folder in folders:
+        for root, dirs, names in os.walk(folder):
+            try:
+                wds[_add_watch(libc, fd, root)] = root
+            except OSError:
+                pass
+    if watcher["on_change"] is not None:
+        for path in sorted(files | folders):
+            watcher["on_change"](path)
+
+
+def _add_watch(libc, fd, path):
+    wd = libc.inotify_add_watch(fd, os.fsencode(path), _CONTENT_MASK | _LISTING_MASK)
+    if wd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_add_watch failed: " + path)
+    return wd
+
+
+def _inotify_setup(libc, files, folders):
+    fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        return None
+    wds = dict()
+    try:
+        # files are watched through their folder to follow atomic replacements (rename)
+        for i in files:
+            wds[_add_watch(libc, fd, os.path.dirname(i))] = os.path.dirname(i)
+        for folder in folders:
+            for root, dirs, names in os.walk(folder):
+                wds[_add_watch(libc, fd, root)] = root
+    except OSError:
+        os.close(fd)
+        return None
+    return fd, wds
+
+
+def _inotify(watcher, libc, fd, wds, files, folders):
+    try:
+        while not watcher["stop"].is_set():
+            ready = select.select([fd], [], [], 0.5)[0]
+            if not ready:
+                continue
+            try:
+                buffer = os.read(fd, 65536)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, cookie, length = _EVENT.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    _overflow(watcher, libc, fd, wds, files, folders)
+                    continue
+                if mask & _IN_IGNORED:
+                    # the watched folder was deleted
+                    wds.pop(wd, None)
+                    continue
+                if wd not in wds:
+                    continue
+                path = os.path.join(wds[wd], os.fsdecode(name)) if name else wds[wd]
+                if not _watched(path, files, folders):
+                    continue
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    for root, dirs, names in os.walk(path):
+                        try:
+                            wds[_add_watch(libc, fd, root)] = root
+                        except OSError:
+                            pass
+                _notify(watcher, path, bool(mask & _LISTING_MASK))
+    finally:
+        os.close(fd)
+
+
+def start_watcher(paths, interval=1.0, backend=None, on_change=None):
+    """Watch the file-backed layout inputs and invalidate the file cache
+
+    Start a background thread watching the files and folders in `paths` (for example: the
+    scenario CSV file, the metadata CSV file and the model abstracts folder) and invalidating the
+    associated entries of the file cache (see `SMHviz_layout.cache`): a modified file invalidates
+    its cached content, a created, deleted or renamed file also invalidates the cached list of
+    files of its folder (for example, the list of abstracts of one round).
+
+    The changes are detected with inotify (Linux) if available, or else by polling the files
+    modification time every `interval` seconds. If the inotify event queue overflows (events are
+    lost), the whole file cache is cleared and `on_change` is called with each path of `paths`.
+
+    :parameter paths: List of paths to files and/or folders (watched recursively) to watch
+    :type paths: list
+    :parameter interval: Polling interval in seconds (polling backend only)
+    :type interval: float
+    :parameter backend: "inotify", "poll" or `None` (default, inotify if available else poll)
+    :type backend: str | None
+    :parameter on_change: Function called with the path of each changed file or folder
+    :type on_change: function | None
+    :return: a dictionary describing the watcher, to pass to `stop_watcher()`, with the key
+        `backend` ("inotify" or "poll")
+    """
+    files, folders = _split_roots(paths)
+    watcher = {"stop": threading.Event(), "interval": interval, "on_change": on_change,
+               "backend": "poll", "thread": None}
+    setup = None
+    libc = _libc() if backend in [None, "inotify"] else None
+    if libc is not None:
+        setup = _inotify_setup(libc, files, folders)
+    if setup is None and backend == "inotify":
+        raise OSError("inotify is not available")
+    if setup is not None:
+        watcher["backend"] = "inotify"
+        target, args = _inotify, (watcher, libc, setup[0], setup[1], files, folders)
+    else:
+        target, args = _poll, (watcher, files, folders)
+    watcher["thread"] = threading.Thread(target=target, args=args, daemon=True,
+                                         name="smhviz_watch")
+    watcher["thread"].start()
+    return watcher
+
+
+def stop_watcher(watcher):
+    """Stop a file watcher
+
+    :parameter watcher: Output of `start_watcher()`
+    :type watcher: dict
+    :return: None
+    """
+    watcher["stop"].set()
+    watcher["thread"].join()
+
+
+def watch_config(config, **kwargs):
+    """Watch the file-backed layout inputs of a hub configuration
+
+    Start a file watcher (see `start_watcher()`) on the scenario file, the metadata file and the
+    abstracts folder of the configuration (when present).
+
+    :parameter config: Hub configuration, output of `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :parameter kwargs: Additional parameters of `start_watcher()`
+    :return: the watcher, see `start_watcher()`
+    """
+    paths = [config[i] for i in ["scenario_file", "metadata_file", "abstract_path"]
+             if config.get(i) is not None]
+    return start_watcher(paths, **kwargs)
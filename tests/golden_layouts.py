@@ -0,0 +1,183 @@
+"""Golden layouts of fixed synthetic hubs
+
+Write the input files of a few fixed hubs and build their layouts with the public layout
+functions available since the first release (same calls in every version of the package), the
+stored outputs (`tests/golden/<hub>.json`) are generated from the baseline version of the
+package, for example:
+
+    git worktree add /tmp/baseline <baseline commit>
+    PYTHONPATH=/tmp/baseline python tests/golden_layouts.py tests/golden
+"""
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+from dash import dcc
+from plotly.io.json import to_json_plotly
+
+from SMHviz_layout.metadata_content import make_abstract_tab, make_dt_metadata, render_abstract
+from SMHviz_layout.notes_definition import make_notes_definition
+from SMHviz_layout.plottab_bar import make_plot_bar, scen_comp_bar, spaghetti_bar
+from SMHviz_layout.sidebar import make_sidebar
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+from SMHviz_layout.utils import make_slider
+
+TABS = ["scenario", "model_specific", "scen_comparison", "state_deviation", "trend_map",
+        "risk_map", "model_distribution", "multipat_plot", "multipat_plot_comb",
+        "multipat_plot_comb1", "spaghetti", "spaghetti_disp", "proj_peaks", "heatmap",
+        "sample_peak", "peak_time_model", "peak_size", "scen_sample_comp",
+        "scen_sample_comp_disp", "model_disp", "scenario_disp", "so_boxplot", "other"]
+
+OTHER_PATHOGEN = [
+    {"scenario": {"id": ["A", "B"], "name": ["Scenario A", "Scenario B"]},
+     "default_sel": ["A"], "name": "Flu", "round_int": 3, "website": "https://flu.example.org"},
+    {"scenario": {"id": ["C"], "name": ["Scenario C"]}, "default_sel": ["C"], "name": "RSV",
+     "round_int": 2, "website": "https://rsv.example.org"}]
+
+HUBS = {
+    "small": {
+        "n_locations": 3, "targets": ["inc hosp", "cum hosp", "inc case"], "n_scenarios": 2,
+        "def_target": "hosp", "sidebar": {},
+        "plot_bar": {"val_default": "Ensemble", "max_horizon": 12, "hide_ens": False,
+                     "sc_panel_name": "Panel", "sc_multi_panel": False,
+                     "sc_sidebar_option": False, "pathogen": "COVID", "other_pathogen": None},
+        "sliders": [(1, 12, 4), (0, 5, 5)]},
+    "large": {
+        "n_locations": 40, "targets": ["inc hosp", "cum hosp", "inc death", "cum death",
+                                       "inc case", "cum case", "inc inf", "cum inf"],
+        "n_scenarios": 6, "def_target": "death",
+        "sidebar": {"age_group": {"0-130": "All", "0-17": "0-17", "65-130": "65+"},
+                    "race_ethnicity": {"overall": "Overall", "black": "Black"},
+                    "unselect_scenario": ["B-2023-01-01", "D-2023-01-01"], "cumulative": False,
+                    "multi_ui": False, "round_name": "Round 7 - Extended", "ui_val": 50},
+        "plot_bar": {"val_default": "Ensemble_LOP", "max_horizon": 52, "hide_ens": True,
+                     "sc_panel_name": ["Panel 1", "Panel 2"], "sc_multi_panel": True,
+                     "sc_sidebar_option": True, "pathogen": "COVID",
+                     "other_pathogen": OTHER_PATHOGEN, "traj_by_model": True,
+                     "check_med": False, "traj_min": 20, "traj_max": 300, "traj_step": 20},
+        "sliders": [(1, 52, 13), (10, 100, 10), (20, 300, 20), (1, 104, 7)]},
+    "edge": {
+        "n_locations": 1, "targets": ["inc hosp", "peak size hosp"], "n_scenarios": 3,
+        "def_target": "nothing", "sidebar": {"cumulative": True},
+        "plot_bar": {"val_default": "Ensemble", "max_horizon": 4, "hide_ens": False,
+                     "sc_panel_name": "Panel", "sc_multi_panel": True,
+                     "sc_sidebar_option": False, "pathogen": "Flu",
+                     "other_pathogen": OTHER_PATHOGEN[:1], "tf_options": None},
+        "sliders": [(1, 4, 4), (1, 7, 2)]},
+}
+
+ROUND_NUMBER = 7
+ROUND_DATE = "2023-01-01"
+
+
+def write_hub(name, data_dir):
+    """Write the input files of a fixed hub
+
+    :parameter name: Name of the hub, key of `HUBS`
+    :type name: str
+    :parameter data_dir: Path to the folder in which the files are written
+    :type data_dir: str
+    :return: a dictionary with the inputs of the layout functions
+    """
+    hub = HUBS[name]
+    os.makedirs(data_dir, exist_ok=True)
+    letters = [chr(ord("A") + i) for i in range(hub["n_scenarios"])]
+    scenario_dict = {str(i + 1): k + "-" + ROUND_DATE for i, k in enumerate(letters)}
+    scenario_file = os.path.join(data_dir, "scenario.csv")
+    pd.DataFrame({"round": ["round" + str(ROUND_NUMBER)] * len(letters) + ["round1"],
+                  "scenario_id": list(scenario_dict.values()) + ["Z-2021-01-01"],
+                  "scenario_fullname": ["Scenario " + i for i in letters] + ["Old"]}).to_csv(
+        scenario_file, index=False)
+    locations = ["US"] + ["Location " + str(i).zfill(2) for i in range(1, hub["n_locations"])]
+    if hub["n_locations"] > 1:
+        locations.insert(1, "U.S. Minor Outlying Islands")
+    abstract_path = os.path.join(data_dir, "abstracts") + "/"
+    round_path = abstract_path + "round" + str(ROUND_NUMBER)
+    os.makedirs(round_path, exist_ok=True)
+    for team_model, text in [("teamA-model1", "# teamA-model1\n\nCompartmental *model*.\n"),
+                             ("teamB-model2", "# teamB-model2\n\n- agent based\n- ensemble\n")]:
+        with open(os.path.join(round_path, ROUND_DATE + "-" + team_model + "-Abstract.md"),
+                  "w", encoding="utf-8") as f:
+            f.write(text)
+    metadata_file = os.path.join(data_dir, "metadata.csv")
+    pd.DataFrame({"Model": ["teamA-model1", "teamB-model2"], "Team": ["A", "B"],
+                  "Description": ["Compartmental model", "Agent based model"]}).to_csv(
+        metadata_file, index=False)
+    return {"scenario_file": scenario_file, "scenario_dict": scenario_dict,
+            "location_info": pd.DataFrame({"location_name": locations}),
+            "target_dict": {i: i.title() for i in hub["targets"]},
+            "abstract_path": abstract_path, "metadata_file": metadata_file}
+
+
+def sidebar_args(name, inputs):
+    """Positional and keyword arguments of `make_sidebar()` for a fixed hub (without the tab)"""
+    hub = HUBS[name]
+    return ((ROUND_NUMBER, inputs["scenario_file"], inputs["location_info"],
+             inputs["scenario_dict"], inputs["target_dict"], hub["def_target"]),
+            dict(hub["sidebar"]))
+
+
+def plot_bar_args(name, inputs, tab):
+    """Keyword arguments of `make_plot_bar()` for a fixed hub and plot tab"""
+    kwargs = dict(HUBS[name]["plot_bar"])
+    kwargs["scen_choice"] = list(inputs["scenario_dict"].values())
+    kwargs["plot_tab"] = tab
+    return kwargs
+
+
+def build_layouts(name, data_dir):
+    """Layouts of a fixed hub
+
+    :parameter name: Name of the hub, key of `HUBS`
+    :type name: str
+    :parameter data_dir: Path to the folder in which the input files are written
+    :type data_dir: str
+    :return: a dictionary with the name of the layout (key) and the layout (value)
+    """
+    hub = HUBS[name]
+    inputs = write_hub(name, data_dir)
+    layouts = dict()
+    args, kwargs = sidebar_args(name, inputs)
+    for tab in TABS:
+        layouts["sidebar/" + tab] = make_sidebar(args[0], tab, *args[1:], **kwargs)
+        if hub["plot_bar"]["other_pathogen"] is not None or not tab.startswith("multipat_plot"):
+            layouts["plot_bar/" + tab] = make_plot_bar(**plot_bar_args(name, inputs, tab))
+    for min_value, max_value, step in hub["sliders"]:
+        key = "/".join(str(i) for i in [min_value, max_value, step])
+        layouts["slider/" + key] = make_slider("Slider", "slider", min_value, max_value, step)
+        layouts["spaghetti_bar/" + key] = spaghetti_bar(min_value, max_value, step)
+    layouts["scen_comp_bar"] = scen_comp_bar(hub["plot_bar"]["max_horizon"],
+                                             hub["plot_bar"]["sc_panel_name"],
+                                             multi_panel=hub["plot_bar"]["sc_multi_panel"])
+    layouts["tab_plots"] = make_tab_plots(TABS, {i: i.upper() for i in TABS}, plot_sel=TABS[2])
+    layouts["round_tab"] = make_round_tab(["Round " + str(i) for i in range(1, ROUND_NUMBER + 1)])
+    layouts["notes_definition"] = make_notes_definition(dcc.Markdown("Definitions"),
+                                                        dcc.Markdown("Notes left"),
+                                                        dcc.Markdown("Notes right"))
+    layouts["dt_metadata"] = make_dt_metadata(inputs["metadata_file"])
+    layouts["abstract_tab"] = make_abstract_tab(ROUND_NUMBER, path=inputs["abstract_path"])
+    for team_model in ["teamA-model1", "teamB-model2"]:
+        layouts["abstract/" + team_model] = render_abstract(ROUND_NUMBER, ROUND_DATE, team_model,
+                                                            path=inputs["abstract_path"])
+    return layouts
+
+
+def to_golden(layout):
+    """JSON object of a layout, as stored in the golden files"""
+    return json.loads(to_json_plotly(layout))
+
+
+def main(output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    for name in HUBS:
+        with tempfile.TemporaryDirectory() as data_dir:
+            layouts = {k: to_golden(v) for k, v in build_layouts(name, data_dir).items()}
+        with open(os.path.join(output_dir, name + ".json"), "w", encoding="utf-8") as f:
+            json.dump(layouts, f, indent=1, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from SMHviz_layout import artifacts
+from SMHviz_layout.artifacts import (artifact_path, clear_artifacts, load_artifact,
+                                     load_layout, set_artifact_cache_size)
+from SMHviz_layout.build import load_config, write_artifacts
+from SMHviz_layout.synthetic import make_hub
+
+
+@pytest.fixture
+def hub(tmp_path):
+    config = load_config(make_hub(str(tmp_path / "hub"), n_rounds=1, n_locations=3,
+                                  n_abstracts=1))
+    yield config
+    clear_artifacts()
+
+
+@pytest.mark.parametrize("round_number, tab", [("1", "../../x"), ("../1", "scenario"),
+                                               ("1", "a/b"), ("1/..", "scenario")])
+def test_artifact_path_rejects_paths(round_number, tab):
+    with pytest.raises(ValueError):
+        artifact_path("sidebar", round_number, tab)
+
+
+def test_load_artifact_rejects_version(hub, tmp_path):
+    artifact_dir = str(tmp_path / "artifacts")
+    write_artifacts(hub, artifact_dir)
+    with pytest.raises(ValueError):
+        load_artifact(artifact_dir, "round_tab", version="../hub")
+    with pytest.raises(ValueError):
+        write_artifacts(hub, artifact_dir, version="..")
+
+
+def test_rewrite_mapped_version(hub, tmp_path):
+    artifact_dir = str(tmp_path / "artifacts")
+    write_artifacts(hub, artifact_dir, version="v1")
+    view = load_artifact(artifact_dir, "round_tab")
+    previous = bytes(view)
+    hub["rounds"][0]["round_name"] = "Renamed round"
+    write_artifacts(hub, artifact_dir, version="v1")
+    # the mapped file was replaced, not rewritten: the previous content stays readable
+    assert bytes(view) == previous
+    clear_artifacts()
+    assert "Renamed round" in json.dumps(load_layout(artifact_dir, "round_tab"))
+
+
+def test_empty_artifact(tmp_path):
+    version_dir = tmp_path / "artifacts" / "v1"
+    version_dir.mkdir(parents=True)
+    (version_dir / "round_tab.json").write_bytes(b"")
+    (tmp_path / "artifacts" / "CURRENT").write_text("v1")
+    assert bytes(load_artifact(str(tmp_path / "artifacts"), "round_tab")) == b""
+    clear_artifacts()
+
+
+def test_clear_artifacts_closes(hub, tmp_path):
+    artifact_dir = str(tmp_path / "artifacts")
+    write_artifacts(hub, artifact_dir)
+    view = load_artifact(artifact_dir, "round_tab")
+    clear_artifacts()
+    with pytest.raises(ValueError):
+        bytes(view)
+    assert not any(i.endswith(".tmp") for _, _, files in os.walk(artifact_dir) for i in files)
+
+
+def test_mapped_bound(hub, tmp_path):
+    artifact_dir = str(tmp_path / "artifacts")
+    write_artifacts(hub, artifact_dir)
+    previous = artifacts._SETTINGS["max_mapped"]
+    try:
+        set_artifact_cache_size(1)
+        view = load_artifact(artifact_dir, "round_tab")
+        content = bytes(view)
+        load_artifact(artifact_dir, "notes_definition")
+        assert len(artifacts._MAPPED) == 1
+        # an evicted mapping stays readable while its memoryview is used
+        assert bytes(view) == content
+    finally:
+        set_artifact_cache_size(previous)
@@ -0,0 +1,79 @@
+import os
+import threading
+
+from SMHviz_layout import cache, watch
+from SMHviz_layout.cache import (cached_read, clear_file_cache, disable_file_cache,
+                                 enable_file_cache, file_cache_namespace, invalidate_path)
+
+
+def test_stale_read_not_stored(tmp_path):
+    path = str(tmp_path / "a.txt")
+    enable_file_cache()
+    try:
+        def loader(p):
+            invalidate_path(p)
+            return "old"
+
+        assert cached_read("text", path, loader) == "old"
+        assert cached_read("text", path, lambda p: "new") == "new"
+        assert cached_read("text", path, lambda p: "newer") == "new"
+        assert cache._LOADING == dict()
+    finally:
+        disable_file_cache()
+
+
+def test_inotify_overflow_clears_cache(tmp_path):
+    path = str(tmp_path / "a.txt")
+    read_fd, write_fd = os.pipe()
+    changed = []
+    watcher = {"stop": threading.Event(), "on_change": changed.append}
+    enable_file_cache()
+    try:
+        cached_read("text", path, lambda p: "old")
+        os.write(write_fd, watch._EVENT.pack(-1, watch._IN_Q_OVERFLOW, 0, 0))
+        thread = threading.Thread(target=watch._inotify,
+                                  args=(watcher, None, read_fd, dict(), {path}, set()))
+        thread.start()
+        for _ in range(100):
+            if changed:
+                break
+            threading.Event().wait(0.05)
+        watcher["stop"].set()
+        thread.join()
+        assert changed == [path]
+        assert cached_read("text", path, lambda p: "new") == "new"
+    finally:
+        os.close(write_fd)
+        disable_file_cache()
+        clear_file_cache()
+
+
+def test_file_cache_bound(tmp_path):
+    enable_file_cache(max_entries=3)
+    try:
+        for i in range(10):
+            cached_read("text", str(tmp_path / str(i)), lambda p: p)
+        assert [k[1] for k in cache._ENTRIES[""]] == [str(tmp_path / str(i)) for i in [7, 8, 9]]
+    finally:
+        enable_file_cache()
+        disable_file_cache()
+
+
+def test_file_cache_namespaces(tmp_path):
+    path = str(tmp_path / "a.txt")
+    enable_file_cache(max_entries=1)
+    try:
+        with file_cache_namespace("covid"):
+            assert cached_read("text", path, lambda p: "covid") == "covid"
+        with file_cache_namespace("flu"):
+            assert cached_read("text", path, lambda p: "flu") == "flu"
+            cached_read("text", str(tmp_path / "b.txt"), lambda p: "b")
+        with file_cache_namespace("covid"):
+            assert cached_read("text", path, lambda p: "new") == "covid"
+        clear_file_cache("covid")
+        assert "covid" not in cache._ENTRIES and "flu" in cache._ENTRIES
+        invalidate_path(str(tmp_path / "b.txt"))
+        assert len(cache._ENTRIES["flu"]) == 0
+    finally:
+        enable_file_cache()
+        disable_file_cache()
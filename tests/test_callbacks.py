@@ -0,0 +1,24 @@
+from SMHviz_layout.build import load_config
+from SMHviz_layout.callbacks import callback_specs
+from SMHviz_layout.synthetic import make_hub
+
+# control ids hard-coded in the layout functions
+CONTROL_IDS = ["scenario-checklist", "location-dropdown", "target-radio", "ui-radio",
+               "sample-slider", "heatmap-quantile_dropdown", "other-scenario",
+               "abstract-dropdown"]
+
+
+def _ids(dependencies):
+    return [i.component_id for i in dependencies["inputs"] + dependencies["states"]]
+
+
+def test_callback_specs_control_ids(tmp_path):
+    config = load_config(make_hub(str(tmp_path), n_rounds=1, n_abstracts=2))
+    ids = set()
+    for tab in config["rounds"][-1]["tabs"]:
+        specs = callback_specs(config, tab)
+        ids.update(_ids(specs))
+        ids.update(_ids(specs["abstract"]))
+        assert "abstract-dropdown" not in _ids(specs)
+        assert [i.component_id for i in specs["abstract"]["outputs"]] == ["abstract-output"]
+    assert [i for i in CONTROL_IDS if i not in ids] == []
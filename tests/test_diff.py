@@ -0,0 +1,34 @@
+from dash import dcc, html, no_update
+
+from SMHviz_layout.diff import layout_diff, make_patch
+
+
+def _layout(options, value):
+    return html.Div([html.P("Target"),
+                     dcc.RadioItems(id="target-radio", options=options, value=value)])
+
+
+def _operations(patch):
+    operations = list()
+    for op in patch.to_plotly_json()["operations"]:
+        operations.append(dict({"operation": op["operation"], "location": op["location"]},
+                               **op["params"]))
+    return operations
+
+
+def test_make_patch_operations():
+    old = _layout(["a", "b", "c"], "a")
+    new = _layout(["a", "c", "d"], "c")
+    patch = make_patch(old, new, fallback=False)
+    assert _operations(patch) == layout_diff(old, new)
+    assert len(_operations(patch)) > 0
+
+
+def test_make_patch_no_update_and_replacement():
+    old = _layout(["a", "b"], "a")
+    assert make_patch(old, _layout(["a", "b"], "a")) is no_update
+    new = html.P("Other")
+    assert make_patch(old, new) is new
+    # a patch not smaller than the new layout is replaced by the new layout
+    small = _layout(["x"], "x")
+    assert make_patch(old, small) is small
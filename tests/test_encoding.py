@@ -0,0 +1,48 @@
+import gzip
+
+from SMHviz_layout import encoding
+from SMHviz_layout.encoding import (build_encoded, clear_encoded, encode_json, encode_layout,
+                                    set_encoding_cache_size)
+
+
+def test_compress_level_key():
+    clear_encoded()
+    payload = b'{"a": "' + b"x" * 1000 + b'"}'
+    fast = encode_json(payload, compress_level=0)
+    best = encode_json(payload, compress_level=9)
+    assert fast["gzip"] != best["gzip"]
+    assert gzip.decompress(fast["gzip"]) == gzip.decompress(best["gzip"]) == payload
+    assert encode_json(payload, compress_level=0) is fast
+
+
+def test_keyed_lookup_before_build():
+    clear_encoded()
+    calls = []
+
+    def builder(value):
+        calls.append(value)
+        return {"value": value}
+
+    first = build_encoded(builder, 1, cache_key=("test", 1))
+    assert build_encoded(builder, 2, cache_key=("test", 1)) is first
+    assert encode_layout(object(), cache_key=("test", 1)) is first
+    assert calls == [1]
+    build_encoded(builder, 1, cache_key=("test", 1), compress_level=1)
+    assert calls == [1, 1]
+    clear_encoded(("test", 1))
+    build_encoded(builder, 1, cache_key=("test", 1))
+    assert calls == [1, 1, 1]
+
+
+def test_cache_bound():
+    clear_encoded()
+    previous = encoding._SETTINGS["max_entries"]
+    try:
+        set_encoding_cache_size(3)
+        for i in range(10):
+            build_encoded(dict, cache_key=("bound", i), value=i)
+        assert len(encoding._KEYED) == 3 and len(encoding._ENCODED) == 3
+        assert ("bound", 9) in [k[0] for k in encoding._KEYED]
+    finally:
+        set_encoding_cache_size(previous)
+        clear_encoded()
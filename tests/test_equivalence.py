@@ -0,0 +1,309 @@
+"""Equivalence test of the optimized layout paths
+
+Generate random valid hubs (see `SMHviz_layout.synthetic.make_hub()`) with random plot tab
+selections and verify that each optimized path (compact options, file cache, asynchronous
+functions, single-flight, artifacts, encoded layouts, hub cache, snapshots, lazy and windowed
+tabs, layout patches) returns the same canonical JSON as the layout functions. The layout
+functions themselves are compared to the baseline output in `test_golden.py`.
+
+The number of random hubs per check is set with the `EQUIVALENCE_CONFIGS` environment variable
+(5 by default) and the seed with `EQUIVALENCE_SEED` (0 by default).
+"""
+import asyncio
+import gzip
+import json
+import os
+import random
+import tempfile
+
+import pytest
+
+from SMHviz_layout import options
+from SMHviz_layout.artifacts import artifact_path, load_layout
+from SMHviz_layout.build import (build_hub_layouts, load_config, round_plot_bar,
+                                 round_sidebar, round_tab_names, write_artifacts)
+from SMHviz_layout.cache import (clear_file_cache, disable_file_cache, enable_file_cache,
+                                 file_cache_enabled)
+from SMHviz_layout.diff import apply_diff, layout_diff
+from SMHviz_layout.encoding import brotli, encode_layout
+from SMHviz_layout.hubs import hub_layout, register_hub, unregister_hub
+from SMHviz_layout.metadata_content import (make_abstract_tab, make_abstract_tab_async,
+                                            make_dt_metadata, make_dt_metadata_async,
+                                            render_abstract, render_abstract_async)
+from SMHviz_layout.serialize import canonical_json
+from SMHviz_layout.sidebar import make_sidebar
+from SMHviz_layout.singleflight import single_flight
+from SMHviz_layout.snapshot import load_snapshot, write_snapshots
+from SMHviz_layout.synthetic import ALL_TABS, make_hub
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+
+def random_config(hub_dir, rng):
+    """Random valid hub configuration
+
+    Write a synthetic hub with a random number of rounds, locations, targets, scenarios,
+    pathogens and abstracts, then select random plot tabs for each round and random sidebar and
+    plot bar parameters.
+
+    :parameter hub_dir: Path to the folder in which the hub files are written
+    :type hub_dir: str
+    :parameter rng: Random generator
+    :type rng: random.Random
+    :return: the hub configuration, see `SMHviz_layout.build.load_config()`
+    """
+    n_pathogens = rng.randint(1, 3)
+    tabs = ALL_TABS
+    if n_pathogens < 2:
+        tabs = [i for i in ALL_TABS if not i.startswith("multipat_plot")]
+    n_rounds = rng.randint(1, 4)
+    config = load_config(make_hub(hub_dir, n_rounds=n_rounds, n_locations=rng.randint(2, 30),
+                                  n_targets=rng.randint(1, 10), n_scenarios=rng.randint(2, 6),
+                                  n_pathogens=n_pathogens,
+                                  n_abstracts=rng.randint(n_rounds, 3 * n_rounds),
+                                  tabs=tabs, seed=rng.randrange(2 ** 31)))
+    config["plot_bar"].update({"hide_ens": rng.random() < 0.5,
+                               "max_horizon": rng.randint(4, 104),
+                               "sc_multi_panel": rng.random() < 0.5})
+    config["sidebar"] = {"cumulative": rng.random() < 0.8, "multi_ui": rng.random() < 0.5}
+    for round_config in config["rounds"]:
+        round_config["tabs"] = rng.sample(tabs, rng.randint(1, len(tabs)))
+    return config
+
+
+def _round_layouts(config, round_config, tabs):
+    layouts = dict()
+    for tab in tabs:
+        layouts["sidebar/" + tab] = round_sidebar(config, round_config, tab)
+        layouts["plot_bar/" + tab] = round_plot_bar(config, round_config, tab)
+    return layouts
+
+
+def _io_layouts(config, round_config, asynchronous=False):
+    round_number = round_config["round_number"]
+    path = config["abstract_path"]
+    abstracts = make_abstract_tab(round_number, path=path).children[0].options
+    if asynchronous:
+        async def build():
+            layouts = {"dt_metadata": await make_dt_metadata_async(config["metadata_file"]),
+                       "abstract_tab": await make_abstract_tab_async(round_number, path=path)}
+            for i in abstracts:
+                layouts["abstract/" + i] = await render_abstract_async(
+                    round_number, round_config["round_date"], i, path=path)
+            return layouts
+        return asyncio.run(build())
+    layouts = {"dt_metadata": make_dt_metadata(config["metadata_file"]),
+               "abstract_tab": make_abstract_tab(round_number, path=path)}
+    for i in abstracts:
+        layouts["abstract/" + i] = render_abstract(round_number, round_config["round_date"], i,
+                                                   path=path)
+    return layouts
+
+
+def _pairs(reference, optimized):
+    return [(name, reference[name], optimized.get(name)) for name in reference]
+
+
+def check_compact_options(config, rng, work_dir):
+    compact = options.compact_options_enabled()
+    round_config = rng.choice(config["rounds"])
+    try:
+        options.set_compact_options(False)
+        reference = _round_layouts(config, round_config, round_config["tabs"])
+        options.set_compact_options(True)
+        optimized = _round_layouts(config, round_config, round_config["tabs"])
+    finally:
+        options.set_compact_options(compact)
+    return _pairs(reference, optimized)
+
+
+def check_file_cache(config, rng, work_dir):
+    enabled = file_cache_enabled()
+    round_config = rng.choice(config["rounds"])
+    tabs = round_config["tabs"]
+    try:
+        disable_file_cache()
+        reference = _round_layouts(config, round_config, tabs)
+        reference.update(_io_layouts(config, round_config))
+        enable_file_cache()
+        clear_file_cache()
+        cold = _round_layouts(config, round_config, tabs)
+        cold.update(_io_layouts(config, round_config))
+        warm = _round_layouts(config, round_config, tabs)
+        warm.update(_io_layouts(config, round_config))
+    finally:
+        clear_file_cache()
+        if not enabled:
+            disable_file_cache()
+    return [(name + " (cold)", ref, opt) for name, ref, opt in _pairs(reference, cold)] + \
+           [(name + " (warm)", ref, opt) for name, ref, opt in _pairs(reference, warm)]
+
+
+def check_async(config, rng, work_dir):
+    round_config = rng.choice(config["rounds"])
+    return _pairs(_io_layouts(config, round_config),
+                  _io_layouts(config, round_config, asynchronous=True))
+
+
+def check_single_flight(config, rng, work_dir):
+    round_config = rng.choice(config["rounds"])
+    tab = rng.choice(round_config["tabs"])
+    args = (round_config["round_number"], tab, config["scenario_file"], config["location_info"],
+            config["scenario_dict"], config["target_dict"], config["def_target"])
+    return [("sidebar/" + tab, make_sidebar(*args, **config["sidebar"]),
+             single_flight(make_sidebar)(*args, **config["sidebar"]))]
+
+
+def _stored_layouts(config, load):
+    hub_layouts = build_hub_layouts(config)
+    pairs = [(kind, hub_layouts[artifact_path(kind)], load(kind, None, None))
+             for kind in ["round_tab", "notes_definition", "dt_metadata"]]
+    for round_config in config["rounds"]:
+        round_number = round_config["round_number"]
+        pairs.append(("tab_plots/" + str(round_number),
+                      make_tab_plots(round_config["tabs"], config["tab_name_dict"]),
+                      load("tab_plots", round_number, None)))
+        pairs.append(("abstract_tab/" + str(round_number),
+                      make_abstract_tab(round_number, path=config["abstract_path"]),
+                      load("abstract_tab", round_number, None)))
+        for tab in round_config["tabs"]:
+            pairs.append(("sidebar/" + str(round_number) + "/" + tab,
+                          round_sidebar(config, round_config, tab),
+                          load("sidebar", round_number, tab)))
+            pairs.append(("plot_bar/" + str(round_number) + "/" + tab,
+                          round_plot_bar(config, round_config, tab),
+                          load("plot_bar", round_number, tab)))
+    return pairs
+
+
+def check_artifacts(config, rng, work_dir):
+    artifact_dir = tempfile.mkdtemp(dir=work_dir)
+    write_artifacts(config, artifact_dir)
+    return _stored_layouts(config, lambda kind, round_number, tab: load_layout(
+        artifact_dir, kind, round_number=round_number, tab=tab))
+
+
+def check_encoded(config, rng, work_dir):
+    round_config = rng.choice(config["rounds"])
+    pairs = list()
+    for name, layout in _round_layouts(config, round_config, round_config["tabs"]).items():
+        encoded = encode_layout(layout)
+        pairs.append((name + " (json)", layout, json.loads(encoded["json"])))
+        pairs.append((name + " (gzip)", layout, json.loads(gzip.decompress(encoded["gzip"]))))
+        if encoded["br"] is not None:
+            pairs.append((name + " (br)", layout, json.loads(brotli.decompress(encoded["br"]))))
+    return pairs
+
+
+def check_hubs(config, rng, work_dir):
+    name = "equivalence-" + str(rng.randrange(2 ** 31))
+    register_hub(name, config, memory_cap=rng.choice([None, 200000]))
+    try:
+        pairs = list()
+        for round_config in config["rounds"]:
+            round_number = round_config["round_number"]
+            for tab in round_config["tabs"]:
+                for kind, layout in [("sidebar", round_sidebar(config, round_config, tab)),
+                                     ("plot_bar", round_plot_bar(config, round_config, tab))]:
+                    encoded = hub_layout(name, kind, round_number=round_number, tab=tab)
+                    pairs.append((kind + "/" + str(round_number) + "/" + tab, layout,
+                                  json.loads(encoded["json"])))
+        pairs.append(("round_tab", make_round_tab(round_tab_names(config)),
+                      json.loads(hub_layout(name, "round_tab")["json"])))
+    finally:
+        unregister_hub(name)
+    return pairs
+
+
+def check_snapshots(config, rng, work_dir):
+    snapshot_dir = tempfile.mkdtemp(dir=work_dir)
+    write_snapshots(config, snapshot_dir)
+    return _stored_layouts(config, lambda kind, round_number, tab: json.loads(bytes(
+        load_snapshot(snapshot_dir, kind, round_number=round_number, tab=tab))))
+
+
+def check_lazy_tabs(config, rng, work_dir):
+    round_config = rng.choice(config["rounds"])
+    tab = rng.choice(round_config["tabs"])
+    content = [round_sidebar(config, round_config, tab), round_plot_bar(config, round_config, tab)]
+    round_names = round_tab_names(config)
+    return [("tab_plots/" + tab,
+             make_tab_plots(round_config["tabs"], config["tab_name_dict"], plot_sel=tab,
+                            content=content),
+             make_tab_plots(round_config["tabs"], config["tab_name_dict"], plot_sel=tab,
+                            content=lambda x: content)),
+            ("round_tab", make_round_tab(round_names),
+             make_round_tab(round_names, window=len(round_names) + rng.randint(0, 3)))]
+
+
+def check_patch(config, rng, work_dir):
+    pairs = list()
+    for builder in [round_sidebar, round_plot_bar]:
+        old_round, new_round = rng.choice(config["rounds"]), rng.choice(config["rounds"])
+        old = builder(config, old_round, rng.choice(old_round["tabs"]))
+        new = builder(config, new_round, rng.choice(new_round["tabs"]))
+        pairs.append((builder.__name__, new, apply_diff(old, layout_diff(old, new))))
+    return pairs
+
+
+CHECKS = {
+    "compact_options": check_compact_options,
+    "file_cache": check_file_cache,
+    "async": check_async,
+    "single_flight": check_single_flight,
+    "artifacts": check_artifacts,
+    "encoded": check_encoded,
+    "hubs": check_hubs,
+    "snapshots": check_snapshots,
+    "lazy_tabs": check_lazy_tabs,
+    "patch": check_patch,
+}
+
+
+def _difference(reference, optimized):
+    position = next((i for i, (a, b) in enumerate(zip(reference, optimized)) if a != b),
+                    min(len(reference), len(optimized)))
+    return ("reference: ..." + reference[max(position - 60, 0):position + 60] +
+            "...\noptimized: ..." + optimized[max(position - 60, 0):position + 60] + "...")
+
+
+def run_equivalence(n_configs=20, seed=0, checks=None):
+    """Run the equivalence test
+
+    For each of the `n_configs` random hubs (see `random_config()`), run each check: compare the
+    canonical JSON (see `SMHviz_layout.serialize.canonical_json()`) of the layouts returned by
+    the reference layout functions and by the optimized path.
+
+    :parameter n_configs: Number of random hubs
+    :type n_configs: int
+    :parameter seed: Seed of the random generator, a failing hub is reproduced with the same seed
+    :type seed: int
+    :parameter checks: List of the checks to run (keys of `CHECKS`), if `None` (default), all the
+        checks
+    :type checks: list | None
+    :return: a dictionary with the number of random hubs (`configs`) and the number of compared
+        layouts per check (`comparisons`). An AssertionError is raised, with the check, the hub
+        number and the layout name, if an optimized path returns a different output.
+    """
+    if checks is None:
+        checks = list(CHECKS)
+    rng = random.Random(seed)
+    comparisons = dict.fromkeys(checks, 0)
+    for n in range(n_configs):
+        with tempfile.TemporaryDirectory() as work_dir:
+            config = random_config(work_dir + "/hub", rng)
+            for check in checks:
+                for name, reference, optimized in CHECKS[check](config, rng, work_dir):
+                    reference = canonical_json(reference)
+                    optimized = canonical_json(optimized)
+                    assert reference == optimized, \
+                        ("different output, check: " + check + ", hub: " + str(n) + " (seed " +
+                         str(seed) + "), layout: " + name + "\n" +
+                         _difference(reference, optimized))
+                    comparisons[check] += 1
+    return {"configs": n_configs, "comparisons": comparisons}
+
+
+@pytest.mark.parametrize("check", list(CHECKS))
+def test_equivalence(check):
+    run_equivalence(n_configs=int(os.environ.get("EQUIVALENCE_CONFIGS", 5)),
+                    seed=int(os.environ.get("EQUIVALENCE_SEED", 0)), checks=[check])
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+from dash import dcc
+
+from SMHviz_layout.export import export_static, render_html
+
+
+def _abstract_hub(tmp_path, text):
+    round_path = tmp_path / "abstracts" / "round1"
+    round_path.mkdir(parents=True)
+    (round_path / "2023-01-01-team-model-Abstract.md").write_text(text, encoding="utf-8")
+    return {"rounds": [{"round_number": 1}], "abstract_path": str(tmp_path / "abstracts") + "/"}
+
+
+@pytest.mark.parametrize("use_markdown", [True, False])
+def test_abstract_script_rendered_as_text(tmp_path, monkeypatch, use_markdown):
+    if not use_markdown:
+        monkeypatch.setattr("SMHviz_layout.export.markdown", None)
+    else:
+        pytest.importorskip("markdown")
+    config = _abstract_hub(tmp_path, "# Model\n\n<script>alert(1)</script>\n\n"
+                                     "<img src=x onerror=alert(2)>\n\n"
+                                     "[link](javascript:alert(3))")
+    export_static(config, str(tmp_path / "static"))
+    with open(tmp_path / "static" / "abstracts" / "round1" / "team-model.html",
+              encoding="utf-8") as f:
+        content = f.read()
+    assert "<script" not in content
+    assert "<img" not in content
+    assert 'href="javascript:' not in content
+    assert "&lt;script&gt;" in content
+
+
+def test_markdown_allow_html():
+    pytest.importorskip("markdown")
+    content = render_html(dcc.Markdown("<b>bold</b>", dangerously_allow_html=True))
+    assert "<b>bold</b>" in content
+    assert "&lt;b&gt;" in render_html(dcc.Markdown("<b>bold</b>"))
+
+
+def test_export_skips_other_files(tmp_path):
+    config = _abstract_hub(tmp_path, "Abstract")
+    round_path = tmp_path / "abstracts" / "round1"
+    (round_path / "README.md").write_text("Not an abstract", encoding="utf-8")
+    (round_path / "2023-01-01-folder").mkdir()
+    written = export_static(config, str(tmp_path / "static"), fragment=True)
+    assert sorted(os.path.basename(i) for i in written) == ["index.html", "team-model.html"]
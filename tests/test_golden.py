@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+from golden_layouts import HUBS, TABS, build_layouts, sidebar_args, to_golden, write_hub
+from SMHviz_layout import options
+from SMHviz_layout.cache import (clear_file_cache, disable_file_cache, enable_file_cache,
+                                 file_cache_enabled)
+from SMHviz_layout.sidebar import make_sidebars
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "golden")
+
+
+def _golden(name):
+    with open(os.path.join(GOLDEN_DIR, name + ".json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _assert_golden(layouts, golden):
+    assert sorted(layouts) == sorted(golden)
+    for name, layout in layouts.items():
+        assert to_golden(layout) == golden[name], name
+
+
+@pytest.fixture(params=[False, True], ids=["lists", "compact"])
+def compact(request):
+    previous = options.compact_options_enabled()
+    options.set_compact_options(request.param)
+    yield request.param
+    options.set_compact_options(previous)
+
+
+@pytest.fixture(params=[False, True], ids=["no_cache", "file_cache"])
+def file_cache(request):
+    enabled = file_cache_enabled()
+    clear_file_cache()
+    if request.param:
+        enable_file_cache()
+    else:
+        disable_file_cache()
+    yield request.param
+    clear_file_cache()
+    if enabled:
+        enable_file_cache()
+    else:
+        disable_file_cache()
+
+
+@pytest.mark.parametrize("name", list(HUBS))
+def test_layouts(name, compact, file_cache, tmp_path):
+    golden = _golden(name)
+    _assert_golden(build_layouts(name, str(tmp_path)), golden)
+    if file_cache:
+        # second build from the cached files
+        _assert_golden(build_layouts(name, str(tmp_path)), golden)
+
+
+@pytest.mark.parametrize("name", list(HUBS))
+def test_batched_sidebars(name, compact, tmp_path):
+    golden = _golden(name)
+    args, kwargs = sidebar_args(name, write_hub(name, str(tmp_path)))
+    sidebars = make_sidebars(args[0], TABS, *args[1:], **kwargs)
+    assert list(sidebars) == TABS
+    for tab in TABS:
+        assert to_golden(sidebars[tab]) == golden["sidebar/" + tab], tab
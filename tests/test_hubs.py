@@ -0,0 +1,38 @@
+import gc
+
+from SMHviz_layout import cache, hubs
+from SMHviz_layout.build import load_config
+from SMHviz_layout.cache import disable_file_cache, enable_file_cache
+from SMHviz_layout.hubs import hub_layout, register_hub, unregister_hub
+from SMHviz_layout.synthetic import make_hub
+
+
+def test_hub_file_cache_namespaces(tmp_path):
+    enable_file_cache()
+    try:
+        for name in ["covid", "flu"]:
+            register_hub(name, load_config(make_hub(str(tmp_path / name), n_rounds=1)))
+            hub_layout(name, "dt_metadata")
+        assert "hub/covid" in cache._ENTRIES and "hub/flu" in cache._ENTRIES
+        unregister_hub("covid")
+        assert "hub/covid" not in cache._ENTRIES and "hub/flu" in cache._ENTRIES
+    finally:
+        unregister_hub("covid")
+        unregister_hub("flu")
+        disable_file_cache()
+
+
+def test_shared_table_released(tmp_path):
+    gc.collect()
+    previous = len(hubs._SHARED)
+    config = load_config(make_hub(str(tmp_path), n_rounds=1))
+    register_hub("covid", config)
+    register_hub("flu", config)
+    config = None
+    assert len(hubs._SHARED) == previous + 1
+    unregister_hub("covid")
+    gc.collect()
+    assert len(hubs._SHARED) == previous + 1
+    unregister_hub("flu")
+    gc.collect()
+    assert len(hubs._SHARED) == previous
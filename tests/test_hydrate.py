@@ -0,0 +1,51 @@
+import json
+
+from dash import Output
+
+from SMHviz_layout.build import load_config, round_plot_bar, round_sidebar, round_tab_names
+from SMHviz_layout.hydrate import make_hydrated_layout, prevent_initial_call
+from SMHviz_layout.serialize import canonical_json, to_json
+from SMHviz_layout.synthetic import make_hub
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+
+def _set_props(node, props):
+    if isinstance(node, list):
+        for i in node:
+            _set_props(i, props)
+    elif isinstance(node, dict) and "props" in node and "type" in node:
+        component_id = node["props"].get("id")
+        for prop, value in node["props"].items():
+            if isinstance(component_id, str) and prop != "id" and value is not None:
+                props.add(component_id + "." + prop)
+            if isinstance(value, (list, dict)):
+                _set_props(value, props)
+    return props
+
+
+def test_hydrated_layout(tmp_path):
+    config = load_config(make_hub(str(tmp_path), n_rounds=2))
+    round_config = config["rounds"][-1]
+    tab = round_config["tabs"][1]
+    hydrated = make_hydrated_layout(config, tab=tab)
+    assert hydrated["round_number"] == round_config["round_number"] and hydrated["tab"] == tab
+    layout = hydrated["layout"]
+    expected = _set_props(json.loads(to_json(layout)), set())
+    assert set(hydrated["prevent_initial_call"]) == expected
+    assert all(hydrated["prevent_initial_call"].values())
+    # same components as the non-hydrated layout functions
+    round_names = round_tab_names(config)
+    assert canonical_json(layout.children[0].children) == \
+        canonical_json(make_round_tab(round_names, round_sel=round_names[-1]))
+    assert canonical_json(layout.children[1].children) == canonical_json(
+        make_tab_plots(round_config["tabs"], config["tab_name_dict"], plot_sel=tab,
+                       content=[round_sidebar(config, round_config, tab),
+                                round_plot_bar(config, round_config, tab)]))
+
+
+def test_prevent_initial_call(tmp_path):
+    hydrated = make_hydrated_layout(load_config(make_hub(str(tmp_path), n_rounds=1)))
+    content = Output("plot_tabs-content", "children")
+    assert prevent_initial_call(hydrated, content, "tabs-plot.value") is True
+    assert prevent_initial_call(hydrated, content, Output("plot-graph", "figure")) is False
+    assert prevent_initial_call(hydrated) is False
@@ -0,0 +1,38 @@
+import pytest
+
+from golden_layouts import plot_bar_args, sidebar_args, write_hub
+from SMHviz_layout import instrument
+from SMHviz_layout.plottab_bar import make_plot_bar, scen_comp_bar
+from SMHviz_layout.sidebar import make_sidebar
+
+
+@pytest.fixture
+def instrumentation():
+    instrument.reset_stats()
+    instrument.enable_instrumentation()
+    yield
+    instrument.disable_instrumentation()
+    instrument.reset_stats()
+
+
+def test_nested_calls_not_recorded(instrumentation, tmp_path):
+    inputs = write_hub("large", str(tmp_path))
+    args, kwargs = sidebar_args("large", inputs)
+    make_sidebar(args[0], "scenario", *args[1:], **kwargs)
+    make_plot_bar(**plot_bar_args("large", inputs, "scen_comparison"))
+    scen_comp_bar(12, "Panel")
+    builders = instrument.stats()["builders"]
+    assert sorted(builders) == ["make_plot_bar", "make_sidebar", "scen_comp_bar"]
+    assert list(builders["make_sidebar"]) == ["scenario"]
+    assert builders["make_sidebar"]["scenario"]["file_reads"] == 1
+    assert builders["scen_comp_bar"][""]["calls"] == 1
+
+
+def test_prometheus_labels(instrumentation, tmp_path):
+    inputs = write_hub("small", str(tmp_path))
+    make_plot_bar(**plot_bar_args("small", inputs, "trend_map"))
+    scen_comp_bar(12, "Panel")
+    metrics = instrument.render_prometheus()
+    assert 'smhviz_builder_calls_total{builder="make_plot_bar",plot_tab="trend_map"} 1' in metrics
+    assert 'smhviz_builder_calls_total{builder="scen_comp_bar"} 1' in metrics
+    assert "tab=\"\"" not in metrics
@@ -0,0 +1,29 @@
+import json
+
+from SMHviz_layout.build import load_config
+from SMHviz_layout.loadtest import (METADATA_PAGE_SIZE, create_app, run_loadtest,
+                                    traffic_plan)
+from SMHviz_layout.synthetic import make_hub
+
+
+def test_traffic_plan(tmp_path):
+    config = load_config(make_hub(str(tmp_path), n_rounds=2, n_abstracts=25))
+    plan = traffic_plan(config)
+    assert len(plan["abstract"]) == 25
+    paging = [requests[1] for requests in plan["metadata"] if len(requests) > 1]
+    assert paging
+    app = create_app(config)
+    client = app.server.test_client()
+    for name, method, path, body in paging:
+        response = client.post(path, json=body)
+        assert response.status_code == 200
+        data = json.loads(response.data)["response"]["metadata-table"]["data"]
+        assert 0 < len(data) <= METADATA_PAGE_SIZE
+
+
+def test_run_loadtest(tmp_path):
+    config = load_config(make_hub(str(tmp_path), n_abstracts=25))
+    summary = run_loadtest(config, clients=2, duration=1, mix={"metadata": 1})
+    assert summary["metadata_page"]["count"] > 0
+    assert summary["metadata_page"]["errors"] == 0
+    assert summary["update_page"]["errors"] == 0
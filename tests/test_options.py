@@ -0,0 +1,25 @@
+from SMHviz_layout import options
+from SMHviz_layout.options import OptionList, option_list, set_compact_options
+
+
+def test_default_lists():
+    assert options.compact_options_enabled() is False
+    output = option_list([{"label": "A", "value": "a"}], disabled=True)
+    assert output == [{"label": "A", "value": "a", "disabled": True}]
+    output.append({"label": "B", "value": "b"})
+
+
+def test_compact_shared():
+    try:
+        set_compact_options(True)
+        first = option_list(({"label": i, "value": i.lower(), "disabled": False} for i in "AB"),
+                            disabled=True)
+        second = option_list([{"label": i, "value": i.lower()} for i in "AB"], disabled=True)
+        assert isinstance(first, OptionList) and first is second
+        assert first.to_plotly_json() == [{"label": "A", "value": "a", "disabled": True},
+                                          {"label": "B", "value": "b", "disabled": True}]
+        assert first[1:] == [{"label": "B", "value": "b", "disabled": True}]
+        assert first[::-1] == first.to_plotly_json()[::-1] and first[5:] == []
+        assert option_list([{"label": "A"}, {"value": "b"}]) == [{"label": "A"}, {"value": "b"}]
+    finally:
+        set_compact_options(False)
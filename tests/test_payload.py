@@ -0,0 +1,12 @@
+import pytest
+from dash import html
+
+from SMHviz_layout.payload import PayloadBudgetError, check_budget
+
+
+def test_check_budget_dict_id():
+    layout = html.Div([html.Div("x" * 100, id={"type": "graph", "index": 1}),
+                       html.Div("y", id="other")])
+    assert check_budget(layout, {"other": 1000, '{"index":2,"type":"graph"}': 10}) > 0
+    with pytest.raises(PayloadBudgetError):
+        check_budget(layout, {'{"index":1,"type":"graph"}': 10})
@@ -0,0 +1,20 @@
+import os
+import threading
+
+from SMHviz_layout.profiling import flush_profiles, profile_builders, profiling_enabled
+from SMHviz_layout.search import make_abstract_search
+
+
+def test_profile_builders_context(tmp_path):
+    other = list()
+    with profile_builders(["make_abstract_search"], str(tmp_path), keep=2, memory=False):
+        assert profiling_enabled()
+        thread = threading.Thread(target=lambda: other.append(profiling_enabled()))
+        thread.start()
+        thread.join()
+        for _ in range(4):
+            make_abstract_search()
+    assert other == [False]
+    assert not profiling_enabled()
+    flush_profiles()
+    assert len([i for i in os.listdir(str(tmp_path)) if i.endswith(".prof")]) == 2
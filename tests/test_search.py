@@ -0,0 +1,23 @@
+from SMHviz_layout.search import build_index, render_search_results
+
+
+def test_build_index_skips_other_entries(tmp_path):
+    round_path = tmp_path / "round1"
+    (round_path / "images").mkdir(parents=True)
+    (round_path / "README.md").write_text("vaccination readme", encoding="utf-8")
+    (round_path / "2023-01-01-team_a-Abstract.md").write_text("vaccination model",
+                                                             encoding="utf-8")
+    (round_path / "2023-01-01-team_b-abstract.md").write_bytes(b"vaccination caf\xe9")
+    index = build_index(str(tmp_path) + "/")
+    assert [i[2] for i in index["docs"]] == ["team_a", "team_b"]
+    assert "readme" not in index["terms"]
+
+
+def test_search_results_link_abstracts(tmp_path):
+    round_path = tmp_path / "round1"
+    round_path.mkdir()
+    (round_path / "2023-01-01-team_a-Abstract.md").write_text("vaccination", encoding="utf-8")
+    results = render_search_results(build_index(str(tmp_path) + "/"), "vaccination",
+                                    id_append="1")
+    link = results.children[0].children[0].children[0]
+    assert link.id == {"type": "abstract-search1-result", "round": "1", "team_model": "team_a"}
@@ -0,0 +1,102 @@
+from dash import dcc, html
+
+from golden_layouts import plot_bar_args, sidebar_args, write_hub
+from SMHviz_layout.plottab_bar import make_plot_bar
+from SMHviz_layout.selections import (apply_selections, selection_store, store_selections,
+                                      tab_selections)
+from SMHviz_layout.sidebar import make_sidebar, make_sidebars
+
+
+def _control(component, component_id):
+    if getattr(component, "id", None) == component_id:
+        return component
+    children = getattr(component, "children", None)
+    if not isinstance(children, (list, tuple)):
+        children = [children]
+    for i in children:
+        if hasattr(i, "children") or hasattr(i, "id"):
+            found = _control(i, component_id)
+            if found is not None:
+                return found
+    return None
+
+
+def _values(component):
+    options = component.options
+    if isinstance(options, dict):
+        return list(options)
+    return [i["value"] if isinstance(i, dict) else i for i in options]
+
+
+def _sidebar(tmp_path, tab, selections):
+    args, kwargs = sidebar_args("large", write_hub("large", str(tmp_path)))
+    return make_sidebar(args[0], tab, *args[1:], selections=selections, **kwargs)
+
+
+def test_store_and_tab_selections():
+    assert selection_store().data == dict()
+    data = store_selections(None, "scenario", {"location-dropdown": "US"})
+    data = store_selections(data, "scenario", {"target-radio": "inc hosp"})
+    data = store_selections(data, "heatmap", {"location-dropdown": "01"})
+    assert tab_selections(data, "scenario") == {"location-dropdown": "US",
+                                                "target-radio": "inc hosp"}
+    assert tab_selections(data, "heatmap") == {"location-dropdown": "01"}
+    assert tab_selections(data, "spaghetti") == dict()
+    assert tab_selections(None, "scenario") == dict()
+
+
+def test_sidebar_valid_and_stale_values(tmp_path):
+    default = _sidebar(tmp_path, "scenario", None)
+    values = _values(_control(default, "target-radio"))
+    assert values[-1] != _control(default, "target-radio").value
+    restored = _sidebar(tmp_path, "scenario", {"scenario": {"target-radio": values[-1]}})
+    assert _control(restored, "target-radio").value == values[-1]
+    stale = _sidebar(tmp_path, "scenario", {"scenario": {"target-radio": "inc removed"}})
+    assert _control(stale, "target-radio").value == _control(default, "target-radio").value
+    # values stored for another tab are not applied
+    other = _sidebar(tmp_path, "scenario", {"spaghetti": {"target-radio": values[-1]}})
+    assert _control(other, "target-radio").value == _control(default, "target-radio").value
+
+
+def test_sidebars_selections_per_tab(tmp_path):
+    args, kwargs = sidebar_args("large", write_hub("large", str(tmp_path)))
+    values = _values(_control(make_sidebar(args[0], "scenario", *args[1:], **kwargs),
+                              "target-radio"))
+    sidebars = make_sidebars(args[0], ["scenario", "spaghetti"], *args[1:],
+                             selections={"spaghetti": {"target-radio": values[-1]}}, **kwargs)
+    assert _control(sidebars["spaghetti"], "target-radio").value == values[-1]
+    assert _control(sidebars["scenario"], "target-radio").value != values[-1]
+
+
+def test_disabled_control(tmp_path):
+    default = _sidebar(tmp_path, "heatmap", None)
+    assert _control(default, "location-dropdown").disabled is True
+    restored = _sidebar(tmp_path, "heatmap", {"heatmap": {"location-dropdown": "US"}})
+    assert _control(restored, "location-dropdown").value == \
+        _control(default, "location-dropdown").value
+
+
+def test_slider_range(tmp_path):
+    inputs = write_hub("large", str(tmp_path))
+    kwargs = plot_bar_args("large", inputs, "spaghetti")
+    slider = _control(make_plot_bar(**kwargs), "sample-slider")
+    restored = make_plot_bar(selections={"spaghetti": {"sample-slider": slider.min}}, **kwargs)
+    assert _control(restored, "sample-slider").value == slider.min
+    for value in [slider.max + 1, slider.min - 1, "10", [slider.min, slider.max]]:
+        ignored = make_plot_bar(selections={"spaghetti": {"sample-slider": value}}, **kwargs)
+        assert _control(ignored, "sample-slider").value == slider.value
+    range_slider = html.Div([dcc.RangeSlider(id="range", min=0, max=10, value=[0, 10])])
+    apply_selections(range_slider, {"range": [2, 5]})
+    assert range_slider.children[0].value == [2, 5]
+    apply_selections(range_slider, {"range": [2, 50]})
+    assert range_slider.children[0].value == [2, 5]
+
+
+def test_checklist_partial_values():
+    layout = html.Div(dcc.Checklist(id="check", options=["a", "b", {"label": "c", "value": "c",
+                                                                    "disabled": True}],
+                                    value=["a"]))
+    apply_selections(layout, {"check": ["b", "c", "removed"]})
+    assert layout.children.value == ["b"]
+    apply_selections(layout, {"check": ["removed"]})
+    assert layout.children.value == ["b"]
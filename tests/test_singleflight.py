@@ -0,0 +1,34 @@
+import asyncio
+import gc
+
+from SMHviz_layout import singleflight
+from SMHviz_layout.singleflight import make_key, single_flight_async
+
+
+def builder(value, hide_ens=False):
+    return value
+
+
+def test_key_scalar_types():
+    keys = {make_key(builder, (), {"hide_ens": i}) for i in [True, 1, 1.0]}
+    assert len(keys) == 3
+    assert make_key(builder, ([1, {"a": True}],), {}) != make_key(builder, ([1, {"a": 1}],), {})
+    assert make_key(builder, ([1, {"a": True}],), {}) == make_key(builder, ([1, {"a": True}],), {})
+
+
+def test_async_calls_by_loop():
+    async def build(value):
+        await asyncio.sleep(0.01)
+        return [value]
+
+    build_once = single_flight_async(build)
+
+    async def run():
+        first, second = await asyncio.gather(build_once(1), build_once(1))
+        assert first is second
+        return first
+
+    asyncio.run(run())
+    asyncio.run(run())
+    gc.collect()
+    assert len(singleflight._ASYNC_CALLS) == 0
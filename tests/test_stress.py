@@ -0,0 +1,123 @@
+"""Concurrency stress test of the layout functions
+
+Run concurrent builds of all the layout functions on a synthetic hub and verify that the outputs
+are deterministic and that the inputs are not modified.
+
+The number of builds is set with the `STRESS_BUILDS` environment variable (300 by default) and
+the number of threads with `STRESS_WORKERS` (8 by default).
+"""
+import copy
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from dash import dcc
+
+from SMHviz_layout.build import load_config
+from SMHviz_layout.metadata_content import make_abstract_tab, make_dt_metadata, render_abstract
+from SMHviz_layout.notes_definition import make_notes_definition
+from SMHviz_layout.plottab_bar import make_plot_bar
+from SMHviz_layout.serialize import canonical_json
+from SMHviz_layout.sidebar import make_sidebar
+from SMHviz_layout.synthetic import make_hub
+from SMHviz_layout.tabs import make_round_tab, make_tab_plots
+
+
+def _snapshot(value):
+    if hasattr(value, "to_plotly_json"):
+        return canonical_json(value)
+    if hasattr(value, "to_dict"):
+        return value.to_dict("list")
+    if isinstance(value, dict):
+        return {k: _snapshot(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_snapshot(v) for v in value]
+    return copy.deepcopy(value)
+
+
+def stress_jobs(config):
+    """List of layout function calls on a hub
+
+    All the calls share the same input objects (lists, dictionaries, DataFrame) to detect any
+    modification of the inputs by the layout functions.
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :return: list of tuples (name, layout function, positional arguments, keyword arguments)
+    """
+    ui_sel_list = [{"label": "None", "value": 0}, {"label": "50%", "value": 50},
+                   {"label": "95%", "value": 95}]
+    unselect_scenario = list()
+    jobs = [
+        ("round_tab", make_round_tab, ([i.get("round_name") for i in config["rounds"]],), {}),
+        ("notes_definition", make_notes_definition,
+         (dcc.Markdown(config["notes"]["definitions"]),
+          dcc.Markdown(config["notes"]["notes_left"]),
+          dcc.Markdown(config["notes"]["notes_right"])), {}),
+        ("dt_metadata", make_dt_metadata, (config["metadata_file"],), {}),
+    ]
+    for round_config in config["rounds"]:
+        round_number = round_config["round_number"]
+        bar_param = dict(config["plot_bar"], **round_config.get("plot_bar", dict()))
+        if len(bar_param["scen_choice"]) > 1:
+            unselect_scenario.append(bar_param["scen_choice"][1])
+        jobs.append(("tab_plots/" + str(round_number), make_tab_plots,
+                     (round_config["tabs"], config["tab_name_dict"]), {}))
+        jobs.append(("abstract_tab/" + str(round_number), make_abstract_tab, (round_number,),
+                     {"path": config["abstract_path"]}))
+        for tab in round_config["tabs"]:
+            jobs.append(("sidebar/" + str(round_number) + "/" + tab, make_sidebar,
+                         (round_number, tab, config["scenario_file"], config["location_info"],
+                          config["scenario_dict"], config["target_dict"], config["def_target"]),
+                         {"ui_sel_list": ui_sel_list, "unselect_scenario": unselect_scenario}))
+            jobs.append(("plot_bar/" + str(round_number) + "/" + tab, make_plot_bar, (),
+                         dict(bar_param, plot_tab=tab)))
+        for abstract in make_abstract_tab(round_number,
+                                          path=config["abstract_path"]).children[0].options:
+            jobs.append(("abstract/" + str(round_number) + "/" + abstract, render_abstract,
+                         (round_number, round_config["round_date"], abstract),
+                         {"path": config["abstract_path"]}))
+    return jobs
+
+
+def run_stress(config, n_builds=5000, workers=32):
+    """Run a concurrency stress test
+
+    Build all the layouts once sequentially (reference output), then run `n_builds` builds
+    concurrently in a `ThreadPoolExecutor` and verify that each output is identical to the
+    reference and that the inputs are not modified.
+
+    :parameter config: Hub configuration, see `SMHviz_layout.build.load_config()`
+    :type config: dict
+    :parameter n_builds: Number of concurrent builds
+    :type n_builds: int
+    :parameter workers: Number of threads
+    :type workers: int
+    :return: a dictionary with the number of distinct layouts (`layouts`), builds (`builds`) and
+        threads (`workers`). An AssertionError is raised if an output is not deterministic or if
+        an input is modified.
+    """
+    jobs = stress_jobs(config)
+    inputs = _snapshot([(args, kwargs) for _, _, args, kwargs in jobs])
+    reference = dict()
+    for name, builder, args, kwargs in jobs:
+        reference[name] = canonical_json(builder(*args, **kwargs))
+
+    def run_job(job):
+        name, builder, args, kwargs = job
+        return name, canonical_json(builder(*args, **kwargs))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(run_job, itertools.islice(itertools.cycle(jobs), n_builds))
+        for name, output in results:
+            assert output == reference[name], "non deterministic output: " + name
+    assert _snapshot([(args, kwargs) for _, _, args, kwargs in jobs]) == inputs, \
+        "input modified by a layout function"
+    return {"layouts": len(jobs), "builds": n_builds, "workers": workers}
+
+
+def test_stress(tmp_path):
+    config = load_config(make_hub(str(tmp_path)))
+    n_builds = int(os.environ.get("STRESS_BUILDS", "300"))
+    workers = int(os.environ.get("STRESS_WORKERS", "8"))
+    assert run_stress(config, n_builds=n_builds, workers=workers)["builds"] == n_builds
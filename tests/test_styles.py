@@ -0,0 +1,35 @@
+import re
+
+import pytest
+
+from golden_layouts import HUBS, build_layouts
+from SMHviz_layout.serialize import to_json
+from SMHviz_layout.styles import DEFAULT_STYLES, make_stylesheet, style_mode, style_props
+
+
+def _classes(layouts):
+    classes = set()
+    for layout in layouts.values():
+        for i in re.findall(r'"className":\s*"([^"]*)"', to_json(layout)):
+            classes.update(i.split())
+    return classes
+
+
+@pytest.mark.parametrize("name", list(HUBS))
+def test_class_mode_classes_defined(name, tmp_path):
+    with style_mode("inline"):
+        inline = _classes(build_layouts(name, str(tmp_path)))
+    with style_mode("class"):
+        classes = _classes(build_layouts(name, str(tmp_path)))
+    defined = set(re.findall(r"^\.([\w-]+) \{", make_stylesheet(), flags=re.M))
+    assert defined == set(DEFAULT_STYLES)
+    added = classes - inline
+    assert len(added) > 0
+    assert sorted(added - defined) == []
+
+
+def test_style_props_user_style():
+    with style_mode("class"):
+        assert style_props("smh-notes") == {"className": "smh-notes"}
+        assert style_props("smh-notes", css_class="notes") == {"className": "notes smh-notes"}
+        assert style_props("smh-notes", style={"width": "50%"}) == {"style": {"width": "50%"}}
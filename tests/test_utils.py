@@ -0,0 +1,24 @@
+from SMHviz_layout.utils import make_slider, slider_marks
+
+
+def test_slider_marks_not_shared():
+    marks = slider_marks(1, 52, 13)
+    marks[100] = "100"
+    assert 100 not in slider_marks(1, 52, 13)
+    slider = make_slider("Week", "week", 1, 52, 13)
+    slider.children[1].marks.clear()
+    assert make_slider("Week", "week", 1, 52, 13).children[1].marks == slider_marks(1, 52, 13)
+
+
+def test_slider_marks_budget():
+    marks = slider_marks(1, 104, 1, max_marks=6)
+    assert len(marks) <= 6 and min(marks) == 1 and max(marks) == 104
+
+
+def test_slider_marks_min_value_offset():
+    marks = slider_marks(10, 300, 20, max_marks=5)
+    assert len(marks) > 2 and len(marks) <= 5 and min(marks) == 10 and max(marks) == 300
+    # only values selectable in the slider
+    assert all((i - 10) % 20 == 0 for i in marks if i != 300)
+    marks = slider_marks(20, 300, 20, max_marks=5)
+    assert list(marks) == [20, 100, 200, 300]